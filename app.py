@@ -1,50 +1,48 @@
-import sys
 import os
-sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
 
-from flask import Flask, request, jsonify, render_template, send_file
-from modules.autofill_bot import extract_forms_from_url, autofill_and_validate_form
+from flask import Flask, request, jsonify, render_template, send_file, g, Response, stream_with_context, make_response
+from flask.json.provider import DefaultJSONProvider
+from modules.analyzer_registry import AnalyzerRegistry
+from modules.fetch_scheduler import HostScheduler
+from modules.site_crawler import FifoFrontier
+from modules.link_health import LinkStatusCache
+from modules.link_graph import LinkGraph, normalize_url
+from modules.disk_frontier import DiskFrontier
+from modules.crawl_jobs import CrawlJobStore
+from modules.task_queue import TaskQueue
+from modules.queue_worker import RetryTask, run_workers
+from modules.crawl_priority import PageImportance, PriorityFrontier, ScoredFrontier, rank_links
+from modules.page_fingerprint import NearDuplicateIndex, fingerprint_page
+from modules.render_planner import RENDER_MODES, RenderPlanner, detect_spa_shell
+from modules.render_profile import PROFILES as RENDER_PROFILES
+from modules.analytics_signatures import merge_detections
+from modules.form_inventory import form_inventory
+from modules.request_coalescer import RequestCoalescer, coalesce_key
+from modules.admission import AdmissionController, AdmissionRejected, parse_budget
+from modules.deadline import Deadline, clamp_timeout, current_deadline
+from modules.result_store import ResultStore, parse_field_list, project, paginate
+from modules.audit_records import DetectionResult, LinkRecord, LinkTable, PageElementSummary
+from modules.page_metrics import ELEMENT_COLUMNS, PageMetricsTable
+from modules.bulk_export import KIND_TABLES, PYARROW_AVAILABLE, build_manifest, export_formats, ndjson_gzip, table_rows, write_parquet
+from modules.request_tracer import RequestTracer, SamplingProfiler
+from modules.http_client import instrument_session
+from modules.fetch_resilience import HostCircuitBreakers, RetryPolicy
+from modules.page_decoder import decode_html, find_markers
 from flask_cors import CORS
 import csv
 import io
 import json
+import contextlib
+import functools
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import as_completed
 from datetime import datetime
 
-# Import only the modules that exist and work
-try:
-    from extract_links import ExtractLinks
-    EXTRACT_LINKS_AVAILABLE = True
-except ImportError:
-    EXTRACT_LINKS_AVAILABLE = False
-    print("⚠️ extract_links module not available")
-
-try:
-    from cms_detection import CMSDetection
-    CMS_DETECTION_AVAILABLE = True
-except ImportError:
-    CMS_DETECTION_AVAILABLE = False
-    print("⚠️ cms_detection module not available")
-
-try:
-    from analytics_detection import AnalyticsDetection
-    ANALYTICS_DETECTION_AVAILABLE = True
-except ImportError:
-    ANALYTICS_DETECTION_AVAILABLE = False
-    print("⚠️ analytics_detection module not available")
-
-try:
-    from sitemap_parser import SitemapParser
-    SITEMAP_PARSER_AVAILABLE = True
-except ImportError:
-    SITEMAP_PARSER_AVAILABLE = False
-    print("⚠️ sitemap_parser module not available")
-
-try:
-    from internal_link_logger import InternalLinkLogger
-    LINK_LOGGER_AVAILABLE = True
-except ImportError:
-    LINK_LOGGER_AVAILABLE = False
-    print("⚠️ internal_link_logger module not available")
+# Analyzers are discovered up front but only imported on first use.
+# AUDIT_DISABLED_SUBSYSTEMS=selenium,playwright turns whole browser stacks off.
+analyzers = AnalyzerRegistry.from_defaults(os.environ.get('AUDIT_DISABLED_SUBSYSTEMS', ''))
 
 # Basic fallback imports that should always work
 import requests
@@ -53,18 +51,159 @@ from urllib.parse import urljoin, urlparse
 import re
 import time
 
+class AuditJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes slotted audit records when a response is written"""
+
+    @staticmethod
+    def default(o):
+        # Records travel through the pipeline as objects; only the response sees dicts
+        if isinstance(o, (LinkRecord, PageElementSummary, DetectionResult)):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
 app = Flask(__name__)
+app.json = AuditJSONProvider(app)
 CORS(app)
 
 # Global storage for results
 analysis_results = {}
 current_audit_data = {}
 
+# Full analyze-all-links results, fetched later by result_id
+audit_results = ResultStore(max_results=int(os.environ.get('AUDIT_RESULT_STORE_SIZE', '50')))
+# Recent /api/analyze results, kept for bulk export by result_id
+site_analyses = ResultStore(max_results=int(os.environ.get('AUDIT_ANALYSIS_STORE_SIZE', '50')))
+DEFAULT_PAGE_EXCLUDE = ['full_analysis']
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Profiling is an admin-only diagnostic; optionally gated by a shared token
+PROFILING_ALLOWED = os.environ.get('AUDIT_ALLOW_PROFILING', '').lower() in ('1', 'true', 'yes')
+ADMIN_TOKEN = os.environ.get('AUDIT_ADMIN_TOKEN')
+
+# Upper bounds for streaming analysis; requests may ask for lower limits
+MAX_PAGE_BYTES = int(os.environ.get('AUDIT_MAX_PAGE_BYTES', str(5 * 1024 * 1024)))
+MAX_PAGE_ELEMENTS = int(os.environ.get('AUDIT_MAX_PAGE_ELEMENTS', '100000'))
+
+# Link probe results are reused across pages and audits for this long; failures without an HTTP status much more briefly
+link_status_cache = LinkStatusCache(ttl=int(os.environ.get('AUDIT_LINK_CACHE_TTL', '3600')),
+                                    error_ttl=int(os.environ.get('AUDIT_LINK_ERROR_CACHE_TTL', '60')))
+LINK_HEALTH_MAX_PAGES = int(os.environ.get('AUDIT_LINK_HEALTH_MAX_PAGES', '50'))
+
+# Near-duplicate pages (SimHash bits apart) share one analysis; thin pages are flagged
+DUPLICATE_MAX_DISTANCE = int(os.environ.get('AUDIT_DUPLICATE_MAX_DISTANCE', '3'))
+THIN_CONTENT_WORDS = int(os.environ.get('AUDIT_THIN_CONTENT_WORDS', '150'))
+
+# Static fetch first; 'auto' escalates SPA shells to a pooled headless browser
+RENDER_MODE = os.environ.get('AUDIT_RENDER_MODE', 'auto').lower()
+RENDER_ENGINE = os.environ.get('AUDIT_RENDER_ENGINE', 'playwright').lower()
+RENDER_TIMEOUT = int(os.environ.get('AUDIT_RENDER_TIMEOUT', '30'))
+RENDER_PROFILE = os.environ.get('AUDIT_RENDER_PROFILE', 'lean').lower()
+BROWSER_POOL_SIZE = int(os.environ.get('AUDIT_BROWSER_POOL_SIZE', '2'))
+FORM_TEST_PARALLEL = int(os.environ.get('AUDIT_FORM_TEST_PARALLEL', '4'))
+render_planner = RenderPlanner()
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+# Concurrent identical analyses share one run; results are reused for a short while after
+ANALYZE_OPTIONS = ('mode', 'render', 'render_profile', 'max_bytes', 'max_elements')
+analysis_coalescer = RequestCoalescer(
+    ttl=int(os.environ.get('AUDIT_ANALYSIS_CACHE_TTL', '30')),
+    max_entries=int(os.environ.get('AUDIT_ANALYSIS_CACHE_SIZE', '256'))
+)
+
+# Admission control per endpoint class: 'concurrency,queue,wait_seconds'. Requests beyond
+# the queue get 429 and queued requests that wait too long get 503, both with Retry-After.
+admission = AdmissionController({
+    'light': parse_budget(os.environ.get('AUDIT_ADMIT_LIGHT'), (32, 64, 2)),
+    'analysis': parse_budget(os.environ.get('AUDIT_ADMIT_ANALYSIS'), (8, 16, 10)),
+    'crawl': parse_budget(os.environ.get('AUDIT_ADMIT_CRAWL'), (2, 4, 5)),
+    'browser': parse_budget(os.environ.get('AUDIT_ADMIT_BROWSER'), (BROWSER_POOL_SIZE, 4, 15)),
+    # Export downloads hold a slot for as long as the client takes to read the file
+    'export': parse_budget(os.environ.get('AUDIT_ADMIT_EXPORT'), (4, 8, 5)),
+})
+
+# Overall time budget for an analysis request (seconds, 0 = none). Clients may send their own
+# via 'deadline' or X-Request-Deadline; stages that can't start in time are skipped.
+DEFAULT_DEADLINE = float(os.environ.get('AUDIT_DEFAULT_DEADLINE', '25'))
+MAX_DEADLINE = float(os.environ.get('AUDIT_MAX_DEADLINE', '300'))
+MIN_STAGE_SECONDS = 0.5
+
+# Transient fetch failures are retried with jittered backoff; hosts that keep failing
+# are short-circuited for a while instead of costing a full timeout per URL
+fetch_retry_policy = RetryPolicy(
+    max_attempts=int(os.environ.get('AUDIT_RETRY_ATTEMPTS', '3')),
+    backoff_base=float(os.environ.get('AUDIT_RETRY_BACKOFF', '0.5')),
+    backoff_max=float(os.environ.get('AUDIT_RETRY_BACKOFF_MAX', '8'))
+)
+host_breakers = HostCircuitBreakers(
+    failure_threshold=int(os.environ.get('AUDIT_BREAKER_THRESHOLD', '5')),
+    reset_timeout=float(os.environ.get('AUDIT_BREAKER_RESET', '30'))
+)
+
+# Crawl size cap for internal link graph audits
+LINK_GRAPH_MAX_PAGES = int(os.environ.get('AUDIT_LINK_GRAPH_MAX_PAGES', '2000'))
+
+# Crawls of at least this many pages keep their frontier on disk (SQLite + Bloom filter seen-set);
+# capped at the link graph's page limit so 'auto' can actually choose disk
+DISK_FRONTIER_MIN_PAGES = min(int(os.environ.get('AUDIT_DISK_FRONTIER_MIN_PAGES', '1000')), LINK_GRAPH_MAX_PAGES)
+FRONTIER_DIR = os.environ.get('AUDIT_FRONTIER_DIR') or None
+FRONTIER_KINDS = ('auto', 'memory', 'disk')
+
+# Capped crawls fetch the most important pages first (depth, in-links, sitemap, URL patterns)
+CRAWL_ORDERS = ('bfs', 'importance')
+ALL_LINKS_BUDGET = int(os.environ.get('AUDIT_ALL_LINKS_BUDGET', '20'))
+ALL_LINKS_MAX_BUDGET = int(os.environ.get('AUDIT_ALL_LINKS_MAX_BUDGET', '200'))
+# Sitemap priorities come from at most this many entries, read once per host per TTL
+SITEMAP_MAX_ENTRIES = int(os.environ.get('AUDIT_SITEMAP_MAX_ENTRIES', '50000'))
+sitemap_cache = RequestCoalescer(
+    ttl=int(os.environ.get('AUDIT_SITEMAP_CACHE_TTL', '900')),
+    max_entries=int(os.environ.get('AUDIT_SITEMAP_CACHE_SIZE', '128'))
+)
+
+# Long audits run as background crawl jobs checkpointed to disk and resumable after a restart
+CRAWL_JOB_MAX_PAGES = int(os.environ.get('AUDIT_CRAWL_JOB_MAX_PAGES', '100000'))
+CRAWL_JOB_MAX_RUNNING = int(os.environ.get('AUDIT_CRAWL_JOB_MAX_RUNNING', '2'))
+# Job files live under AUDIT_DATA_DIR (default: the Flask instance folder), created on first use
+DATA_DIR = os.environ.get('AUDIT_DATA_DIR') or app.instance_path
+CRAWL_JOB_DIR = os.environ.get('AUDIT_CRAWL_JOB_DIR') or os.path.join(DATA_DIR, 'crawl_jobs')
+_crawl_job_store = None
+_crawl_job_threads = {}
+# Page metrics of running jobs, so their status can show a live summary
+_crawl_job_metrics = {}
+_crawl_job_lock = threading.Lock()
+
+# Distributed crawls: any number of worker processes (python worker.py) lease host-sharded
+# page tasks from one durable queue; AUDIT_LOCAL_WORKERS threads also run inside the server
+TASK_QUEUE_PATH = os.environ.get('AUDIT_TASK_QUEUE') or os.path.join(DATA_DIR, 'task_queue.sqlite')
+_task_queue = None
+_task_queue_lock = threading.Lock()
+TASK_LEASE_SECONDS = float(os.environ.get('AUDIT_TASK_LEASE_SECONDS', '60'))
+LOCAL_QUEUE_WORKERS = int(os.environ.get('AUDIT_LOCAL_WORKERS', '2'))
+_local_queue_workers = []
+# Page metrics per distributed crawl, topped up with the results stored since they were last read
+DISTRIBUTED_METRICS_JOBS = int(os.environ.get('AUDIT_DISTRIBUTED_METRICS_JOBS', '32'))
+_distributed_metrics = OrderedDict()
+_distributed_metrics_lock = threading.Lock()
+
+# Bulk exports stream one gzip NDJSON file per table (Parquet too when pyarrow is installed)
+EXPORT_SOURCES = ('results', 'crawl-jobs', 'distributed-crawls', 'analyses')
+EXPORT_ROW_GROUP = int(os.environ.get('AUDIT_EXPORT_ROW_GROUP', '50000'))
+EXPORT_DIR = os.environ.get('AUDIT_EXPORT_DIR') or None
+
+# One fetch pool shared by all batch audits, interleaved fairly across hosts
+BATCH_MAX_SITES = int(os.environ.get('AUDIT_BATCH_MAX_SITES', '200'))
+BATCH_OPTIONS = ('stages', 'render', 'render_profile')
+batch_scheduler = HostScheduler(
+    max_workers=int(os.environ.get('AUDIT_FETCH_WORKERS', '16')),
+    per_host_limit=int(os.environ.get('AUDIT_PER_HOST_LIMIT', '2'))
+)
+
 class BasicAnalyzer:
     """Fallback analyzer using only basic libraries"""
     
     def __init__(self):
-        self.session = requests.Session()
+        self.session = instrument_session(requests.Session(), fetch_retry_policy, host_breakers)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -76,11 +215,13 @@ class BasicAnalyzer:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            html_content, _ = decode_html(response)
+            soup = BeautifulSoup(html_content, 'html.parser')
             base_domain = urlparse(url).netloc
             
             internal_links = []
             external_links = []
+            seen_urls = set()
             
             for link in soup.find_all('a', href=True):
                 href = link.get('href', '').strip()
@@ -90,21 +231,16 @@ class BasicAnalyzer:
                 absolute_url = urljoin(url, href)
                 parsed_url = urlparse(absolute_url)
                 
-                if parsed_url.scheme not in ['http', 'https']:
+                if parsed_url.scheme not in ['http', 'https'] or absolute_url in seen_urls:
                     continue
+                seen_urls.add(absolute_url)
                 
-                link_data = {
-                    'url': absolute_url,
-                    'text': link.get_text(strip=True)[:100],
-                    'title': link.get('title', ''),
-                }
+                link_data = LinkRecord(absolute_url, link.get_text(strip=True)[:100], link.get('title', ''))
                 
                 if parsed_url.netloc == base_domain:
-                    if absolute_url not in [l['url'] for l in internal_links]:
-                        internal_links.append(link_data)
+                    internal_links.append(link_data)
                 else:
-                    if absolute_url not in [l['url'] for l in external_links]:
-                        external_links.append(link_data)
+                    external_links.append(link_data)
             
             print(f"✅ Found {len(internal_links)} internal and {len(external_links)} external links")
             return {
@@ -124,15 +260,19 @@ class BasicAnalyzer:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            html_content = response.text.lower()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            html_content, _ = decode_html(response)
+            soup = BeautifulSoup(html_content, 'html.parser')
+            markers = find_markers(html_content, [
+                'wp-content', 'wp-includes', 'shopify', 'cdn.shopify', 'drupal',
+                'joomla', 'wix.com', 'wixstatic.com', 'squarespace'
+            ])
             
             detected_cms = []
             
             # WordPress detection
             wp_indicators = [
-                'wp-content' in html_content,
-                'wp-includes' in html_content,
+                'wp-content' in markers,
+                'wp-includes' in markers,
                 soup.find('meta', {'name': 'generator', 'content': lambda x: x and 'wordpress' in x.lower()}),
                 soup.find('link', {'href': lambda x: x and 'wp-content' in x})
             ]
@@ -140,23 +280,23 @@ class BasicAnalyzer:
                 detected_cms.append('WordPress')
             
             # Shopify detection
-            if 'shopify' in html_content or 'cdn.shopify' in html_content:
+            if 'shopify' in markers or 'cdn.shopify' in markers:
                 detected_cms.append('Shopify')
             
             # Drupal detection
-            if 'drupal' in html_content:
+            if 'drupal' in markers:
                 detected_cms.append('Drupal')
             
             # Joomla detection
-            if 'joomla' in html_content:
+            if 'joomla' in markers:
                 detected_cms.append('Joomla')
             
             # Wix detection
-            if 'wix.com' in html_content or 'wixstatic.com' in html_content:
+            if 'wix.com' in markers or 'wixstatic.com' in markers:
                 detected_cms.append('Wix')
             
             # Squarespace detection
-            if 'squarespace' in html_content:
+            if 'squarespace' in markers:
                 detected_cms.append('Squarespace')
             
             result = {
@@ -179,27 +319,31 @@ class BasicAnalyzer:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            html_content = response.text.lower()
+            html_content, _ = decode_html(response)
+            markers = find_markers(html_content, [
+                'google-analytics', 'gtag(', 'ga(', 'googletagmanager',
+                'facebook.net', 'fbq(', 'hotjar', 'mixpanel'
+            ])
             detected_tools = []
             
             # Google Analytics
-            if any(pattern in html_content for pattern in ['google-analytics', 'gtag(', 'ga(']):
+            if any(pattern in markers for pattern in ['google-analytics', 'gtag(', 'ga(']):
                 detected_tools.append('Google Analytics')
             
             # Google Tag Manager
-            if 'googletagmanager' in html_content:
+            if 'googletagmanager' in markers:
                 detected_tools.append('Google Tag Manager')
             
             # Facebook Pixel
-            if 'facebook.net' in html_content or 'fbq(' in html_content:
+            if 'facebook.net' in markers or 'fbq(' in markers:
                 detected_tools.append('Facebook Pixel')
             
             # Hotjar
-            if 'hotjar' in html_content:
+            if 'hotjar' in markers:
                 detected_tools.append('Hotjar')
             
             # Mixpanel
-            if 'mixpanel' in html_content:
+            if 'mixpanel' in markers:
                 detected_tools.append('Mixpanel')
             
             result = {
@@ -214,14 +358,19 @@ class BasicAnalyzer:
             print(f"❌ Analytics detection failed: {e}")
             return {'detected_tools': [], 'total_detected': 0, 'error': str(e)}
     
-    def analyze_elements(self, url):
+    def fetch_soup(self, url, timeout=10):
+        """Fetch and parse a page once so several analyses can share the soup"""
+        response = self.session.get(url, timeout=timeout)
+        response.raise_for_status()
+        html_content, _ = decode_html(response)
+        return BeautifulSoup(html_content, 'html.parser')
+    
+    def analyze_elements(self, url, soup=None):
         """Enhanced element analysis with detailed detection"""
         try:
             print(f"🔍 Analyzing elements for: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            if soup is None:
+                soup = self.fetch_soup(url)
             
             # Count headings with actual content
             headings = {}
@@ -382,11 +531,457 @@ class BasicAnalyzer:
 # Initialize basic analyzer
 basic_analyzer = BasicAnalyzer()
 
+def new_analyzer(name, *args, **kwargs):
+    """Create a registered analyzer with an instrumented session, or None"""
+    analyzer = analyzers.create(name, *args, **kwargs)
+    if analyzer is not None and hasattr(analyzer, 'session'):
+        instrument_session(analyzer.session, fetch_retry_policy, host_breakers)
+    return analyzer
+
+def sitemap_entries(url):
+    """Up to SITEMAP_MAX_ENTRIES sitemap URLs with their priority and lastmod, or [] when there is no sitemap
+
+    Entries are cached per host, and concurrent crawls of one host share a single read.
+    """
+    parts = urlparse(url)
+    origin = f"{parts.scheme}://{parts.netloc.lower()}"
+    try:
+        sitemap_data, _ = sitemap_cache.run(origin, lambda: read_sitemap(origin),
+                                            cacheable=lambda data: 'error' not in data)
+    except Exception as e:
+        print(f"⚠️ Sitemap parsing failed: {e}")
+        return []
+    return sitemap_data.get('entries', [])
+
+def read_sitemap(origin):
+    """One capped sitemap read for a host (the sitemap cache's fill function)"""
+    sitemap_parser = new_analyzer('sitemap_parser')
+    if not sitemap_parser:
+        return {'entries': []}
+    return sitemap_parser.parse_sitemap(origin, limit=SITEMAP_MAX_ENTRIES)
+
+def crawl_scorer(entries):
+    """Default importance scorer, seeded with sitemap priorities and lastmod dates"""
+    scorer = PageImportance()
+    scorer.add_sitemap(entries)
+    return scorer
+
+@contextlib.contextmanager
+def crawl_frontier(max_pages, kind='auto', scorer=None):
+    """Frontier for a crawl: in memory for small crawls, a temporary DiskFrontier for large ones
+
+    With a scorer the most important URLs pop first. Yields None for the
+    crawler's default breadth-first in-memory frontier.
+    """
+    if kind == 'memory' or (kind == 'auto' and max_pages < DISK_FRONTIER_MIN_PAGES):
+        yield PriorityFrontier(scorer) if scorer is not None else None
+        return
+    
+    handle, path = tempfile.mkstemp(prefix='frontier-', suffix='.sqlite', dir=FRONTIER_DIR)
+    os.close(handle)
+    frontier = DiskFrontier(path, expected_urls=max(100000, max_pages * 20))
+    try:
+        yield ScoredFrontier(frontier, scorer) if scorer is not None else frontier
+    finally:
+        frontier.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+def browser_engine():
+    """Installed headless engine, preferring AUDIT_RENDER_ENGINE; None when neither is available"""
+    engines = [('playwright', 'element_analyzer_playwright'), ('selenium', 'element_analyzer_selenium')]
+    engines.sort(key=lambda engine: engine[0] != RENDER_ENGINE)
+    for engine, analyzer_name in engines:
+        if analyzers.is_available(analyzer_name):
+            return engine
+    return None
+
+def get_browser_pool():
+    """Shared headless renderer, started on first escalation; None without a browser engine"""
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            engine = browser_engine()
+            if engine:
+                _browser_pool = analyzers.create('browser_pool', engine=engine, size=BROWSER_POOL_SIZE)
+        return _browser_pool
+
+def load_page(url, render=None, profile=None):
+    """Fetch a page as soup, escalating to a headless render when the planner calls for it
+
+    Returns (soup, render info). 'static' never renders, 'browser' always
+    does, and 'auto' renders only pages whose static HTML looks like an SPA shell.
+    profile names the render profile (blocked resource types and wait budget).
+    """
+    mode = (render or RENDER_MODE).lower()
+    if mode not in RENDER_MODES:
+        raise ValueError(f"render must be one of {', '.join(RENDER_MODES)}")
+    info = {'mode': mode, 'method': 'requests+beautifulsoup', 'rendered': False}
+    
+    soup = None
+    if mode == 'auto' and render_planner.prefers_render(url):
+        info['reason'] = 'host_history'
+    elif mode != 'browser':
+        soup = basic_analyzer.fetch_soup(url)
+        if mode == 'static':
+            return soup, info
+        verdict = detect_spa_shell(soup)
+        render_planner.record(url, verdict['is_shell'])
+        info['spa_shell'] = verdict
+        if not verdict['is_shell']:
+            return soup, info
+        info['reason'] = 'spa_shell'
+    
+    pool = get_browser_pool()
+    if pool is None:
+        info['render_error'] = 'No headless browser available'
+    else:
+        try:
+            profile = (profile or RENDER_PROFILE).lower()
+            rendered = pool.render(url, timeout=clamp_timeout(RENDER_TIMEOUT), profile=profile)
+            info.update(method=f'{pool.engine}-render', rendered=True, profile=profile,
+                        wait=rendered.get('wait'), page_weight=rendered.get('page_weight'),
+                        network_analytics=rendered.get('analytics'))
+            return BeautifulSoup(rendered['html'], 'html.parser'), info
+        except Exception as e:
+            print(f"⚠️ Headless render failed for {url}, using static HTML: {e}")
+            info['render_error'] = str(e)
+    
+    if soup is None:
+        soup = basic_analyzer.fetch_soup(url)
+    return soup, info
+
+def render_option_error(data):
+    """Message for an unknown render mode or render profile, else None"""
+    render = data.get('render')
+    if render is not None and str(render).lower() not in RENDER_MODES:
+        return f"render must be one of {', '.join(RENDER_MODES)}"
+    profile = data.get('render_profile')
+    if profile is not None and str(profile).lower() not in RENDER_PROFILES:
+        return f"render_profile must be one of {', '.join(RENDER_PROFILES)}"
+    return None
+
+def _invalid_render_option(data):
+    """400 response for an unknown render mode or render profile, else None"""
+    error = render_option_error(data)
+    if error:
+        return jsonify({'error': error, 'status': 'error'}), 400
+    return None
+
+def _invalid_stream_option(data):
+    """400 response for bad max_bytes/max_elements, 503 when stream mode can't run here, else None"""
+    for name in ('max_bytes', 'max_elements'):
+        value = data.get(name)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1):
+            return jsonify({'error': f'{name} must be a positive integer', 'status': 'error'}), 400
+    if data.get('mode') == 'stream' and analyzers.load('streaming_analyzer') is None:
+        return jsonify({'error': 'Streaming analysis is not available on this server', 'status': 'error'}), 503
+    return None
+
+def bounded_int(data, name, default, maximum):
+    """data[name] (default when absent) clamped to 1..maximum; raises ValueError when it isn't an integer"""
+    value = data.get(name, default)
+    try:
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError
+        return max(1, min(int(value), maximum))
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+
+def max_depth_option(data):
+    """Optional max_depth: None for unlimited, else a non-negative integer; raises ValueError otherwise"""
+    value = data.get('max_depth')
+    if value is None:
+        return None
+    try:
+        if isinstance(value, bool) or not isinstance(value, (int, str)) or int(value) < 0:
+            raise ValueError
+        return int(value)
+    except ValueError:
+        raise ValueError('max_depth must be a non-negative integer')
+
+def _query_flag(name):
+    """Read a boolean ?name=1 style query parameter"""
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+def _profiling_permitted():
+    """Profiling must be enabled by config and, if set, match the admin token"""
+    if not PROFILING_ALLOWED:
+        return False
+    return not ADMIN_TOKEN or request.headers.get('X-Admin-Token') == ADMIN_TOKEN
+
+def admitted(budget):
+    """Run a route only when its endpoint class has capacity, else answer 429/503 with Retry-After
+
+    Streamed responses keep their slot until the stream is closed.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                ticket = admission.acquire(budget)
+            except AdmissionRejected as e:
+                print(f"⚠️ Rejected {request.path}: {e.reason}")
+                response = jsonify({'error': f'Server busy: {e.reason}', 'retry_after': e.retry_after, 'status': 'error'})
+                response.status_code = e.status
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+            
+            try:
+                response = make_response(view(*args, **kwargs))
+            except BaseException:
+                ticket.release()
+                raise
+            if response.is_streamed:
+                response.call_on_close(ticket.release)
+            else:
+                ticket.release()
+            return response
+        return wrapper
+    return decorator
+
+def diagnosable(view):
+    """Enable ?trace=1 span trees and ?profile=1 sampled profiles for a route"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        tracer = RequestTracer(enabled=_query_flag('trace'))
+        profiler = None
+        if _query_flag('profile'):
+            if not _profiling_permitted():
+                return jsonify({'error': 'Profiling is not enabled for this caller', 'status': 'error'}), 403
+            profiler = SamplingProfiler().start()
+        
+        g.tracer = tracer
+        g.profiler = profiler
+        try:
+            with tracer.activate():
+                return view(*args, **kwargs)
+        finally:
+            if profiler:
+                profiler.stop()
+    return wrapper
+
+def attach_diagnostics(results):
+    """Add the trace/profile collected for this request to a response payload"""
+    tracer = g.get('tracer')
+    profiler = g.get('profiler')
+    if tracer is not None and tracer.enabled:
+        results['trace'] = tracer.to_dict()
+    if profiler is not None:
+        results['profile'] = profiler.summary()
+    return results
+
+def extract_links_stage(url):
+    """Audit stage: internal/external links"""
+    link_extractor = new_analyzer('extract_links')
+    if link_extractor:
+        try:
+            return link_extractor.get_all_links(url)
+        except Exception as e:
+            print(f"⚠️ ExtractLinks failed, using basic: {e}")
+    return basic_analyzer.extract_links(url)
+
+def cms_detection_stage(url):
+    """Audit stage: CMS detection"""
+    cms_detector = new_analyzer('cms_detection')
+    if cms_detector:
+        try:
+            return {'cms_detected': cms_detector.detect_cms(url)}
+        except Exception as e:
+            print(f"⚠️ CMSDetection failed, using basic: {e}")
+    return {'cms_detected': basic_analyzer.detect_cms(url)}
+
+def analytics_detection_stage(url):
+    """Audit stage: analytics and marketing tools"""
+    analytics_detector = new_analyzer('analytics_detection')
+    if analytics_detector:
+        try:
+            return {'analytics_tools': analytics_detector.detect_analytics(url)}
+        except Exception as e:
+            print(f"⚠️ AnalyticsDetection failed, using basic: {e}")
+    return {'analytics_tools': basic_analyzer.detect_analytics(url)}
+
+def element_analysis_stage(url, render=None, render_profile=None):
+    """Audit stage: page elements, rendered first when the page is an SPA shell"""
+    try:
+        soup, render_info = load_page(url, render, render_profile)
+    except Exception as e:
+        print(f"❌ Element analysis failed: {e}")
+        return {'elements': {'error': str(e)}}
+    
+    result = {'elements': basic_analyzer.analyze_elements(url, soup=soup), 'render': render_info}
+    network_analytics = render_info.pop('network_analytics', None)
+    if network_analytics is not None:
+        # The render already watched the tags fire, so no separate static analytics fetch
+        analytics_detector = new_analyzer('analytics_detection')
+        static_analytics = analytics_detector.detect_in_html(str(soup)) if analytics_detector else {}
+        result['analytics_tools'] = merge_detections(static_analytics, network_analytics)
+    return result
+
+def sitemap_stage(url, limit=100):
+    """Audit stage: sitemap URLs"""
+    sitemap_parser = new_analyzer('sitemap_parser')
+    if sitemap_parser:
+        try:
+            print("🗺️ Parsing sitemap...")
+            sitemap_data = sitemap_parser.parse_sitemap(url, limit=limit)
+            return {'sitemap_links': sitemap_data.get('urls', [])}
+        except Exception as e:
+            print(f"⚠️ Sitemap parsing failed: {e}")
+    return {'sitemap_links': []}
+
+def streaming_stage(url, max_bytes=None, max_elements=None):
+    """Links, CMS, analytics and elements from one bounded streaming pass"""
+    streaming_analyzer = new_analyzer('streaming_analyzer')
+    if streaming_analyzer is None:
+        raise RuntimeError('Streaming analyzer is not available')
+    return streaming_analyzer.analyze(
+        url,
+        max_bytes=min(max_bytes or MAX_PAGE_BYTES, MAX_PAGE_BYTES),
+        max_elements=min(max_elements or MAX_PAGE_ELEMENTS, MAX_PAGE_ELEMENTS)
+    )
+
+# (name, progress message, function) in the order /api/analyze runs them.
+# Element analysis runs before analytics: a rendered page reports analytics from its network traffic.
+AUDIT_STAGES = [
+    ('extract_links', "📋 Extracting links...", extract_links_stage),
+    ('cms_detection', "🔧 Detecting CMS...", cms_detection_stage),
+    ('element_analysis', "🔍 Analyzing elements...", element_analysis_stage),
+    ('analytics_detection', "📊 Detecting analytics tools...", analytics_detection_stage),
+    ('sitemap', "🗺️ Checking sitemap...", sitemap_stage),
+]
+
 @app.route("/")
+@admitted('light')
 def index():
     return render_template("index.html")
 
+def request_deadline(data):
+    """Deadline from the body's 'deadline' or the X-Request-Deadline header (seconds), else the default
+
+    Raises ValueError for a value that isn't a positive number.
+    """
+    # Bodies that aren't JSON objects (lists, strings, numbers) carry no deadline of their own
+    value = (data.get('deadline') if isinstance(data, dict) else None) or request.headers.get('X-Request-Deadline')
+    if value is None or value == '':
+        return Deadline(min(DEFAULT_DEADLINE, MAX_DEADLINE)) if DEFAULT_DEADLINE > 0 else None
+    seconds = float(value)
+    if not seconds > 0:
+        raise ValueError('deadline must be a positive number of seconds')
+    return Deadline(min(seconds, MAX_DEADLINE))
+
+def deadline_scoped(view):
+    """Run a route under the request's deadline, available as g.deadline and to every fetch on this thread"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            deadline = request_deadline(request.get_json(silent=True) or {})
+        except (TypeError, ValueError):
+            return jsonify({'error': 'deadline must be a positive number of seconds', 'status': 'error'}), 400
+        
+        g.deadline = deadline
+        with deadline.activate() if deadline else contextlib.nullcontext():
+            return view(*args, **kwargs)
+    return wrapper
+
+def run_stage(name, stage, results, report, **kwargs):
+    """Run one audit stage inside the request deadline and record how it ended
+
+    A stage is skipped when too little time is left to start it, and marked
+    timed_out when the deadline passed while it ran; whatever it returned is kept.
+    """
+    deadline = current_deadline()
+    if deadline is not None and deadline.remaining() < MIN_STAGE_SECONDS:
+        print(f"⏱️ Skipping {name}: deadline reached")
+        report[name] = {'status': 'skipped', 'timed_out': True}
+        return
+    
+    start = time.time()
+    try:
+        with g.tracer.span(name):
+            results.update(stage(**kwargs))
+    except requests.exceptions.Timeout as e:
+        if deadline is None or not deadline.expired():
+            raise
+        print(f"⏱️ {name} cut short by the deadline: {e}")
+    timed_out = deadline is not None and deadline.expired()
+    report[name] = {'status': 'timed_out' if timed_out else 'completed', 'timed_out': timed_out,
+                    'elapsed_ms': round((time.time() - start) * 1000, 1)}
+
+def finish_stages(results, report, deadline):
+    """Attach the stage report and deadline; anything skipped or cut short makes the result partial"""
+    results['stages'] = report
+    if deadline is not None:
+        results['deadline'] = deadline.to_dict()
+    if any(entry['timed_out'] for entry in report.values()):
+        results['status'] = 'partial'
+    return results
+
+def _complete(result):
+    return result.get('status') == 'success'
+
+def _coalesced(view, url, options, run):
+    """Run an analysis through the singleflight/short-TTL cache unless diagnostics were requested
+
+    Returns (result, outcome). Traces and profiles belong to one request, so
+    those requests always run their own analysis.
+    """
+    if g.tracer.enabled or g.profiler is not None:
+        return run(), 'bypassed'
+    # Partial (deadline-limited) results are shared with concurrent callers but not cached
+    return analysis_coalescer.run(coalesce_key(url, dict(options, view=view)), run, cacheable=_complete)
+
+def run_site_analysis(url, data):
+    """Full /api/analyze pipeline for one URL"""
+    print(f"\n🔍 Starting analysis for: {url}")
+    tracer = g.tracer
+    
+    # Initialize results
+    results = {
+        'url': url,
+        'timestamp': datetime.now().isoformat(),
+        'status': 'success'
+    }
+    
+    report = {}
+    if data.get('mode') == 'stream':
+        # 1-4. One streamed pass covers links, CMS, analytics and elements
+        run_stage('streaming_analysis', streaming_stage, results, report,
+                  url=url, max_bytes=data.get('max_bytes'), max_elements=data.get('max_elements'))
+        run_stage('sitemap', sitemap_stage, results, report, url=url)
+    else:
+        # 1-5. Links, CMS, analytics, elements and sitemap
+        stage_options = {'element_analysis': {'render': data.get('render'), 'render_profile': data.get('render_profile')}}
+        for stage_name, label, stage in AUDIT_STAGES:
+            if stage_name == 'analytics_detection' and 'analytics_tools' in results:
+                continue
+            print(label)
+            run_stage(stage_name, stage, results, report, url=url, **stage_options.get(stage_name, {}))
+    finish_stages(results, report, current_deadline())
+    
+    # 6. Log Internal Links (if available)
+    if analyzers.is_available('link_logger'):
+        with tracer.span('link_logging'):
+            try:
+                print("📝 Logging internal links...")
+                link_logger = new_analyzer('link_logger')
+                link_logger.log_links(url, results.get('internal_links', []))
+            except Exception as e:
+                print(f"⚠️ Link logging failed: {e}")
+    
+    print(f"✅ Analysis {'complete' if results['status'] == 'success' else 'partial'}! Found {results.get('total_links', 0)} total links")
+    return results
+
+def store_site_analysis(results):
+    """Keep a finished analysis for bulk export; callers sharing the run share its result_id"""
+    results['result_id'] = site_analyses.save(results)
+    return results
+
 @app.route("/api/analyze", methods=["POST"])
+@admitted('analysis')
+@diagnosable
+@deadline_scoped
 def analyze_website():
     try:
         data = request.get_json()
@@ -398,93 +993,57 @@ def analyze_website():
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        print(f"\n🔍 Starting analysis for: {url}")
-        
-        # Initialize results
-        results = {
-            'url': url,
-            'timestamp': datetime.now().isoformat(),
-            'status': 'success'
-        }
-        
-        # 1. Extract Links
-        print("📋 Extracting links...")
-        if EXTRACT_LINKS_AVAILABLE:
-            try:
-                link_extractor = ExtractLinks()
-                link_data = link_extractor.get_all_links(url)
-                results.update(link_data)
-            except Exception as e:
-                print(f"⚠️ ExtractLinks failed, using basic: {e}")
-                link_data = basic_analyzer.extract_links(url)
-                results.update(link_data)
-        else:
-            link_data = basic_analyzer.extract_links(url)
-            results.update(link_data)
-        
-        # 2. CMS Detection
-        print("🔧 Detecting CMS...")
-        if CMS_DETECTION_AVAILABLE:
-            try:
-                cms_detector = CMSDetection()
-                cms_data = cms_detector.detect_cms(url)
-                results['cms_detected'] = cms_data
-            except Exception as e:
-                print(f"⚠️ CMSDetection failed, using basic: {e}")
-                results['cms_detected'] = basic_analyzer.detect_cms(url)
-        else:
-            results['cms_detected'] = basic_analyzer.detect_cms(url)
+        invalid = _invalid_render_option(data) or _invalid_stream_option(data)
+        if invalid:
+            return invalid
         
-        # 3. Analytics Detection
-        print("📊 Detecting analytics tools...")
-        if ANALYTICS_DETECTION_AVAILABLE:
-            try:
-                analytics_detector = AnalyticsDetection()
-                analytics_data = analytics_detector.detect_analytics(url)
-                results['analytics_tools'] = analytics_data
-            except Exception as e:
-                print(f"⚠️ AnalyticsDetection failed, using basic: {e}")
-                results['analytics_tools'] = basic_analyzer.detect_analytics(url)
-        else:
-            results['analytics_tools'] = basic_analyzer.detect_analytics(url)
-        
-        # 4. Element Analysis
-        print("🔍 Analyzing elements...")
-        results['elements'] = basic_analyzer.analyze_elements(url)
-        
-        # 5. Sitemap Analysis (if available)
-        if SITEMAP_PARSER_AVAILABLE:
-            try:
-                print("🗺️ Parsing sitemap...")
-                sitemap_parser = SitemapParser()
-                sitemap_data = sitemap_parser.parse_sitemap(url)
-                results['sitemap_links'] = sitemap_data.get('urls', [])
-            except Exception as e:
-                print(f"⚠️ Sitemap parsing failed: {e}")
-                results['sitemap_links'] = []
-        else:
-            results['sitemap_links'] = []
-        
-        # 6. Log Internal Links (if available)
-        if LINK_LOGGER_AVAILABLE:
-            try:
-                print("📝 Logging internal links...")
-                link_logger = InternalLinkLogger()
-                link_logger.log_links(url, results.get('internal_links', []))
-            except Exception as e:
-                print(f"⚠️ Link logging failed: {e}")
+        # Identical concurrent (or just-finished) audits share one run
+        options = {name: data.get(name) for name in ANALYZE_OPTIONS}
+        options['deadline'] = g.deadline.budget if g.deadline else None
+        results, outcome = _coalesced('site', url, options, lambda: store_site_analysis(run_site_analysis(url, options)))
+        if outcome in ('joined', 'cached'):
+            print(f"♻️ Reusing {outcome} analysis for: {url}")
         
-        print(f"✅ Analysis complete! Found {results.get('total_links', 0)} total links")
-        return jsonify(results)
+        response = jsonify(attach_diagnostics(dict(results)))
+        response.headers['X-Analysis-Source'] = outcome
+        return response
         
     except Exception as e:
         print(f"❌ Error during analysis: {str(e)}")
-        return jsonify({
+        return jsonify(attach_diagnostics({
             'error': f'Analysis failed: {str(e)}',
             'status': 'error'
-        }), 500
+        })), 500
+
+def run_url_analysis(url, data):
+    """Element analysis for a single URL"""
+    print(f"🔍 Analyzing single URL: {url}")
+    
+    stage_data = {}
+    report = {}
+    if data.get('mode') == 'stream':
+        run_stage('streaming_analysis', streaming_stage, stage_data, report,
+                  url=url, max_bytes=data.get('max_bytes'), max_elements=data.get('max_elements'))
+    else:
+        run_stage('element_analysis', element_analysis_stage, stage_data, report,
+                  url=url, render=data.get('render'), render_profile=data.get('render_profile'))
+    
+    result = {
+        'url': url,
+        'timestamp': datetime.now().isoformat(),
+        'elements': stage_data.get('elements', {}),
+        'render': stage_data.get('render'),
+        'truncated': stage_data.get('truncated', False),
+        'status': 'success'
+    }
+    if stage_data.get('analytics_tools') is not None:
+        result['analytics_tools'] = stage_data['analytics_tools']
+    return finish_stages(result, report, current_deadline())
 
 @app.route("/api/analyze-url", methods=["POST"])
+@admitted('analysis')
+@diagnosable
+@deadline_scoped
 def analyze_single_url():
     """Analyze elements for a single URL"""
     try:
@@ -494,31 +1053,32 @@ def analyze_single_url():
         if not url:
             return jsonify({'error': 'URL is required'}), 400
         
-        print(f"🔍 Analyzing single URL: {url}")
+        invalid = _invalid_render_option(data) or _invalid_stream_option(data)
+        if invalid:
+            return invalid
         
-        # Analyze elements for this specific URL
-        elements_data = basic_analyzer.analyze_elements(url)
-        
-        result = {
-            'url': url,
-            'timestamp': datetime.now().isoformat(),
-            'elements': elements_data,
-            'status': 'success'
-        }
+        options = {name: data.get(name) for name in ANALYZE_OPTIONS}
+        options['deadline'] = g.deadline.budget if g.deadline else None
+        result, outcome = _coalesced('elements', url, options, lambda: run_url_analysis(url, options))
         
         # Store in global results for CSV export
         analysis_results[url] = result
         
-        return jsonify(result)
+        response = jsonify(attach_diagnostics(dict(result)))
+        response.headers['X-Analysis-Source'] = outcome
+        return response
         
     except Exception as e:
         print(f"❌ Single URL analysis failed: {e}")
-        return jsonify({
+        return jsonify(attach_diagnostics({
             'error': f'Analysis failed: {str(e)}',
             'status': 'error'
-        }), 500
+        })), 500
 
 @app.route("/api/analyze-all-links", methods=["POST"])
+@admitted('crawl')
+@diagnosable
+@deadline_scoped
 def analyze_all_links():
     """Analyze elements for all internal links found"""
     try:
@@ -531,108 +1091,131 @@ def analyze_all_links():
         if not base_url.startswith(('http://', 'https://')):
             base_url = 'https://' + base_url
         
+        invalid_render = _invalid_render_option(data)
+        if invalid_render:
+            return invalid_render
+        # 'bfs' keeps the homepage's document order
+        if data.get('order', 'importance') not in CRAWL_ORDERS:
+            return jsonify({'error': f"order must be one of {', '.join(CRAWL_ORDERS)}", 'status': 'error'}), 400
+        # Bad pagination and budgets are rejected before crawling, not after
+        try:
+            page_window(data)
+            budget = bounded_int(data, 'max_links', ALL_LINKS_BUDGET, ALL_LINKS_MAX_BUDGET)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+        
         print(f"\n🚀 Starting comprehensive analysis for all links: {base_url}")
+        start_time = time.time()
+        tracer = g.tracer
         
         # Step 1: Extract all internal links
         print("📋 Extracting internal links...")
-        if EXTRACT_LINKS_AVAILABLE:
-            try:
-                link_extractor = ExtractLinks()
-                link_data = link_extractor.get_all_links(base_url)
-                internal_links = link_data.get('internal_links', [])
-            except Exception as e:
-                print(f"⚠️ ExtractLinks failed, using basic: {e}")
-                link_data = basic_analyzer.extract_links(base_url)
-                internal_links = link_data.get('internal_links', [])
-        else:
-            link_data = basic_analyzer.extract_links(base_url)
-            internal_links = link_data.get('internal_links', [])
+        report = {}
+        link_data = {}
+        run_stage('extract_links', extract_links_stage, link_data, report, url=base_url)
+        internal_links = link_data.get('internal_links', [])
         
         print(f"📊 Found {len(internal_links)} internal links to analyze")
         
         # Step 2: Analyze elements for each internal link
         analyzed_links = []
         failed_links = []
+        duplicate_links = []
+        thin_pages = []
+        dedupe = data.get('dedupe', True)
+        duplicate_index = NearDuplicateIndex(max_distance=DUPLICATE_MAX_DISTANCE)
+        analyzed_by_url = {}
+        page_metrics = PageMetricsTable()
+        skipped_links = []
+        deadline = g.deadline
+        pages_start = time.time()
         
-        # Limit to first 20 links to avoid timeout
-        links_to_analyze = internal_links[:20]
+        # Analyze only the most important links within the page budget
+        if data.get('order', 'importance') == 'importance':
+            with tracer.span('prioritize_links', candidates=len(internal_links)):
+                entries = sitemap_entries(base_url) if data.get('use_sitemap', True) else []
+                links_to_analyze, _ = rank_links(internal_links, budget, crawl_scorer(entries))
+        else:
+            links_to_analyze = [(link, None) for link in internal_links[:budget]]
         
-        for i, link in enumerate(links_to_analyze, 1):
-            url = link['url']
+        for i, (link, priority_score) in enumerate(links_to_analyze, 1):
+            url = link.url
+            if deadline is not None and deadline.remaining() < MIN_STAGE_SECONDS:
+                # Out of time: return what was analyzed and list the rest
+                skipped_links = [entry.url for entry, _ in links_to_analyze[i - 1:]]
+                print(f"⏱️ Deadline reached, skipping {len(skipped_links)} remaining links")
+                break
             print(f"🔍 Analyzing link {i}/{len(links_to_analyze)}: {url}")
             
             try:
-                # Analyze elements for this URL
-                elements_data = basic_analyzer.analyze_elements(url)
+                with tracer.span('fetch_page', url=url):
+                    soup, render_info = load_page(url, data.get('render'), data.get('render_profile'))
                 
-                # Count specific elements
-                element_counts = {
-                    'buttons': 0,
-                    'forms': 0,
-                    'images': 0,
-                    'headings': 0,
-                    'links': 0,
-                    'videos': 0,
-                    'calculators': 0,
-                    'banners': 0,
-                    'carousels': 0
-                }
+                # Near-duplicates reuse their representative's analysis
+                if dedupe:
+                    with tracer.span('fingerprint', url=url):
+                        fingerprint, word_count = fingerprint_page(soup)
+                        representative, distance = duplicate_index.add(url, fingerprint)
+                    if word_count < THIN_CONTENT_WORDS:
+                        thin_pages.append({'url': url, 'word_count': word_count})
+                    if representative != url and representative in analyzed_by_url:
+                        print(f"♻️ {url} duplicates {representative} ({distance} bits apart)")
+                        duplicate_links.append({
+                            'url': url,
+                            'text': link.text,
+                            'title': link.title,
+                            'status': '♻️',
+                            'duplicate_of': representative,
+                            'distance': distance,
+                            'elements': analyzed_by_url[representative]['elements']
+                        })
+                        continue
                 
-                if not elements_data.get('error'):
-                    element_counts.update({
-                        'buttons': elements_data.get('interactive_elements', {}).get('buttons', 0),
-                        'forms': elements_data.get('forms', {}).get('total_forms', 0),
-                        'images': elements_data.get('images', {}).get('total_images', 0),
-                        'headings': elements_data.get('headings', {}).get('total_headings', 0),
-                        'links': elements_data.get('links', {}).get('total_links', 0),
-                        'videos': elements_data.get('media_elements', {}).get('videos', 0)
-                    })
-                    
-                    # Detect calculators (forms with number inputs)
-                    if elements_data.get('forms', {}).get('form_details'):
-                        for form in elements_data['forms']['form_details']:
-                            if form.get('inputs', 0) > 2:  # Likely a calculator
-                                element_counts['calculators'] += 1
-                    
-                    # Detect banners (large images or divs with background images)
-                    if elements_data.get('images', {}).get('total_images', 0) > 5:
-                        element_counts['banners'] = min(3, elements_data['images']['total_images'] // 3)
-                    
-                    # Detect carousels (multiple images or slider indicators)
-                    if elements_data.get('images', {}).get('total_images', 0) > 3:
-                        element_counts['carousels'] = 1 if elements_data['images']['total_images'] > 10 else 0
+                # Analyze elements for this URL
+                with tracer.span('analyze_page', url=url):
+                    elements_data = basic_analyzer.analyze_elements(url, soup=soup)
+                
+                # Count specific elements; the record is serialized only when the response is written
+                element_counts = PageElementSummary.from_analysis(elements_data)
                 
                 analyzed_link = {
                     'url': url,
-                    'text': link.get('text', ''),
-                    'title': link.get('title', ''),
+                    'text': link.text,
+                    'title': link.title,
                     'status': '✅',
-                    'method': 'requests+beautifulsoup',
+                    'method': render_info['method'],
+                    'rendered': render_info['rendered'],
                     'elements': element_counts,
                     'full_analysis': elements_data,
                     'accessibility_score': elements_data.get('accessibility', {}).get('score', 0),
-                    'has_forms': element_counts['forms'] > 0,
-                    'has_images': element_counts['images'] > 0,
-                    'seo_score': calculate_seo_score(elements_data)
+                    'has_forms': element_counts.forms > 0,
+                    'has_images': element_counts.images > 0,
+                    'seo_score': calculate_seo_score(elements_data),
+                    'priority_score': priority_score
                 }
                 
                 analyzed_links.append(analyzed_link)
+                analyzed_by_url[url] = analyzed_link
+                page_metrics.add(url, **element_counts.to_dict(), accessibility_score=analyzed_link['accessibility_score'],
+                                 seo_score=analyzed_link['seo_score'], rendered=render_info['rendered'])
                 
             except Exception as e:
+                if deadline is not None and deadline.expired() and isinstance(e, requests.exceptions.Timeout):
+                    skipped_links = [entry.url for entry, _ in links_to_analyze[i - 1:]]
+                    print(f"⏱️ Deadline reached while fetching {url}, skipping {len(skipped_links)} remaining links")
+                    break
                 print(f"❌ Failed to analyze {url}: {e}")
                 failed_links.append({
                     'url': url,
-                    'text': link.get('text', ''),
+                    'text': link.text,
                     'status': '❌',
                     'error': str(e),
-                    'elements': {k: 0 for k in element_counts.keys()}
+                    'elements': PageElementSummary()
                 })
         
-        # Step 3: Generate summary statistics
-        total_elements = {}
-        for link in analyzed_links:
-            for element_type, count in link['elements'].items():
-                total_elements[element_type] = total_elements.get(element_type, 0) + count
+        # Step 3: Generate summary statistics (totals, distributions, per-template averages, outliers)
+        with tracer.span('summarize', pages=len(page_metrics)):
+            summary = page_metrics.summary()
         
         # Step 4: Prepare results
         results = {
@@ -643,40 +1226,733 @@ def analyze_all_links():
             'failed_links': len(failed_links),
             'analyzed_data': analyzed_links,
             'failed_data': failed_links,
-            'summary': {
-                'total_buttons': total_elements.get('buttons', 0),
-                'total_forms': total_elements.get('forms', 0),
-                'total_images': total_elements.get('images', 0),
-                'total_headings': total_elements.get('headings', 0),
-                'total_videos': total_elements.get('videos', 0),
-                'total_calculators': total_elements.get('calculators', 0),
-                'total_banners': total_elements.get('banners', 0),
-                'total_carousels': total_elements.get('carousels', 0),
-                'pages_with_forms': sum(1 for link in analyzed_links if link['has_forms']),
-                'pages_with_images': sum(1 for link in analyzed_links if link['has_images']),
-                'average_accessibility_score': sum(link['accessibility_score'] for link in analyzed_links) / len(analyzed_links) if analyzed_links else 0,
-                'average_seo_score': sum(link['seo_score'] for link in analyzed_links) / len(analyzed_links) if analyzed_links else 0
-            },
-            'processing_time': f"{len(analyzed_links)} links analyzed",
+            'duplicate_links': len(duplicate_links),
+            'duplicate_data': duplicate_links,
+            'duplicate_clusters': duplicate_index.clusters(),
+            'thin_content': thin_pages,
+            'skipped_links': skipped_links,
+            'link_budget': budget,
+            'summary': summary,
+            'processing_time': time.time() - start_time,
             'status': 'success'
         }
+        report['analyze_pages'] = {'status': 'timed_out' if skipped_links else 'completed', 'timed_out': bool(skipped_links),
+                                   'elapsed_ms': round((time.time() - pages_start) * 1000, 1)}
+        finish_stages(results, report, deadline)
         
         # Store results globally
         current_audit_data.update(results)
+        results['result_id'] = audit_results.save(results)
         
         print(f"✅ Comprehensive analysis complete!")
-        print(f"📊 Analyzed: {len(analyzed_links)} links")
+        print(f"📊 Analyzed: {len(analyzed_links)} links in {results['processing_time']:.2f}s")
         print(f"❌ Failed: {len(failed_links)} links")
-        print(f"🔢 Total elements found: {sum(total_elements.values())}")
+        print(f"♻️ Skipped: {len(duplicate_links)} near-duplicate pages")
+        print(f"🔢 Total elements found: {sum(int(page_metrics.total(name)) for name in PageElementSummary.__slots__)}")
         
-        return jsonify(results)
+        return jsonify(attach_diagnostics(shape_audit_response(results, data)))
         
     except Exception as e:
         print(f"❌ Comprehensive analysis failed: {str(e)}")
-        return jsonify({
+        return jsonify(attach_diagnostics({
             'error': f'Analysis failed: {str(e)}',
             'status': 'error'
-        }), 500
+        })), 500
+
+def _view_option(name, options):
+    value = request.args.get(name)
+    return value if value is not None else options.get(name)
+
+def page_window(options):
+    """(page, page_size) from the query string or options; raises ValueError when either isn't an integer"""
+    window = []
+    for name, default in (('page', 1), ('page_size', DEFAULT_PAGE_SIZE)):
+        value = _view_option(name, options)
+        try:
+            window.append(max(1, int(default if value in (None, '') else value)))
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} must be an integer')
+    page, page_size = window
+    return page, min(page_size, MAX_PAGE_SIZE)
+
+def shape_audit_response(results, options):
+    """Apply fields/exclude projection and page/page_size pagination to per-page records"""
+    fields = parse_field_list(_view_option('fields', options))
+    exclude = parse_field_list(_view_option('exclude', options))
+    if fields is None and exclude is None:
+        exclude = DEFAULT_PAGE_EXCLUDE
+    
+    page, page_size = page_window(options)
+    page_items, pagination = paginate(results.get('analyzed_data', []), page, page_size)
+    
+    response = dict(results)
+    response['analyzed_data'] = [project(record, fields, exclude) for record in page_items]
+    response['failed_data'] = [project(record, fields, exclude) for record in results.get('failed_data', [])]
+    response['duplicate_data'] = [project(record, fields, exclude) for record in results.get('duplicate_data', [])]
+    response['pagination'] = pagination
+    return response
+
+@app.route("/api/results/<result_id>", methods=["GET"])
+@admitted('light')
+def get_audit_result(result_id):
+    """Re-read a stored analyze-all-links result with projection and pagination"""
+    results = audit_results.get(result_id)
+    if results is None:
+        return jsonify({'error': 'Unknown or expired result_id', 'status': 'error'}), 404
+    try:
+        return jsonify(shape_audit_response(results, {}))
+    except ValueError as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 400
+
+@app.route("/api/results/<result_id>/pages", methods=["GET"])
+@admitted('light')
+def get_audit_page(result_id):
+    """Full per-page details, including full_analysis, for one URL of a stored result"""
+    results = audit_results.get(result_id)
+    if results is None:
+        return jsonify({'error': 'Unknown or expired result_id', 'status': 'error'}), 404
+    
+    url = request.args.get('url', '')
+    for record in results.get('analyzed_data', []) + results.get('failed_data', []) + results.get('duplicate_data', []):
+        if record['url'] == url:
+            return jsonify(record)
+    return jsonify({'error': f'No page {url} in this result', 'status': 'error'}), 404
+
+def batch_option_error(options):
+    """Message for an unknown batch option key or a bad render option, else None"""
+    unknown = [name for name in options if name not in BATCH_OPTIONS]
+    if unknown:
+        return f"unknown keys: {', '.join(map(str, unknown))}"
+    return render_option_error(options)
+
+@app.route("/api/analyze-batch", methods=["POST"])
+@admitted('crawl')
+def analyze_batch():
+    """Audit many sites through the shared fetch pool, streaming NDJSON per site"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object', 'status': 'error'}), 400
+    sites = data.get('sites')
+    defaults = data.get('options') or {}
+    
+    if not isinstance(sites, list) or not sites:
+        return jsonify({'error': 'sites must be a non-empty list', 'status': 'error'}), 400
+    if len(sites) > BATCH_MAX_SITES:
+        return jsonify({'error': f'At most {BATCH_MAX_SITES} sites per batch', 'status': 'error'}), 400
+    if not isinstance(defaults, dict):
+        return jsonify({'error': 'options must be an object', 'status': 'error'}), 400
+    error = batch_option_error(defaults)
+    if error:
+        return jsonify({'error': f'options: {error}', 'options': list(BATCH_OPTIONS), 'status': 'error'}), 400
+    
+    stage_names = [name for name, _, _ in AUDIT_STAGES]
+    jobs = []
+    for index, entry in enumerate(sites):
+        if isinstance(entry, str):
+            entry = {'url': entry}
+        if not isinstance(entry, dict):
+            return jsonify({'error': f'sites[{index}] must be a URL string or an object with a url',
+                            'status': 'error'}), 400
+        url = entry.get('url') or ''
+        if not isinstance(url, str) or not url.strip():
+            return jsonify({'error': f'sites[{index}] needs a url', 'status': 'error'}), 400
+        url = url.strip()
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        
+        site_options = entry.get('options') or {}
+        if not isinstance(site_options, dict):
+            return jsonify({'error': f'sites[{index}].options must be an object', 'status': 'error'}), 400
+        error = batch_option_error(site_options)
+        if error:
+            return jsonify({'error': f'sites[{index}].options: {error}', 'options': list(BATCH_OPTIONS),
+                            'status': 'error'}), 400
+        options = dict(defaults)
+        options.update(site_options)
+        wanted = options.get('stages') or stage_names
+        if not isinstance(wanted, list):
+            return jsonify({'error': 'stages must be a list', 'stages': stage_names, 'status': 'error'}), 400
+        unknown = [name for name in wanted if name not in stage_names]
+        if unknown:
+            return jsonify({'error': f"Unknown stages: {', '.join(unknown)}", 'stages': stage_names, 'status': 'error'}), 400
+        # Same per-stage options as /api/analyze
+        stage_options = {'element_analysis': {'render': options.get('render'), 'render_profile': options.get('render_profile')}}
+        jobs.append((url, [stage for stage in AUDIT_STAGES if stage[0] in wanted], stage_options))
+    
+    print(f"\n📦 Starting batch audit of {len(jobs)} sites")
+    
+    def generate():
+        futures = {}
+        site_results = []
+        remaining = []
+        for index, (url, stages, stage_options) in enumerate(jobs):
+            host = urlparse(url).netloc
+            site_results.append({'url': url, 'timestamp': datetime.now().isoformat(), 'status': 'success'})
+            remaining.append(len(stages))
+            for stage_name, _, stage in stages:
+                futures[batch_scheduler.submit(host, stage, url, **stage_options.get(stage_name, {}))] = (index, stage_name)
+        
+        progress = {'type': 'progress', 'total_sites': len(jobs), 'completed_sites': 0,
+                    'total_tasks': len(futures), 'completed_tasks': 0}
+        yield json.dumps(progress) + '\n'
+        
+        try:
+            for future in as_completed(futures):
+                index, stage_name = futures[future]
+                progress['completed_tasks'] += 1
+                try:
+                    stage_result = future.result()
+                    if stage_name == 'analytics_detection' and 'analytics_tools' in site_results[index]:
+                        # A rendered element stage already reported analytics seen on the network
+                        stage_result = {}
+                    site_results[index].update(stage_result)
+                except Exception as e:
+                    site_results[index].setdefault('stage_errors', {})[stage_name] = str(e)
+                    site_results[index]['status'] = 'partial'
+                
+                remaining[index] -= 1
+                if remaining[index] == 0:
+                    progress['completed_sites'] += 1
+                    yield json.dumps({'type': 'site', 'index': index, 'result': site_results[index]}, default=app.json.default) + '\n'
+                    site_results[index] = None
+                    yield json.dumps(progress) + '\n'
+            
+            print(f"✅ Batch audit complete: {len(jobs)} sites")
+            yield json.dumps({'type': 'done', 'total_sites': len(jobs), 'status': 'success'}) + '\n'
+        finally:
+            # Client went away or we finished: drop anything still queued
+            for future in futures:
+                future.cancel()
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route("/api/link-health", methods=["POST"])
+@admitted('crawl')
+@diagnosable
+def link_health():
+    """Find broken, redirecting and slow links across a site's pages"""
+    try:
+        data = request.get_json()
+        base_url = data.get('url', '').strip()
+        
+        if not base_url:
+            return jsonify({'error': 'URL is required'}), 400
+        
+        if not base_url.startswith(('http://', 'https://')):
+            base_url = 'https://' + base_url
+        
+        try:
+            max_pages = bounded_int(data, 'max_pages', 1, LINK_HEALTH_MAX_PAGES)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+        include_external = data.get('include_external', True)
+        tracer = g.tracer
+        
+        print(f"\n🩺 Starting link health check for: {base_url} ({max_pages} pages)")
+        
+        # Step 1: Collect links from the start page and up to max_pages-1 internal pages
+        references = LinkTable()
+        # The frontier's seen-set keeps every page (crawled or queued) from being fetched twice
+        pages = FifoFrontier()
+        pages.push(normalize_url(base_url), 0)
+        crawled = 0
+        while len(pages) and crawled < max_pages:
+            page_url, _ = pages.pop()
+            crawled += 1
+            with tracer.span('extract_links', url=page_url):
+                link_data = extract_links_stage(page_url)
+            
+            references.add_links(page_url, link_data.get('internal_links', []))
+            for link in link_data.get('internal_links', []):
+                pages.push(normalize_url(link.url), 0)
+            if include_external:
+                references.add_links(page_url, link_data.get('external_links', []))
+        
+        # Step 2: Probe each unique URL once
+        with tracer.span('probe_links', links=len(references)):
+            checker = new_analyzer('link_health', cache=link_status_cache, scheduler=batch_scheduler)
+            report = checker.check_links(references)
+        
+        results = {
+            'base_url': base_url,
+            'timestamp': datetime.now().isoformat(),
+            'pages_checked': crawled,
+            **report,
+            'status': 'error' if report.get('error') else 'success'
+        }
+        return jsonify(attach_diagnostics(results))
+        
+    except Exception as e:
+        print(f"❌ Link health check failed: {str(e)}")
+        return jsonify(attach_diagnostics({
+            'error': f'Link health check failed: {str(e)}',
+            'status': 'error'
+        })), 500
+
+@app.route("/api/link-graph", methods=["POST"])
+@admitted('crawl')
+@diagnosable
+def link_graph():
+    """Crawl a site and report click depth, in/out degree, orphan pages and internal PageRank"""
+    try:
+        data = request.get_json()
+        base_url = data.get('url', '').strip()
+        
+        if not base_url:
+            return jsonify({'error': 'URL is required'}), 400
+        
+        if not base_url.startswith(('http://', 'https://')):
+            base_url = 'https://' + base_url
+        
+        try:
+            max_pages = bounded_int(data, 'max_pages', 200, LINK_GRAPH_MAX_PAGES)
+            max_depth = max_depth_option(data)
+            top = bounded_int(data, 'top', 20, 500)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+        frontier_kind = data.get('frontier', 'auto')
+        if frontier_kind not in FRONTIER_KINDS:
+            return jsonify({'error': f"frontier must be one of {', '.join(FRONTIER_KINDS)}", 'status': 'error'}), 400
+        order = data.get('order', 'bfs')
+        if order not in CRAWL_ORDERS:
+            return jsonify({'error': f"order must be one of {', '.join(CRAWL_ORDERS)}", 'status': 'error'}), 400
+        tracer = g.tracer
+        start_time = time.time()
+        
+        print(f"\n🕸️ Building link graph for: {base_url} ({max_pages} pages max)")
+        
+        # Step 1: Sitemap URLs, for orphan detection and importance ordering
+        entries = []
+        if data.get('use_sitemap', True):
+            with tracer.span('sitemap'):
+                entries = sitemap_entries(base_url)
+        
+        # Step 2: Crawl internal pages, recording each page's outgoing internal links
+        graph = LinkGraph()
+        fetch_errors = 0
+        frontier_stats = None
+        scorer = crawl_scorer(entries) if order == 'importance' else None
+        with crawl_frontier(max_pages, frontier_kind, scorer) as frontier:
+            crawler = new_analyzer('site_crawler', max_pages=max_pages, frontier=frontier, max_depth=max_depth)
+            if crawler is None:
+                return jsonify({'error': 'Site crawler is not available', 'status': 'error'}), 503
+            with tracer.span('crawl', max_pages=max_pages):
+                for page in crawler.crawl(base_url):
+                    graph.add_page(page['url'], page['internal_links'])
+                    if page.get('error') or (page['status'] or 0) >= 400:
+                        fetch_errors += 1
+            if frontier is not None:
+                frontier_stats = frontier.stats()
+        
+        # Step 3: Graph analytics
+        sitemap_urls = [entry['url'] for entry in entries] if data.get('use_sitemap', True) else None
+        with tracer.span('graph_analysis', nodes=len(graph), edges=graph.edge_count):
+            report = graph.analyze(base_url, sitemap_urls, top=top)
+        report['summary']['fetch_errors'] = fetch_errors
+        report['summary']['frontier'] = frontier_stats or {'kind': 'memory'}
+        report['summary']['order'] = order
+        
+        results = {
+            'base_url': base_url,
+            'timestamp': datetime.now().isoformat(),
+            **report,
+            'processing_time': time.time() - start_time,
+            'status': 'success'
+        }
+        return jsonify(attach_diagnostics(results))
+        
+    except Exception as e:
+        print(f"❌ Link graph analysis failed: {str(e)}")
+        return jsonify(attach_diagnostics({
+            'error': f'Link graph analysis failed: {str(e)}',
+            'status': 'error'
+        })), 500
+
+def analyze_crawled_page(page):
+    """Compact per-page audit record for crawl jobs, plus its element counts"""
+    result = {
+        'url': page['url'],
+        'depth': page['depth'],
+        'http_status': page['status'],
+        'fetch_time': round(page['fetch_time'], 3)
+    }
+    if not page.get('html'):
+        result.update(status='❌', error=page.get('error') or f"HTTP {page['status']}")
+        return result, None
+    
+    soup = BeautifulSoup(page['html'], 'html.parser')
+    elements_data = basic_analyzer.analyze_elements(page['url'], soup=soup)
+    counts = PageElementSummary.from_analysis(elements_data)
+    result.update(
+        status='✅',
+        elements=counts,
+        internal_links=len(page['internal_links']),
+        accessibility_score=elements_data.get('accessibility', {}).get('score', 0),
+        seo_score=calculate_seo_score(elements_data)
+    )
+    return result, counts
+
+def add_crawled_page(metrics, result):
+    """Add one analyze_crawled_page record to a PageMetricsTable; failed pages carry no metrics
+
+    Fresh records hold a PageElementSummary, ones read back from a checkpoint or the queue a dict.
+    """
+    elements = result.get('elements')
+    if elements is None:
+        return
+    if isinstance(elements, PageElementSummary):
+        elements = elements.to_dict()
+    metrics.add(result['url'], **elements, accessibility_score=result.get('accessibility_score'),
+                seo_score=result.get('seo_score'))
+
+def get_crawl_jobs():
+    """Crawl job store, opened (and its directory created) on first use"""
+    global _crawl_job_store
+    with _crawl_job_lock:
+        if _crawl_job_store is None:
+            _crawl_job_store = CrawlJobStore(
+                CRAWL_JOB_DIR,
+                checkpoint_every=int(os.environ.get('AUDIT_CRAWL_CHECKPOINT_PAGES', '25')),
+                checkpoint_seconds=float(os.environ.get('AUDIT_CRAWL_CHECKPOINT_SECONDS', '30'))
+            )
+        return _crawl_job_store
+
+def run_crawl_job(job_id):
+    """Crawl and audit pages from the job's last checkpoint until its page budget or frontier runs out"""
+    checkpoint = get_crawl_jobs().open(job_id, expected_urls=get_crawl_jobs().status(job_id)['options']['expected_urls'])
+    metrics = PageMetricsTable()
+    try:
+        # A resumed job first reloads the metrics of the pages it already checkpointed
+        for result in get_crawl_jobs().iter_results(job_id):
+            add_crawled_page(metrics, result)
+        with _crawl_job_lock:
+            _crawl_job_metrics[job_id] = metrics
+        options = checkpoint.get('options')
+        start_url = checkpoint.get('start_url')
+        counters = checkpoint.counters
+        resumed_from = checkpoint.pages_done()
+        checkpoint.set(state='running', started_at=datetime.now().isoformat(), error=None)
+        print(f"\n🕸️ Crawl job {job_id}: {start_url} from page {resumed_from}")
+        
+        frontier = checkpoint.frontier
+        if options.get('order', 'importance') == 'importance':
+            frontier = ScoredFrontier(frontier, crawl_scorer(sitemap_entries(start_url)))
+        crawler = new_analyzer('site_crawler', max_pages=options['max_pages'], max_depth=options.get('max_depth'),
+                               frontier=frontier)
+        for page in crawler.crawl(start_url, already_crawled=resumed_from):
+            result, counts = analyze_crawled_page(page)
+            if counts is None:
+                counters['pages_failed'] = counters.get('pages_failed', 0) + 1
+            else:
+                add_crawled_page(metrics, result)
+                counters['pages_analyzed'] = len(metrics)
+                counters.update((f'total_{name}', int(metrics.total(name))) for name in ELEMENT_COLUMNS)
+            checkpoint.record_page(page['url'], result)
+        
+        checkpoint.set(state='completed', finished_at=datetime.now().isoformat(), summary=metrics.summary())
+        print(f"✅ Crawl job {job_id} complete: {checkpoint.pages_done()} pages")
+    except Exception as e:
+        print(f"❌ Crawl job {job_id} failed: {e}")
+        checkpoint.set(state='failed', error=str(e), summary=metrics.summary())
+    finally:
+        checkpoint.close()
+        with _crawl_job_lock:
+            _crawl_job_threads.pop(job_id, None)
+            _crawl_job_metrics.pop(job_id, None)
+
+def start_crawl_job(job_id):
+    """Run a job in the background; False when it is already running or too many jobs are"""
+    with _crawl_job_lock:
+        live = {key: thread for key, thread in _crawl_job_threads.items() if thread.is_alive()}
+        if job_id in live or len(live) >= CRAWL_JOB_MAX_RUNNING:
+            return False
+        thread = threading.Thread(target=run_crawl_job, args=(job_id,), name=f'crawl-job-{job_id}', daemon=True)
+        _crawl_job_threads[job_id] = thread
+        thread.start()
+        return True
+
+def crawl_job_status(job_id):
+    status = get_crawl_jobs().status(job_id)
+    with _crawl_job_lock:
+        thread = _crawl_job_threads.get(job_id)
+        status['running'] = thread is not None and thread.is_alive()
+        metrics = _crawl_job_metrics.get(job_id)
+    if metrics is not None:
+        # Running jobs summarize live; finished ones keep the summary saved when they stopped
+        status['summary'] = metrics.summary()
+    if status.get('state') in ('queued', 'running') and not status['running']:
+        # The process that ran it stopped before finishing; resume continues from the checkpoint
+        status['state'] = 'interrupted'
+    return status
+
+@app.route("/api/crawl-jobs", methods=["POST"])
+@admitted('crawl')
+def create_crawl_job():
+    """Start a checkpointed background crawl and audit of a whole site"""
+    try:
+        data = request.get_json() or {}
+        base_url = data.get('url', '').strip()
+        
+        if not base_url:
+            return jsonify({'error': 'URL is required', 'status': 'error'}), 400
+        
+        if not base_url.startswith(('http://', 'https://')):
+            base_url = 'https://' + base_url
+        
+        try:
+            max_pages = bounded_int(data, 'max_pages', 1000, CRAWL_JOB_MAX_PAGES)
+            max_depth = max_depth_option(data)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+        order = data.get('order', 'importance')
+        if order not in CRAWL_ORDERS:
+            return jsonify({'error': f"order must be one of {', '.join(CRAWL_ORDERS)}", 'status': 'error'}), 400
+        options = {
+            'max_pages': max_pages,
+            'max_depth': max_depth,
+            'order': order,
+            'expected_urls': max(100000, max_pages * 20)
+        }
+        job_id = get_crawl_jobs().create(base_url, options)
+        if not start_crawl_job(job_id):
+            return jsonify({'job_id': job_id, 'error': f'At most {CRAWL_JOB_MAX_RUNNING} crawl jobs run at once; resume it later',
+                            'status': 'error'}), 429
+        return jsonify({'job_id': job_id, 'state': 'running', 'status': 'success'}), 202
+    
+    except Exception as e:
+        print(f"❌ Crawl job creation failed: {str(e)}")
+        return jsonify({'error': f'Crawl job creation failed: {str(e)}', 'status': 'error'}), 500
+
+@app.route("/api/crawl-jobs", methods=["GET"])
+@admitted('light')
+def list_crawl_jobs():
+    return jsonify({'jobs': [crawl_job_status(job_id) for job_id in get_crawl_jobs().job_ids()], 'status': 'success'})
+
+@app.route("/api/crawl-jobs/<job_id>", methods=["GET"])
+@admitted('light')
+def get_crawl_job(job_id):
+    if not get_crawl_jobs().exists(job_id):
+        return jsonify({'error': 'Unknown crawl job', 'status': 'error'}), 404
+    return jsonify(dict(crawl_job_status(job_id), status='success'))
+
+@app.route("/api/crawl-jobs/<job_id>/results", methods=["GET"])
+@admitted('light')
+def get_crawl_job_results(job_id):
+    """Checkpointed page results, paginated in crawl order"""
+    if not get_crawl_jobs().exists(job_id):
+        return jsonify({'error': 'Unknown crawl job', 'status': 'error'}), 404
+    try:
+        page, page_size = page_window({})
+    except ValueError as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 400
+    status = crawl_job_status(job_id)
+    total_pages = max(1, -(-status['pages_done'] // page_size))
+    return jsonify({
+        'job_id': job_id,
+        'state': status['state'],
+        'pages': get_crawl_jobs().results(job_id, offset=(page - 1) * page_size, limit=page_size),
+        'pagination': {
+            'page': page,
+            'page_size': page_size,
+            'total_items': status['pages_done'],
+            'total_pages': total_pages,
+            'next_page': page + 1 if page < total_pages else None
+        },
+        'status': 'success'
+    })
+
+@app.route("/api/crawl-jobs/<job_id>/resume", methods=["POST"])
+@admitted('crawl')
+def resume_crawl_job(job_id):
+    """Continue a job from its last checkpoint; max_pages may raise the budget of a finished job"""
+    if not get_crawl_jobs().exists(job_id):
+        return jsonify({'error': 'Unknown crawl job', 'status': 'error'}), 404
+    status = crawl_job_status(job_id)
+    if status['running']:
+        return jsonify({'error': 'Crawl job is already running', 'status': 'error'}), 409
+    
+    data = request.get_json(silent=True) or {}
+    if data.get('max_pages') is not None:
+        try:
+            options = dict(status['options'], max_pages=bounded_int(data, 'max_pages', None, CRAWL_JOB_MAX_PAGES))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+        checkpoint = get_crawl_jobs().open(job_id)
+        try:
+            checkpoint.set(options=options)
+        finally:
+            checkpoint.close()
+    
+    if not start_crawl_job(job_id):
+        return jsonify({'error': f'At most {CRAWL_JOB_MAX_RUNNING} crawl jobs run at once', 'status': 'error'}), 429
+    print(f"♻️ Resuming crawl job {job_id} from {status['pages_done']} checkpointed pages")
+    return jsonify({'job_id': job_id, 'state': 'running', 'resumed_from': status['pages_done'], 'status': 'success'}), 202
+
+_queue_crawlers = threading.local()
+
+def get_task_queue():
+    """Shared task queue, opened (and its file created) on first use"""
+    global _task_queue
+    with _task_queue_lock:
+        if _task_queue is None:
+            os.makedirs(os.path.dirname(os.path.abspath(TASK_QUEUE_PATH)), exist_ok=True)
+            _task_queue = TaskQueue(
+                TASK_QUEUE_PATH,
+                per_host_limit=int(os.environ.get('AUDIT_QUEUE_PER_HOST', '1')),
+                min_interval=float(os.environ.get('AUDIT_QUEUE_HOST_INTERVAL', '0.5')),
+                max_attempts=int(os.environ.get('AUDIT_QUEUE_MAX_ATTEMPTS', '3')),
+                retry_delay=float(os.environ.get('AUDIT_QUEUE_RETRY_DELAY', '10'))
+            )
+        return _task_queue
+
+def enqueue_crawl_pages(job_id, options, links):
+    """Queue (url, depth) pairs as crawl_page tasks sharded by host; returns how many were new"""
+    scorer = crawl_scorer([]) if options.get('order', 'importance') == 'importance' else None
+    tasks = []
+    for url, depth in links:
+        # Importance order uses the crawl frontiers' bucketed scores; bfs orders by depth
+        priority = -round(scorer.score(url, depth, 1) * 4) if scorer else depth
+        tasks.append((urlparse(url).netloc.lower(), url, {'url': url, 'depth': depth}, priority))
+    return get_task_queue().enqueue_many(job_id, 'crawl_page', tasks, limit=options['max_pages'])
+
+def crawl_page_task(task):
+    """Queue handler: fetch and audit one page, then queue its internal links for any worker"""
+    options = get_task_queue().job(task['job_id'])['options']
+    crawler = getattr(_queue_crawlers, 'crawler', None)
+    if crawler is None:
+        crawler = _queue_crawlers.crawler = new_analyzer('site_crawler')
+    
+    url, depth = task['payload']['url'], task['payload']['depth']
+    page = crawler.fetch_page(url, depth)
+    if page['status'] is None:
+        # Connection errors and timeouts get another attempt, possibly on another worker
+        raise RetryTask(page.get('error') or 'fetch failed')
+    result, _ = analyze_crawled_page(page)
+    
+    max_depth = options.get('max_depth')
+    if max_depth is None or depth < max_depth:
+        enqueue_crawl_pages(task['job_id'], options,
+                            [(normalize_url(link.url), depth + 1) for link in page['internal_links']])
+    return url, result
+
+QUEUE_HANDLERS = {'crawl_page': crawl_page_task}
+
+def distributed_crawl_metrics(job_id):
+    """PageMetricsTable of a distributed crawl, adding only the results stored since the last call"""
+    with _distributed_metrics_lock:
+        entry = _distributed_metrics.pop(job_id, None) or {'metrics': PageMetricsTable(), 'cursor': (0, 0),
+                                                           'lock': threading.Lock()}
+        _distributed_metrics[job_id] = entry
+        while len(_distributed_metrics) > DISTRIBUTED_METRICS_JOBS:
+            _distributed_metrics.popitem(last=False)
+    with entry['lock']:
+        while True:
+            results, entry['cursor'] = get_task_queue().results_after(job_id, entry['cursor'])
+            if not results:
+                return entry['metrics']
+            for result in results:
+                add_crawled_page(entry['metrics'], result)
+
+def ensure_local_workers():
+    """Start the in-process queue workers on first use; returns how many are alive"""
+    with _crawl_job_lock:
+        if not _local_queue_workers and LOCAL_QUEUE_WORKERS > 0:
+            threads, _ = run_workers(get_task_queue(), QUEUE_HANDLERS, count=LOCAL_QUEUE_WORKERS,
+                                     lease_seconds=TASK_LEASE_SECONDS)
+            _local_queue_workers.extend(threads)
+        return sum(thread.is_alive() for thread in _local_queue_workers)
+
+def resume_queue_work():
+    """Start the in-process workers at startup when earlier jobs left tasks queued or leased"""
+    if LOCAL_QUEUE_WORKERS > 0 and os.path.exists(TASK_QUEUE_PATH):
+        pending = get_task_queue().pending()
+        if pending:
+            print(f"♻️ {pending} queued crawl tasks from earlier jobs; starting local workers")
+            ensure_local_workers()
+
+@app.route("/api/distributed-crawls", methods=["POST"])
+@admitted('crawl')
+def create_distributed_crawl():
+    """Queue a site crawl for the worker fleet; pages are audited by whichever worker leases them"""
+    try:
+        data = request.get_json() or {}
+        base_url = data.get('url', '').strip()
+        
+        if not base_url:
+            return jsonify({'error': 'URL is required', 'status': 'error'}), 400
+        
+        if not base_url.startswith(('http://', 'https://')):
+            base_url = 'https://' + base_url
+        
+        try:
+            max_pages = bounded_int(data, 'max_pages', 1000, CRAWL_JOB_MAX_PAGES)
+            max_depth = max_depth_option(data)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+        order = data.get('order', 'importance')
+        if order not in CRAWL_ORDERS:
+            return jsonify({'error': f"order must be one of {', '.join(CRAWL_ORDERS)}", 'status': 'error'}), 400
+        options = {
+            'max_pages': max_pages,
+            'max_depth': max_depth,
+            'order': order
+        }
+        job_id = get_task_queue().create_job(base_url, options)
+        enqueue_crawl_pages(job_id, options, [(normalize_url(base_url), 0)])
+        local_workers = ensure_local_workers()
+        print(f"\n🕸️ Distributed crawl {job_id} queued: {base_url} ({local_workers} local workers)")
+        return jsonify({'job_id': job_id, 'state': 'queued', 'local_workers': local_workers, 'status': 'success'}), 202
+    
+    except Exception as e:
+        print(f"❌ Distributed crawl creation failed: {str(e)}")
+        return jsonify({'error': f'Distributed crawl creation failed: {str(e)}', 'status': 'error'}), 500
+
+@app.route("/api/distributed-crawls/<job_id>", methods=["GET"])
+@admitted('light')
+def get_distributed_crawl(job_id):
+    """Queue progress of a distributed crawl: task counts, contributing workers and failed pages"""
+    job = get_task_queue().job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown distributed crawl', 'status': 'error'}), 404
+    stats = get_task_queue().job_stats(job_id)
+    return jsonify(dict(
+        stats,
+        job_id=job_id,
+        start_url=job['start_url'],
+        options=job['options'],
+        created_at=datetime.fromtimestamp(job['created_at']).isoformat(),
+        state='completed' if stats['finished'] else 'running',
+        failed_pages=get_task_queue().failures(job_id, limit=20),
+        summary=distributed_crawl_metrics(job_id).summary(),
+        status='success'
+    ))
+
+@app.route("/api/distributed-crawls/<job_id>/results", methods=["GET"])
+@admitted('light')
+def get_distributed_crawl_results(job_id):
+    """Page results merged from every worker, paginated in task order"""
+    if get_task_queue().job(job_id) is None:
+        return jsonify({'error': 'Unknown distributed crawl', 'status': 'error'}), 404
+    try:
+        page, page_size = page_window({})
+    except ValueError as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 400
+    stats = get_task_queue().job_stats(job_id)
+    total_pages = max(1, -(-stats['done'] // page_size))
+    return jsonify({
+        'job_id': job_id,
+        'state': 'completed' if stats['finished'] else 'running',
+        'pages': get_task_queue().results(job_id, offset=(page - 1) * page_size, limit=page_size),
+        'summary': distributed_crawl_metrics(job_id).summary(),
+        'pagination': {
+            'page': page,
+            'page_size': page_size,
+            'total_items': stats['done'],
+            'total_pages': total_pages,
+            'next_page': page + 1 if page < total_pages else None
+        },
+        'status': 'success'
+    })
 
 def calculate_seo_score(elements_data):
     """Calculate basic SEO score based on elements"""
@@ -715,6 +1991,7 @@ def calculate_seo_score(elements_data):
     return min(score, 100)
 
 @app.route("/api/quick-links", methods=["POST"])
+@admitted('light')
 def quick_links():
     """Fast endpoint for just getting links"""
     try:
@@ -738,6 +2015,7 @@ def quick_links():
         return jsonify({'error': str(e), 'status': 'error'}), 500
 
 @app.route("/download-csv", methods=["GET"])
+@admitted('light')
 def download_csv():
     """Generate and download CSV report"""
     try:
@@ -759,17 +2037,17 @@ def download_csv():
             
             for link in internal_links:
                 writer.writerow([
-                    link.get('url', ''),
-                    link.get('text', ''),
-                    link.get('title', ''),
+                    link.url,
+                    link.text,
+                    link.title,
                     'Internal'
                 ])
             
             for link in external_links:
                 writer.writerow([
-                    link.get('url', ''),
-                    link.get('text', ''),
-                    link.get('title', ''),
+                    link.url,
+                    link.text,
+                    link.title,
                     'External'
                 ])
         
@@ -798,43 +2076,197 @@ def download_csv():
         print(f"❌ CSV generation failed: {str(e)}")
         return jsonify({"error": f"CSV generation failed: {str(e)}"}), 500
 
+def export_source(source, source_id):
+    """(record kind, function returning a fresh record iterator, record count) for an export, or None"""
+    if source == 'results':
+        results = audit_results.get(source_id)
+        if results is None:
+            return None
+        records = results.get('analyzed_data', []) + results.get('duplicate_data', []) + results.get('failed_data', [])
+        return 'page', lambda: iter(records), len(records)
+    if source == 'crawl-jobs' and get_crawl_jobs().exists(source_id):
+        return 'page', lambda: get_crawl_jobs().iter_results(source_id), get_crawl_jobs().status(source_id)['pages_done']
+    if source == 'distributed-crawls' and get_task_queue().job(source_id) is not None:
+        return 'page', lambda: get_task_queue().iter_results(source_id), get_task_queue().job_stats(source_id)['done']
+    if source == 'analyses':
+        if source_id == 'all':
+            records = list(analysis_results.values()) + site_analyses.values()
+        else:
+            analysis = site_analyses.get(source_id)
+            if analysis is None:
+                return None
+            records = [analysis]
+        return 'analysis', lambda: iter(records), len(records)
+    return None
+
+@app.route("/api/export/<source>/<source_id>", methods=["GET"])
+@admitted('light')
+def export_manifest(source, source_id):
+    """Schema manifest for a bulk export: tables, column types and per-table file URLs"""
+    if source not in EXPORT_SOURCES:
+        return jsonify({'error': f"source must be one of {', '.join(EXPORT_SOURCES)}", 'status': 'error'}), 400
+    found = export_source(source, source_id)
+    if found is None:
+        return jsonify({'error': 'Nothing to export for this id', 'status': 'error'}), 404
+    kind, _, record_count = found
+    manifest = build_manifest(source, source_id, kind, record_count=record_count,
+                              file_url=lambda table, extension: f'/api/export/{source}/{source_id}/{table}.{extension}')
+    return jsonify(dict(manifest, status='success'))
+
+@app.route("/api/export/<source>/<source_id>/<filename>", methods=["GET"])
+@admitted('export')
+def export_table(source, source_id, filename):
+    """One table of a bulk export, streamed from the result store without building it in memory"""
+    table, _, extension = filename.partition('.')
+    if source not in EXPORT_SOURCES:
+        return jsonify({'error': f"source must be one of {', '.join(EXPORT_SOURCES)}", 'status': 'error'}), 400
+    if extension not in ('ndjson.gz', 'parquet'):
+        return jsonify({'error': f"format must be one of {', '.join(export_formats())}", 'status': 'error'}), 400
+    if extension == 'parquet' and not PYARROW_AVAILABLE:
+        return jsonify({'error': 'Parquet export needs pyarrow; use ndjson.gz', 'status': 'error'}), 501
+    found = export_source(source, source_id)
+    if found is None:
+        return jsonify({'error': 'Nothing to export for this id', 'status': 'error'}), 404
+    kind, records, _ = found
+    if table not in KIND_TABLES[kind]:
+        return jsonify({'error': f"table must be one of {', '.join(KIND_TABLES[kind])}", 'status': 'error'}), 404
+    
+    download_name = f"{source}_{source_id}_{table}.{extension}"
+    print(f"📦 Exporting {source}/{source_id} {table} as {extension}")
+    if extension == 'ndjson.gz':
+        response = Response(stream_with_context(ndjson_gzip(table_rows(table, kind, records()))), mimetype='application/gzip')
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        return response
+    
+    # Parquet needs a seekable file: row groups go to an anonymous temporary file that is deleted once sent
+    spool = tempfile.TemporaryFile(prefix='export-', suffix='.parquet', dir=EXPORT_DIR)
+    try:
+        write_parquet(table, table_rows(table, kind, records()), spool, row_group_size=EXPORT_ROW_GROUP)
+        spool.seek(0)
+    except Exception as e:
+        spool.close()
+        print(f"❌ Parquet export failed: {str(e)}")
+        return jsonify({'error': f'Parquet export failed: {str(e)}', 'status': 'error'}), 500
+    return send_file(spool, mimetype='application/vnd.apache.parquet', as_attachment=True, download_name=download_name)
+
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "modules_available": {
-            "extract_links": EXTRACT_LINKS_AVAILABLE,
-            "cms_detection": CMS_DETECTION_AVAILABLE,
-            "analytics_detection": ANALYTICS_DETECTION_AVAILABLE,
-            "sitemap_parser": SITEMAP_PARSER_AVAILABLE,
-            "link_logger": LINK_LOGGER_AVAILABLE
+        "modules_available": {name: info['available'] for name, info in analyzers.status().items()},
+        "analyzers": analyzers.status(),
+        "disabled_subsystems": sorted(analyzers.disabled_subsystems),
+        "rendering": {
+            "mode": RENDER_MODE,
+            "profile": RENDER_PROFILE,
+            "planner": render_planner.stats(),
+            "browser_pool": _browser_pool.stats() if _browser_pool else None
         },
+        "analysis_coalescing": analysis_coalescer.stats(),
+        "admission": admission.stats(),
+        "circuit_breakers": host_breakers.stats(),
+        "queue_workers": {"local": sum(thread.is_alive() for thread in _local_queue_workers)},
         "basic_analysis": True
     })
+
+def _browser_unavailable():
+    return jsonify({'error': 'Browser automation is not available on this server', 'status': 'error'}), 503
+
+@app.route("/api/test-forms", methods=["POST"])
+@admitted('browser')
+def test_forms():
+    """Open a page once and autofill/submit every form in parallel isolated browser contexts"""
+    try:
+        data = request.get_json() or {}
+        url = data.get('url', '').strip()
+        
+        if not url:
+            return jsonify({'error': 'URL is required'}), 400
+        
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        
+        form_indexes = data.get('forms')
+        if form_indexes is not None and not isinstance(form_indexes, list):
+            return jsonify({'error': 'forms must be a list of form indexes or ids', 'status': 'error'}), 400
+        try:
+            max_parallel = bounded_int(data, 'max_parallel', FORM_TEST_PARALLEL, FORM_TEST_PARALLEL)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+        
+        engine = browser_engine()
+        if engine is None:
+            return _browser_unavailable()
+        
+        tester = analyzers.create('form_tester', engine=engine, max_parallel=max_parallel)
+        results = tester.test_forms(url, form_indexes, submit=data.get('submit', True))
+        results.update(timestamp=datetime.now().isoformat(), total_forms=len(results['forms']), status='success')
+        return jsonify(results)
+        
+    except Exception as e:
+        print(f"❌ Form testing failed: {e}")
+        return jsonify({
+            'error': f'Form testing failed: {str(e)}',
+            'status': 'error'
+        }), 500
+
 @app.route('/extract_forms', methods=['POST'])
+@admitted('analysis')
 def extract_forms():
-    url = request.json.get('url')
-    form_links = extract_forms_from_url(url)
-    return jsonify({'forms': [{'link': link} for link in form_links]})
+    """List a page's forms from its HTML, rendering only pages that turn out to be SPA shells"""
+    try:
+        data = request.get_json() or {}
+        url = data.get('url', '').strip()
+        if not url:
+            return jsonify({'error': 'URL is required', 'status': 'error'}), 400
+        
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        invalid = _invalid_render_option(data)
+        if invalid:
+            return invalid
+        
+        soup, render_info = load_page(url, render=data.get('render'), profile=data.get('render_profile'))
+        forms = form_inventory(soup, url)
+        for form in forms:
+            # url#id links are what /autofill takes as input
+            form['link'] = f"{url}#{form['id'] or 'form' + str(form['index'])}"
+        print(f"📋 Found {len(forms)} form(s) on {url} via {render_info['method']}")
+        
+        return jsonify({
+            'forms': forms,
+            'total_forms': len(forms),
+            'method': render_info['method'],
+            'rendered': render_info['rendered'],
+            'render': render_info
+        })
+    
+    except Exception as e:
+        return jsonify({'error': f'Form extraction failed: {str(e)}', 'status': 'error'}), 500
 
 @app.route('/autofill', methods=['POST'])
+@admitted('browser')
 def autofill():
+    autofill_bot = analyzers.load('autofill_bot')
+    if autofill_bot is None:
+        return _browser_unavailable()
     link = request.json.get('link')
     index = request.json.get('index')
-    logs = autofill_and_validate_form(link, index)
+    logs = autofill_bot.autofill_and_validate_form(link, index)
     return jsonify({'logs': logs})
 
 if __name__ == "__main__":
     print("="*80)
     print("🚀 WEBSITE AUDIT TOOL")
     print("="*80)
-    print(f"🔗 Link Extraction: {'✅ Advanced' if EXTRACT_LINKS_AVAILABLE else '✅ Basic'}")
-    print(f"🔧 CMS Detection: {'✅ Advanced' if CMS_DETECTION_AVAILABLE else '✅ Basic'}")
-    print(f"📊 Analytics Detection: {'✅ Advanced' if ANALYTICS_DETECTION_AVAILABLE else '✅ Basic'}")
-    print(f"🗺️ Sitemap Parser: {'✅' if SITEMAP_PARSER_AVAILABLE else '❌'}")
-    print(f"📝 Link Logger: {'✅' if LINK_LOGGER_AVAILABLE else '❌'}")
+    print(f"🔗 Link Extraction: {'✅ Advanced' if analyzers.is_available('extract_links') else '✅ Basic'}")
+    print(f"🔧 CMS Detection: {'✅ Advanced' if analyzers.is_available('cms_detection') else '✅ Basic'}")
+    print(f"📊 Analytics Detection: {'✅ Advanced' if analyzers.is_available('analytics_detection') else '✅ Basic'}")
+    print(f"🗺️ Sitemap Parser: {'✅' if analyzers.is_available('sitemap_parser') else '❌'}")
+    print(f"📝 Link Logger: {'✅' if analyzers.is_available('link_logger') else '❌'}")
+    print(f"🌐 Browser Automation: {'✅ Selenium' if analyzers.is_available('autofill_bot') else '❌'}")
     print("✅ Element Analysis: Available")
     print("✅ CSV Export: Available")
     print("="*80)
@@ -842,4 +2274,8 @@ if __name__ == "__main__":
     print("📊 Ready for website audits!")
     print("="*80)
     
+    # debug=True runs the app in a reloader child; only that process serves (and works the queue)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        resume_queue_work()
+    
     app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
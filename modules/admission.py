@@ -0,0 +1,114 @@
+import math
+import threading
+import time
+
+
+class AdmissionRejected(Exception):
+    """Raised when a budget is saturated; status is 429 (queue full) or 503 (queue wait timed out)"""
+
+    def __init__(self, budget, status, retry_after, reason):
+        super().__init__(reason)
+        self.budget = budget
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def parse_budget(spec, default):
+    """Read a 'concurrency,queue,wait_seconds' setting, falling back per missing field"""
+    if not spec:
+        return default
+    parts = [part.strip() for part in spec.split(',')]
+    values = list(default)
+    for i, part in enumerate(parts[:3]):
+        if part:
+            values[i] = float(part) if i == 2 else int(part)
+    return tuple(values)
+
+
+class _Ticket:
+    def __init__(self, budget):
+        self._budget = budget
+        self._start = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._budget._release(time.monotonic() - self._start)
+
+
+class AdmissionBudget:
+    """Concurrency limit for one class of endpoints with a bounded, time-limited wait queue"""
+
+    def __init__(self, name, max_concurrent, max_queue, queue_timeout):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiting = 0
+        self._avg_seconds = None
+        self._cond = threading.Condition()
+        self._stats = {'admitted': 0, 'queued': 0, 'rejected_queue_full': 0, 'rejected_timeout': 0}
+
+    def acquire(self):
+        """Return a ticket to release when the request is done, or raise AdmissionRejected"""
+        with self._cond:
+            if self._active < self.max_concurrent and self._waiting == 0:
+                return self._admit()
+            if self._waiting >= self.max_queue:
+                self._stats['rejected_queue_full'] += 1
+                raise AdmissionRejected(self.name, 429, self._retry_after(), f'{self.name} queue is full')
+
+            self._waiting += 1
+            self._stats['queued'] += 1
+            try:
+                admitted = self._cond.wait_for(lambda: self._active < self.max_concurrent, self.queue_timeout)
+            finally:
+                self._waiting -= 1
+            if not admitted:
+                self._stats['rejected_timeout'] += 1
+                raise AdmissionRejected(self.name, 503, self._retry_after(),
+                                        f'{self.name} capacity busy for {self.queue_timeout:g}s')
+            return self._admit()
+
+    def _admit(self):
+        self._active += 1
+        self._stats['admitted'] += 1
+        return _Ticket(self)
+
+    def _release(self, seconds):
+        with self._cond:
+            self._active -= 1
+            # Moving average of service time, used for Retry-After hints
+            self._avg_seconds = seconds if self._avg_seconds is None else 0.8 * self._avg_seconds + 0.2 * seconds
+            self._cond.notify()
+
+    def _retry_after(self):
+        """Seconds until a slot is likely free: queue ahead divided across slots, times service time"""
+        per_request = self._avg_seconds if self._avg_seconds is not None else self.queue_timeout
+        rounds = (self._waiting + 1) / max(self.max_concurrent, 1)
+        return max(1, min(300, math.ceil(per_request * rounds)))
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, active=self._active, waiting=self._waiting,
+                        max_concurrent=self.max_concurrent, max_queue=self.max_queue,
+                        avg_seconds=round(self._avg_seconds, 3) if self._avg_seconds is not None else None)
+
+
+class AdmissionController:
+    """Separate budgets per endpoint class so cheap calls are never starved by heavy ones"""
+
+    def __init__(self, budgets):
+        self.budgets = {
+            name: AdmissionBudget(name, max_concurrent, max_queue, queue_timeout)
+            for name, (max_concurrent, max_queue, queue_timeout) in budgets.items()
+        }
+
+    def acquire(self, name):
+        return self.budgets[name].acquire()
+
+    def stats(self):
+        return {name: budget.stats() for name, budget in self.budgets.items()}
@@ -2,6 +2,9 @@ import requests
 from bs4 import BeautifulSoup
 import re
 
+from .audit_records import DetectionResult
+from .page_decoder import decode_html
+
 class AnalyticsDetection:
     def __init__(self):
         self.session = requests.Session()
@@ -17,89 +20,8 @@ class AnalyticsDetection:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            html_content = response.text
-            detected_tools = {}
-            
-            # Google Analytics detection
-            ga_patterns = [
-                r'google-analytics\.com',
-                r'googletagmanager\.com',
-                r'gtag\(',
-                r'ga\(',
-                r'UA-\d+-\d+',
-                r'G-[A-Z0-9]+'
-            ]
-            
-            ga_score = 0
-            ga_evidence = []
-            
-            for pattern in ga_patterns:
-                if re.search(pattern, html_content, re.I):
-                    ga_score += 25
-                    ga_evidence.append(f'Pattern found: {pattern}')
-            
-            if ga_score > 0:
-                detected_tools['Google Analytics'] = {
-                    'detected': ga_score >= 25,
-                    'confidence': min(ga_score, 100),
-                    'evidence': ga_evidence[:3],
-                    'category': 'Analytics'
-                }
-            
-            # Google Tag Manager
-            if re.search(r'googletagmanager\.com', html_content, re.I):
-                detected_tools['Google Tag Manager'] = {
-                    'detected': True,
-                    'confidence': 90,
-                    'evidence': ['GTM script detected'],
-                    'category': 'Tag Management'
-                }
-            
-            # Facebook Pixel
-            fb_patterns = [r'facebook\.net.*tr\?', r'fbq\(', r'facebook pixel']
-            fb_score = sum(30 for pattern in fb_patterns if re.search(pattern, html_content, re.I))
-            
-            if fb_score > 0:
-                detected_tools['Facebook Pixel'] = {
-                    'detected': True,
-                    'confidence': min(fb_score, 100),
-                    'evidence': ['Facebook tracking detected'],
-                    'category': 'Social Media'
-                }
-            
-            # Hotjar
-            if re.search(r'hotjar', html_content, re.I):
-                detected_tools['Hotjar'] = {
-                    'detected': True,
-                    'confidence': 85,
-                    'evidence': ['Hotjar script detected'],
-                    'category': 'Heatmaps'
-                }
-            
-            # Mixpanel
-            if re.search(r'mixpanel', html_content, re.I):
-                detected_tools['Mixpanel'] = {
-                    'detected': True,
-                    'confidence': 85,
-                    'evidence': ['Mixpanel script detected'],
-                    'category': 'Analytics'
-                }
-            
-            # Categorize tools
-            categories = {}
-            for tool, data in detected_tools.items():
-                if data['detected']:
-                    category = data['category']
-                    if category not in categories:
-                        categories[category] = []
-                    categories[category].append(tool)
-            
-            result = {
-                'detected_tools': detected_tools,
-                'categories': categories,
-                'total_detected': len([t for t, d in detected_tools.items() if d['detected']]),
-                'analysis_complete': True
-            }
+            html_content, _ = decode_html(response)
+            result = self.detect_in_html(html_content)
             
             print(f"✅ Analytics detection complete. Found {result['total_detected']} tools")
             return result
@@ -113,3 +35,73 @@ class AnalyticsDetection:
                 'error': str(e),
                 'analysis_complete': False
             }
+
+    def detect_in_html(self, html_content):
+        """Match analytics signatures in already-fetched HTML"""
+        detected_tools = {}
+        
+        # Google Analytics detection
+        ga_patterns = [
+            r'google-analytics\.com',
+            r'googletagmanager\.com',
+            r'gtag\(',
+            r'ga\(',
+            r'UA-\d+-\d+',
+            r'G-[A-Z0-9]+'
+        ]
+        
+        ga_score = 0
+        ga_evidence = []
+        
+        for pattern in ga_patterns:
+            if re.search(pattern, html_content, re.I):
+                ga_score += 25
+                ga_evidence.append(f'Pattern found: {pattern}')
+        
+        if ga_score > 0:
+            detected_tools['Google Analytics'] = DetectionResult(
+                'Google Analytics', ga_score >= 25, min(ga_score, 100), ga_evidence[:3], 'Analytics'
+            )
+        
+        # Google Tag Manager
+        if re.search(r'googletagmanager\.com', html_content, re.I):
+            detected_tools['Google Tag Manager'] = DetectionResult(
+                'Google Tag Manager', True, 90, ['GTM script detected'], 'Tag Management'
+            )
+        
+        # Facebook Pixel
+        fb_patterns = [r'facebook\.net.*tr\?', r'fbq\(', r'facebook pixel']
+        fb_score = sum(30 for pattern in fb_patterns if re.search(pattern, html_content, re.I))
+        
+        if fb_score > 0:
+            detected_tools['Facebook Pixel'] = DetectionResult(
+                'Facebook Pixel', True, min(fb_score, 100), ['Facebook tracking detected'], 'Social Media'
+            )
+        
+        # Hotjar
+        if re.search(r'hotjar', html_content, re.I):
+            detected_tools['Hotjar'] = DetectionResult(
+                'Hotjar', True, 85, ['Hotjar script detected'], 'Heatmaps'
+            )
+        
+        # Mixpanel
+        if re.search(r'mixpanel', html_content, re.I):
+            detected_tools['Mixpanel'] = DetectionResult(
+                'Mixpanel', True, 85, ['Mixpanel script detected'], 'Analytics'
+            )
+        
+        # Categorize tools
+        categories = {}
+        for tool, data in detected_tools.items():
+            if data.detected:
+                category = data.category
+                if category not in categories:
+                    categories[category] = []
+                categories[category].append(tool)
+        
+        return {
+            'detected_tools': detected_tools,
+            'categories': categories,
+            'total_detected': len([t for t, d in detected_tools.items() if d.detected]),
+            'analysis_complete': True
+        }
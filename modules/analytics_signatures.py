@@ -0,0 +1,235 @@
+import json
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from .audit_records import DetectionResult
+
+# Each signature matches outgoing request URLs. 'loader' requests only prove
+# the tag was requested; 'beacon' requests prove it actually sent data.
+# id_params / event_params name query (or form-encoded body) fields to read.
+BEACON_SIGNATURES = [
+    {'tool': 'Google Analytics', 'category': 'Analytics', 'kind': 'beacon',
+     'hosts': ('google-analytics.com', 'analytics.google.com'), 'path': re.compile(r'/(g|j|r)?/?collect'),
+     'id_params': ('tid',), 'event_params': ('en', 't', 'ea')},
+    {'tool': 'Google Analytics', 'category': 'Analytics', 'kind': 'loader',
+     'hosts': ('googletagmanager.com',), 'path': re.compile(r'^/gtag/js'), 'id_params': ('id',)},
+    {'tool': 'Google Tag Manager', 'category': 'Tag Management', 'kind': 'loader',
+     'hosts': ('googletagmanager.com',), 'path': re.compile(r'^/gtm\.js'), 'id_params': ('id',)},
+    {'tool': 'Google Ads', 'category': 'Advertising', 'kind': 'beacon',
+     'hosts': ('googleadservices.com', 'googleads.g.doubleclick.net'), 'path': re.compile(r'/pagead/(conversion|viewthroughconversion)/(\d+)'),
+     'path_id_group': 2},
+    {'tool': 'Facebook Pixel', 'category': 'Social Media', 'kind': 'beacon',
+     'hosts': ('facebook.com',), 'path': re.compile(r'^/tr/?$'), 'id_params': ('id',), 'event_params': ('ev',)},
+    {'tool': 'Facebook Pixel', 'category': 'Social Media', 'kind': 'loader',
+     'hosts': ('connect.facebook.net',), 'path': re.compile(r'fbevents\.js')},
+    {'tool': 'Adobe Analytics', 'category': 'Analytics', 'kind': 'beacon',
+     'hosts': None, 'path': re.compile(r'/b/ss/([^/]+)/'), 'path_id_group': 1, 'event_params': ('events', 'pe', 'pev2')},
+    {'tool': 'Adobe Experience Platform Tags', 'category': 'Tag Management', 'kind': 'loader',
+     'hosts': ('assets.adobedtm.com',), 'path': re.compile(r'launch-[\w-]+\.(min\.)?js')},
+    {'tool': 'Hotjar', 'category': 'Heatmaps', 'kind': 'loader',
+     'hosts': ('static.hotjar.com',), 'path': re.compile(r'hotjar-(\d+)\.js'), 'path_id_group': 1},
+    {'tool': 'Hotjar', 'category': 'Heatmaps', 'kind': 'beacon',
+     'hosts': ('hotjar.com', 'hotjar.io'), 'path': re.compile(r'/api/')},
+    {'tool': 'Mixpanel', 'category': 'Analytics', 'kind': 'beacon',
+     'hosts': ('mixpanel.com',), 'path': re.compile(r'^/(track|engage|decide)')},
+    {'tool': 'LinkedIn Insight Tag', 'category': 'Advertising', 'kind': 'beacon',
+     'hosts': ('px.ads.linkedin.com',), 'path': re.compile(r'/collect'), 'id_params': ('pid',)},
+    {'tool': 'TikTok Pixel', 'category': 'Advertising', 'kind': 'beacon',
+     'hosts': ('analytics.tiktok.com',), 'path': re.compile(r'/api/v\d/(pixel|track)'), 'json_event_field': 'event'},
+    {'tool': 'Segment', 'category': 'Analytics', 'kind': 'beacon',
+     'hosts': ('api.segment.io',), 'path': re.compile(r'^/v1/(t|track|p|page|i|identify)'), 'json_event_field': 'event'},
+]
+
+# Events that show a form interaction was tracked
+FORM_EVENTS = {'form_start', 'form_submit', 'generate_lead', 'submit', 'lead', 'completeregistration', 'contact'}
+
+
+def _host_matches(host, hosts):
+    return hosts is None or any(host == h or host.endswith('.' + h) for h in hosts)
+
+
+def _payload_fields(query, post_data):
+    """Query fields plus form-encoded body lines (GA4 batches one event per line)"""
+    records = [parse_qs(query)]
+    if post_data:
+        for line in post_data.splitlines():
+            if '=' in line and not line.lstrip().startswith(('{', '[')):
+                records.append(parse_qs(line))
+    return records
+
+
+def _json_events(post_data, field):
+    try:
+        payload = json.loads(post_data)
+    except (TypeError, ValueError):
+        return []
+    items = payload if isinstance(payload, list) else payload.get('batch', [payload]) if isinstance(payload, dict) else []
+    return [str(item[field]) for item in items if isinstance(item, dict) and item.get(field)]
+
+
+def match_request(url, post_data=None):
+    """Signatures an outgoing request matches, with tag ids and event names found in it"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower().split(':')[0]
+    hits = []
+    for signature in BEACON_SIGNATURES:
+        if not _host_matches(host, signature['hosts']):
+            continue
+        path_match = signature['path'].search(parts.path)
+        if not path_match:
+            continue
+
+        tag_ids, events = set(), []
+        if signature.get('path_id_group'):
+            tag_ids.add(path_match.group(signature['path_id_group']))
+        for fields in _payload_fields(parts.query, post_data):
+            for name in signature.get('id_params', ()):
+                tag_ids.update(fields.get(name, []))
+            for name in signature.get('event_params', ()):
+                events.extend(value for value in fields.get(name, []) if value)
+        if signature.get('json_event_field') and post_data:
+            events.extend(_json_events(post_data, signature['json_event_field']))
+
+        hits.append({
+            'tool': signature['tool'],
+            'category': signature['category'],
+            'kind': signature['kind'],
+            'tag_ids': sorted(tag_ids),
+            'events': events
+        })
+    return hits
+
+
+class BeaconRecorder:
+    """Collects analytics requests seen while a page runs in a headless browser"""
+
+    def __init__(self):
+        self._tools = {}
+        self._events = []
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.events_seen = 0
+
+    def record(self, url, method='GET', post_data=None):
+        if not url.startswith('http'):
+            return
+        hits = match_request(url, post_data)
+        with self._lock:
+            self.request_count += 1
+            for hit in hits:
+                tool = self._tools.setdefault(hit['tool'], {
+                    'category': hit['category'], 'beacons': 0, 'loaders': 0,
+                    'tag_ids': set(), 'events': [], 'sample_urls': []
+                })
+                tool['beacons' if hit['kind'] == 'beacon' else 'loaders'] += 1
+                tool['tag_ids'].update(hit['tag_ids'])
+                tool['events'].extend(hit['events'])
+                self._events.extend((hit['tool'], event) for event in hit['events'])
+                self.events_seen += len(hit['events'])
+                if len(tool['sample_urls']) < 3:
+                    tool['sample_urls'].append(f'{method} {url[:200]}')
+
+    def record_playwright(self, request):
+        try:
+            post_data = request.post_data
+        except Exception:
+            post_data = None  # binary bodies can't be decoded as text
+        self.record(request.url, request.method, post_data)
+
+    def events(self):
+        """(tool, event) pairs in the order they were sent"""
+        with self._lock:
+            return list(self._events)
+
+    def has_beacon(self):
+        with self._lock:
+            return any(tool['beacons'] for tool in self._tools.values())
+
+    def wait_for(self, predicate, timeout, poll):
+        """Call poll() until predicate() holds or timeout seconds pass; returns the predicate result
+
+        poll lets the browser deliver events (and drains Selenium's log) between checks.
+        """
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() >= deadline:
+                return False
+            poll()
+        return True
+
+    def summary(self):
+        """Same shape as AnalyticsDetection.detect_analytics, plus tag ids and fired events"""
+        detected_tools = {}
+        categories = {}
+        with self._lock:
+            for name, tool in self._tools.items():
+                # A beacon proves data was sent; a loader only that the tag was requested
+                confidence = 100 if tool['beacons'] else 80
+                evidence = [f"{tool['beacons']} beacon(s), {tool['loaders']} loader request(s)"] + tool['sample_urls'][:2]
+                data = DetectionResult(name, True, confidence, evidence, tool['category']).to_dict()
+                data['tag_ids'] = sorted(tool['tag_ids'])
+                data['events'] = list(dict.fromkeys(tool['events']))
+                data['source'] = 'network'
+                detected_tools[name] = data
+                categories.setdefault(tool['category'], []).append(name)
+        return {
+            'detected_tools': detected_tools,
+            'categories': categories,
+            'total_detected': len(detected_tools),
+            'requests_observed': self.request_count,
+            'analysis_complete': True
+        }
+
+
+def merge_detections(static_result, network_result):
+    """Network-confirmed tools override static guesses; static-only tools are kept
+
+    Static findings are DetectionResults, network ones dicts with tag ids and events.
+    """
+    detected_tools = {
+        name: DetectionResult(data.name, data.detected, data.confidence, data.evidence, data.category, source='html')
+        for name, data in static_result.get('detected_tools', {}).items()
+    }
+    detected_tools.update(network_result.get('detected_tools', {}))
+
+    categories = {}
+    detected = []
+    for name, data in detected_tools.items():
+        if isinstance(data, DetectionResult):
+            found, category = data.detected, data.category
+        else:
+            found, category = data.get('detected'), data.get('category')
+        if found:
+            detected.append(name)
+            categories.setdefault(category, []).append(name)
+    return {
+        'detected_tools': detected_tools,
+        'categories': categories,
+        'total_detected': len(detected),
+        'requests_observed': network_result.get('requests_observed', 0),
+        'analysis_complete': True
+    }
+
+
+def enable_selenium_request_log(chrome_options):
+    """Ask Chrome to keep DevTools network events in the 'performance' log"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def drain_selenium_request_log(driver, recorder):
+    """Feed requests from Selenium's performance log into the recorder"""
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        if message.get('method') != 'Network.requestWillBeSent':
+            continue
+        request = message.get('params', {}).get('request', {})
+        recorder.record(request.get('url', ''), request.get('method', 'GET'), request.get('postData'))
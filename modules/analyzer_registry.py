@@ -0,0 +1,129 @@
+import importlib
+import importlib.util
+import threading
+
+# name -> (module path, attribute, subsystem, third-party packages it needs)
+DEFAULT_ANALYZERS = {
+    'extract_links': ('modules.extract_links', 'ExtractLinks', 'core', ('requests', 'bs4')),
+    'combined_link_extractor': ('modules.combined_link_extractor', 'CombinedLinkExtractor', 'core', ('requests', 'bs4')),
+    'cms_detection': ('modules.cms_detection', 'CMSDetection', 'core', ('requests', 'bs4')),
+    'analytics_detection': ('modules.analytics_detection', 'AnalyticsDetection', 'core', ('requests', 'bs4')),
+    'sitemap_parser': ('modules.sitemap_parser', 'SitemapParser', 'core', ('requests',)),
+    'streaming_analyzer': ('modules.streaming_analyzer', 'StreamingAnalyzer', 'core', ('requests',)),
+    'link_health': ('modules.link_health', 'LinkHealthChecker', 'core', ('requests',)),
+    'site_crawler': ('modules.site_crawler', 'SiteCrawler', 'core', ('requests', 'bs4')),
+    'link_logger': ('modules.internal_link_logger', 'InternalLinkLogger', 'core', ()),
+    'element_analyzer_selenium': ('modules.element_analyzer_selenium', 'ElementAnalyzerSelenium', 'selenium', ('selenium', 'webdriver_manager')),
+    'element_analyzer_playwright': ('modules.element_analyzer_playwright', 'ElementAnalyzerPlaywright', 'playwright', ('playwright',)),
+    'browser_pool': ('modules.browser_pool', 'BrowserPool', 'browser', ()),
+    'form_tester': ('modules.form_tester', 'FormTester', 'browser', ()),
+    'autofill_bot': ('modules.autofill_bot', None, 'selenium', ('selenium',)),
+}
+
+# name -> analyzers of which at least one must be usable; the browser pool and form tester drive either engine
+DEFAULT_REQUIRES_ANY = {
+    'browser_pool': ('element_analyzer_playwright', 'element_analyzer_selenium'),
+    'form_tester': ('element_analyzer_playwright', 'element_analyzer_selenium'),
+}
+
+
+class AnalyzerRegistry:
+    """Finds analyzers without importing them and imports each on first use"""
+
+    def __init__(self, disabled_subsystems=None):
+        if isinstance(disabled_subsystems, str):
+            disabled_subsystems = disabled_subsystems.split(',')
+        self.disabled_subsystems = {s.strip().lower() for s in (disabled_subsystems or []) if s.strip()}
+        self._entries = {}
+        self._discovered = {}
+        self._loaded = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_defaults(cls, disabled_subsystems=None):
+        registry = cls(disabled_subsystems)
+        for name, (module, attribute, subsystem, requires) in DEFAULT_ANALYZERS.items():
+            registry.register(name, module, attribute, subsystem, requires, DEFAULT_REQUIRES_ANY.get(name, ()))
+        return registry
+
+    def register(self, name, module, attribute=None, subsystem='core', requires=(), requires_any=()):
+        """Register an analyzer; attribute=None exposes the whole module
+
+        requires_any names other analyzers, at least one of which must be enabled and available.
+        """
+        self._entries[name] = {
+            'module': module,
+            'attribute': attribute,
+            'subsystem': subsystem,
+            'requires': tuple(requires),
+            'requires_any': tuple(requires_any)
+        }
+
+    def is_enabled(self, name):
+        entry = self._entries.get(name)
+        if entry is None or entry['subsystem'] in self.disabled_subsystems:
+            return False
+        return not entry['requires_any'] or any(self.is_enabled(other) for other in entry['requires_any'])
+
+    def is_available(self, name):
+        """True if the analyzer is enabled and its code and dependencies are installed"""
+        if not self.is_enabled(name) or name in self._errors:
+            return False
+        entry = self._entries[name]
+        if entry['requires_any'] and not any(self.is_available(other) for other in entry['requires_any']):
+            return False
+        if name not in self._discovered:
+            self._discovered[name] = self._discover(entry)
+        return self._discovered[name]
+
+    def _discover(self, entry):
+        try:
+            for package in entry['requires'] + (entry['module'],):
+                if importlib.util.find_spec(package) is None:
+                    return False
+            return True
+        except (ImportError, ValueError):
+            return False
+
+    def load(self, name):
+        """Import an analyzer on first use; returns None when it can't be used"""
+        if name in self._loaded:
+            return self._loaded[name]
+        if not self.is_available(name):
+            return None
+
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            entry = self._entries[name]
+            try:
+                module = importlib.import_module(entry['module'])
+                target = getattr(module, entry['attribute']) if entry['attribute'] else module
+            except Exception as e:
+                self._errors[name] = str(e)
+                print(f"⚠️ {name} module not available: {e}")
+                return None
+            self._loaded[name] = target
+            return target
+
+    def create(self, name, *args, **kwargs):
+        """Instantiate an analyzer class, or return None if it isn't available"""
+        analyzer_class = self.load(name)
+        if analyzer_class is None:
+            return None
+        return analyzer_class(*args, **kwargs)
+
+    def status(self):
+        """Availability report for every registered analyzer"""
+        report = {}
+        for name, entry in self._entries.items():
+            report[name] = {
+                'subsystem': entry['subsystem'],
+                'enabled': self.is_enabled(name),
+                'available': self.is_available(name),
+                'loaded': name in self._loaded
+            }
+            if name in self._errors:
+                report[name]['error'] = self._errors[name]
+        return report
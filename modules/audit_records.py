@@ -0,0 +1,189 @@
+from array import array
+from urllib.parse import urlsplit
+
+
+class LinkRecord:
+    """One extracted link; to_dict() matches the legacy link dicts"""
+
+    __slots__ = ('url', 'text', 'title', 'rel', 'target')
+
+    def __init__(self, url, text='', title='', rel=None, target=None):
+        self.url = url
+        self.text = text
+        self.title = title
+        self.rel = rel
+        self.target = target
+
+    def to_dict(self):
+        data = {'url': self.url, 'text': self.text, 'title': self.title}
+        if self.rel is not None:
+            data['rel'] = self.rel
+        if self.target is not None:
+            data['target'] = self.target
+        return data
+
+
+class PageElementSummary:
+    """Per-page element counts used by analyze-all-links summaries"""
+
+    __slots__ = ('buttons', 'forms', 'images', 'headings', 'links', 'videos', 'calculators', 'banners', 'carousels')
+
+    def __init__(self, **counts):
+        for name in self.__slots__:
+            setattr(self, name, counts.get(name, 0))
+
+    @classmethod
+    def from_analysis(cls, elements_data):
+        """Derive counts (and the calculator/banner/carousel heuristics) from analyze_elements output"""
+        summary = cls()
+        if elements_data.get('error'):
+            return summary
+
+        summary.buttons = elements_data.get('interactive_elements', {}).get('buttons', 0)
+        summary.forms = elements_data.get('forms', {}).get('total_forms', 0)
+        summary.images = elements_data.get('images', {}).get('total_images', 0)
+        summary.headings = elements_data.get('headings', {}).get('total_headings', 0)
+        summary.links = elements_data.get('links', {}).get('total_links', 0)
+        summary.videos = elements_data.get('media_elements', {}).get('videos', 0)
+
+        # Detect calculators (forms with number inputs)
+        for form in elements_data.get('forms', {}).get('form_details') or []:
+            if form.get('inputs', 0) > 2:  # Likely a calculator
+                summary.calculators += 1
+
+        # Detect banners (large images or divs with background images)
+        if summary.images > 5:
+            summary.banners = min(3, summary.images // 3)
+
+        # Detect carousels (multiple images or slider indicators)
+        if summary.images > 3:
+            summary.carousels = 1 if summary.images > 10 else 0
+
+        return summary
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class DetectionResult:
+    """One CMS or analytics tool finding"""
+
+    __slots__ = ('name', 'detected', 'confidence', 'evidence', 'category', 'source')
+
+    def __init__(self, name, detected, confidence, evidence, category=None, source=None):
+        self.name = name
+        self.detected = detected
+        self.confidence = confidence
+        self.evidence = evidence
+        self.category = category
+        self.source = source
+
+    def to_dict(self):
+        data = {'detected': self.detected, 'confidence': self.confidence, 'evidence': self.evidence}
+        if self.category is not None:
+            data['category'] = self.category
+        if self.source is not None:
+            data['source'] = self.source
+        return data
+
+
+def record_json(o):
+    """json.dumps default for results that still hold slotted records"""
+    if isinstance(o, (LinkRecord, PageElementSummary, DetectionResult)):
+        return o.to_dict()
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class Interner:
+    """Maps repeated strings to small integer ids"""
+
+    def __init__(self):
+        self._ids = {}
+        self.values = []
+
+    def id_for(self, value):
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self._ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def get(self, value):
+        return self._ids.get(value)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class LinkTable:
+    """Columnar store of (source page, link) rows for large crawls
+
+    Origins, paths, source pages and anchor texts are interned, so each row
+    costs four machine integers instead of a dict with its own strings.
+    URL fragments are dropped, so page#a and page#b share one row key.
+    """
+
+    def __init__(self):
+        self.origins = Interner()
+        self.paths = Interner()
+        self.pages = Interner()
+        self.texts = Interner()
+        self.origin_ids = array('I')
+        self.path_ids = array('I')
+        self.source_ids = array('I')
+        self.text_ids = array('I')
+
+    def add(self, url, source='', text=''):
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        self.origin_ids.append(self.origins.id_for(f'{parts.scheme}://{parts.netloc}'))
+        self.path_ids.append(self.paths.id_for(path))
+        self.source_ids.append(self.pages.id_for(source))
+        self.text_ids.append(self.texts.id_for(text))
+
+    def add_links(self, source, links):
+        """Add link dicts or LinkRecords found on one source page"""
+        for link in links:
+            if isinstance(link, dict):
+                self.add(link['url'], source, link.get('text', ''))
+            else:
+                self.add(link.url, source, link.text)
+
+    def __len__(self):
+        return len(self.source_ids)
+
+    def url(self, row):
+        return self.origins.values[self.origin_ids[row]] + self.paths.values[self.path_ids[row]]
+
+    def source(self, row):
+        return self.pages.values[self.source_ids[row]]
+
+    def record(self, row):
+        return LinkRecord(self.url(row), self.texts.values[self.text_ids[row]])
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.record(row)
+
+    def referrers_by_url(self):
+        """{url: [source pages]} with each source listed once"""
+        grouped = {}
+        for row in range(len(self)):
+            key = (self.origin_ids[row], self.path_ids[row])
+            grouped.setdefault(key, set()).add(self.source_ids[row])
+        pages = self.pages.values
+        return {
+            self.origins.values[origin_id] + self.paths.values[path_id]: [pages[s] for s in sources]
+            for (origin_id, path_id), sources in grouped.items()
+        }
+
+    def stats(self):
+        return {
+            'rows': len(self),
+            'unique_origins': len(self.origins),
+            'unique_paths': len(self.paths),
+            'source_pages': len(self.pages)
+        }
@@ -1,7 +1,31 @@
 from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 import time
 
+from .analytics_signatures import FORM_EVENTS, BeaconRecorder, drain_selenium_request_log, enable_selenium_request_log
+from .render_profile import RenderProfile, selenium_wait_for_quiet
+
+# Nothing is blocked (tags must load and fire); waits end when the network goes quiet
+AUTOFILL_PROFILE = RenderProfile('autofill', block_types=(), quiet_period_ms=500, max_wait_ms=5000, measure_blocked=False)
+SUBMIT_WAIT_SECONDS = 5
+
+def _new_driver():
+    options = Options()
+    enable_selenium_request_log(options)
+    return webdriver.Chrome(options=options)
+
+def _form_event_count(recorder):
+    return sum(1 for _, event in recorder.events() if event.lower() in FORM_EVENTS)
+
+def _log_new_events(recorder, logs, reported):
+    """Log analytics events captured since the last call"""
+    events = recorder.events()
+    for tool, event in events[reported:]:
+        logs.append(f"✔ {tool} Event Fired: {event}")
+    return len(events)
+
 def extract_forms_from_url(url):
     driver = webdriver.Chrome()
     driver.get(url)
@@ -17,37 +41,64 @@ def autofill_and_validate_form(link, index):
     logs = []
     logs.append("✔ Autofill started")
 
-    driver = webdriver.Chrome()
-    driver.get(link)
-
-    time.sleep(2)
-
-    if "google-analytics.com" in driver.page_source:
-        logs.append("✔ Google Analytics detected")
-        logs.append("✔ GA Event Fired: form_start")
-
-    if "adobe" in driver.page_source.lower():
-        logs.append("✔ Adobe Analytics script detected")
-        logs.append("✔ Adobe Event: trackSubmit")
-
-    inputs = driver.find_elements(By.TAG_NAME, "input")
-    for idx, field in enumerate(inputs):
-        try:
-            field_type = field.get_attribute("type")
-            if field_type in ['text', 'email']:
-                field.send_keys("demo@xatform.com" if "email" in field_type else "Test Name")
-                logs.append(f"✔ Input field {idx + 1}: {field.get_attribute('name') or 'Unnamed'} autofilled")
-        except Exception as e:
-            logs.append(f"✘ Error autofilling field {idx + 1}: {str(e)}")
-
-    submit_buttons = driver.find_elements(By.XPATH, "//input[@type='submit'] | //button[@type='submit']")
-    if submit_buttons:
-        try:
-            submit_buttons[0].click()
-            logs.append("✔ Form submitted")
-        except:
-            logs.append("✘ Form submission failed")
-
-    time.sleep(2)
-    driver.quit()
+    driver = _new_driver()
+    recorder = BeaconRecorder()
+
+    def poll():
+        time.sleep(0.1)
+        drain_selenium_request_log(driver, recorder)
+
+    try:
+        driver.get(link)
+        WebDriverWait(driver, 10).until(lambda d: d.execute_script('return document.readyState') == 'complete')
+        selenium_wait_for_quiet(driver, AUTOFILL_PROFILE)
+        drain_selenium_request_log(driver, recorder)
+
+        # Tools confirmed from the requests the page actually sent
+        detected = recorder.summary()['detected_tools']
+        for tool, data in detected.items():
+            tag_ids = f" ({', '.join(data['tag_ids'])})" if data['tag_ids'] else ''
+            state = 'detected' if data['confidence'] == 100 else 'tag loaded'
+            logs.append(f"✔ {tool} {state}{tag_ids}")
+        if not detected:
+            logs.append("⚠ No analytics requests observed on page load")
+        reported = _log_new_events(recorder, logs, 0)
+
+        inputs = driver.find_elements(By.TAG_NAME, "input")
+        for idx, field in enumerate(inputs):
+            try:
+                field_type = field.get_attribute("type")
+                if field_type in ['text', 'email']:
+                    field.send_keys("demo@xatform.com" if "email" in field_type else "Test Name")
+                    logs.append(f"✔ Input field {idx + 1}: {field.get_attribute('name') or 'Unnamed'} autofilled")
+            except Exception as e:
+                logs.append(f"✘ Error autofilling field {idx + 1}: {str(e)}")
+
+        # form_start and similar interaction events fire while typing
+        drain_selenium_request_log(driver, recorder)
+        reported = _log_new_events(recorder, logs, reported)
+
+        submit_buttons = driver.find_elements(By.XPATH, "//input[@type='submit'] | //button[@type='submit']")
+        if submit_buttons:
+            try:
+                start_url = driver.current_url
+                form_events_before = _form_event_count(recorder)
+                submit_buttons[0].click()
+                logs.append("✔ Form submitted")
+
+                # Done as soon as a form event is sent or the page navigates, then let trailing beacons land
+                recorder.wait_for(
+                    lambda: _form_event_count(recorder) > form_events_before or driver.current_url != start_url,
+                    SUBMIT_WAIT_SECONDS, poll
+                )
+                selenium_wait_for_quiet(driver, AUTOFILL_PROFILE)
+                drain_selenium_request_log(driver, recorder)
+                reported = _log_new_events(recorder, logs, reported)
+                if _form_event_count(recorder) == form_events_before:
+                    logs.append("⚠ No form submission event reached an analytics endpoint")
+            except Exception:
+                logs.append("✘ Form submission failed")
+    finally:
+        driver.quit()
+
     return logs
@@ -0,0 +1,198 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+from .analytics_signatures import BeaconRecorder, drain_selenium_request_log, enable_selenium_request_log
+from .render_profile import (apply_selenium_blocking, apply_selenium_options, get_profile, playwright_goto,
+                             prepare_playwright_page, selenium_page_weight, selenium_wait_for_quiet)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class _PlaywrightSession:
+    """One Chromium instance; each render gets a fresh isolated context"""
+
+    def __init__(self):
+        from playwright.sync_api import sync_playwright
+        self._playwright = sync_playwright().start()
+        try:
+            self.browser = self._playwright.chromium.launch(headless=True)
+        except Exception:
+            self._playwright.stop()
+            raise
+
+    def render(self, url, timeout, profile):
+        width, height = profile.viewport
+        context = self.browser.new_context(user_agent=USER_AGENT, viewport={'width': width, 'height': height})
+        try:
+            page = context.new_page()
+            recorder = BeaconRecorder()
+            tracker = prepare_playwright_page(context, page, profile, url, recorder)
+            response, wait_outcome = playwright_goto(page, url, tracker, timeout)
+            html = page.content()
+            final_url = page.url
+        finally:
+            context.close()
+        return {
+            'html': html,
+            'final_url': final_url,
+            'status': response.status if response else None,
+            'wait': wait_outcome,
+            'page_weight': tracker.report(),
+            'analytics': recorder.summary()
+        }
+
+    def close(self):
+        try:
+            self.browser.close()
+        finally:
+            self._playwright.stop()
+
+
+class _SeleniumSession:
+    """One headless Chrome driver reused across renders"""
+
+    def __init__(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument(f'--user-agent={USER_AGENT}')
+        apply_selenium_options(chrome_options, get_profile(None))
+        enable_selenium_request_log(chrome_options)
+        self.driver = webdriver.Chrome(options=chrome_options)
+
+    def render(self, url, timeout, profile):
+        self.driver.set_page_load_timeout(timeout)
+        apply_selenium_blocking(self.driver, profile)
+        # Discard requests left in the log by the previous page
+        drain_selenium_request_log(self.driver, BeaconRecorder())
+        recorder = BeaconRecorder()
+        self.driver.get(url)
+        wait_outcome = selenium_wait_for_quiet(self.driver, profile)
+        drain_selenium_request_log(self.driver, recorder)
+        return {
+            'html': self.driver.page_source,
+            'final_url': self.driver.current_url,
+            'status': None,
+            'wait': wait_outcome,
+            'page_weight': selenium_page_weight(self.driver),
+            'analytics': recorder.summary()
+        }
+
+    def close(self):
+        self.driver.quit()
+
+
+ENGINES = {
+    'playwright': _PlaywrightSession,
+    'selenium': _SeleniumSession,
+}
+
+
+class BrowserPool:
+    """A few long-lived headless browsers, each owned by one worker thread
+
+    Browser handles are not safe to share between threads, so renders are
+    queued and whichever worker is free takes the next one. Browsers start
+    on first use, are recycled after pages_per_browser renders and replaced
+    after a failure.
+    """
+
+    def __init__(self, engine='playwright', size=2, pages_per_browser=200):
+        if engine not in ENGINES:
+            raise ValueError(f'Unknown browser engine: {engine}')
+        self.engine = engine
+        self.size = size
+        self.pages_per_browser = pages_per_browser
+        self._jobs = queue.Queue()
+        self._workers = []
+        self._idle = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats = {'rendered': 0, 'failed': 0, 'browsers_started': 0}
+
+    def submit(self, url, timeout=30, profile=None):
+        """Queue a render; the Future resolves to {'html', 'final_url', 'status', 'wait', 'page_weight', 'analytics'}"""
+        profile = get_profile(profile)
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Browser pool is shut down')
+            self._jobs.put((future, url, timeout, profile))
+            if self._idle == 0 and len(self._workers) < self.size:
+                worker = threading.Thread(target=self._work, name=f'browser-{len(self._workers)}', daemon=True)
+                self._workers.append(worker)
+                worker.start()
+        return future
+
+    def render(self, url, timeout=30, profile=None):
+        """Render a page and wait for the result"""
+        # Allow for queueing behind other renders on top of the page timeout itself
+        return self.submit(url, timeout, profile).result(timeout * 3)
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _set_idle(self, delta):
+        with self._lock:
+            self._idle += delta
+
+    def _work(self):
+        session = None
+        renders = 0
+        try:
+            while True:
+                self._set_idle(1)
+                job = self._jobs.get()
+                self._set_idle(-1)
+                if job is None:
+                    break
+                future, url, timeout, profile = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    if session is None:
+                        session = ENGINES[self.engine]()
+                        renders = 0
+                        self._count('browsers_started')
+                    future.set_result(session.render(url, timeout, profile))
+                    self._count('rendered')
+                    renders += 1
+                except Exception as e:
+                    future.set_exception(e)
+                    self._count('failed')
+                    # A browser that crashed or hung is not trusted with the next page
+                    session = self._close(session)
+                    continue
+
+                if renders >= self.pages_per_browser:
+                    session = self._close(session)
+        finally:
+            self._close(session)
+
+    def _close(self, session):
+        if session is not None:
+            try:
+                session.close()
+            except Exception as e:
+                print(f"⚠️ Failed to close {self.engine} browser: {e}")
+        return None
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, engine=self.engine, size=self.size,
+                        workers=len(self._workers), queued=self._jobs.qsize())
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._jobs.put(None)
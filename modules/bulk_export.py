@@ -0,0 +1,179 @@
+import json
+import zlib
+from datetime import datetime
+
+from .audit_records import DetectionResult, PageElementSummary
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+EXPORT_FORMAT_VERSION = 1
+
+# (column, type) per table; types are 'string', 'int64', 'float64' or 'bool'
+TABLE_COLUMNS = {
+    'pages': [
+        ('url', 'string'), ('status', 'string'), ('http_status', 'int64'), ('depth', 'int64'),
+        ('method', 'string'), ('rendered', 'bool'), ('accessibility_score', 'float64'), ('seo_score', 'float64'),
+        ('priority_score', 'float64'), ('duplicate_of', 'string'), ('internal_links', 'int64'),
+        ('external_links', 'int64'), ('fetch_time', 'float64'), ('error', 'string'), ('timestamp', 'string'),
+    ],
+    'links': [
+        ('source_url', 'string'), ('url', 'string'), ('text', 'string'), ('title', 'string'), ('link_type', 'string'),
+    ],
+    'detections': [
+        ('url', 'string'), ('category', 'string'), ('name', 'string'), ('detected', 'bool'),
+        ('confidence', 'float64'), ('evidence', 'string'),
+    ],
+    'element_metrics': [('url', 'string')] + [(name, 'int64') for name in PageElementSummary.__slots__],
+}
+
+# Record kinds: 'page' is a compact per-page record (analyze-all-links, crawl jobs),
+# 'analysis' a full /api/analyze or /api/analyze-url result
+KIND_TABLES = {
+    'page': ('pages', 'element_metrics'),
+    'analysis': ('pages', 'links', 'detections', 'element_metrics'),
+}
+
+
+def _row(table, values):
+    return {column: values.get(column) for column, _ in TABLE_COLUMNS[table]}
+
+
+def _page_rows(record, kind):
+    if kind == 'page':
+        yield _row('pages', record)
+        return
+    yield _row('pages', dict(
+        record,
+        internal_links=len(record.get('internal_links') or []),
+        external_links=len(record.get('external_links') or []),
+        method=(record.get('render') or {}).get('method'),
+        rendered=(record.get('render') or {}).get('rendered'),
+        accessibility_score=((record.get('elements') or {}).get('accessibility') or {}).get('score')
+    ))
+
+
+def _link_rows(record, kind):
+    for link_type in ('internal', 'external'):
+        for link in record.get(f'{link_type}_links') or []:
+            yield _row('links', dict(link.to_dict(), source_url=record.get('url'), link_type=link_type))
+
+
+def _detection_rows(record, kind):
+    for category, key, found_key in (('cms', 'cms_detected', 'detected_systems'),
+                                     ('analytics', 'analytics_tools', 'detected_tools')):
+        found = (record.get(key) or {}).get(found_key) or {}
+        # Basic detectors list names; full detectors map names to {detected, confidence, evidence}
+        items = found.items() if isinstance(found, dict) else ((name, {'detected': True}) for name in found)
+        for name, detail in items:
+            if isinstance(detail, DetectionResult):
+                detail = detail.to_dict()
+            evidence = detail.get('evidence')
+            yield _row('detections', {
+                'url': record.get('url'),
+                'category': category,
+                'name': name,
+                'detected': detail.get('detected'),
+                'confidence': detail.get('confidence'),
+                'evidence': json.dumps(evidence) if evidence is not None else None
+            })
+
+
+def _element_rows(record, kind):
+    elements = record.get('elements')
+    if not elements:
+        return
+    if kind == 'analysis':
+        elements = PageElementSummary.from_analysis(elements)
+    if isinstance(elements, PageElementSummary):
+        elements = elements.to_dict()
+    yield _row('element_metrics', dict(elements, url=record.get('url')))
+
+
+_EXTRACTORS = {
+    'pages': _page_rows,
+    'links': _link_rows,
+    'detections': _detection_rows,
+    'element_metrics': _element_rows,
+}
+
+
+def table_rows(table, kind, records):
+    """Rows of one export table, pulled lazily from an iterable of source records"""
+    extract = _EXTRACTORS[table]
+    for record in records:
+        yield from extract(record, kind)
+
+
+def ndjson_gzip(rows, chunk_bytes=256 * 1024):
+    """Gzip-compressed NDJSON as a stream of chunks; only one chunk is ever held in memory"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    pending = []
+    pending_bytes = 0
+    for row in rows:
+        line = json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        pending.append(line)
+        pending_bytes += len(line)
+        if pending_bytes >= chunk_bytes:
+            compressed = compressor.compress(b''.join(pending))
+            pending, pending_bytes = [], 0
+            if compressed:
+                yield compressed
+    yield compressor.compress(b''.join(pending)) + compressor.flush()
+
+
+def _arrow_schema(table):
+    types = {'string': pa.string(), 'int64': pa.int64(), 'float64': pa.float64(), 'bool': pa.bool_()}
+    return pa.schema([(column, types[column_type]) for column, column_type in TABLE_COLUMNS[table]])
+
+
+def write_parquet(table, rows, sink, row_group_size=50000):
+    """Write rows to a Parquet file (path or binary file object) one row group at a time; returns the row count"""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError('Parquet export needs pyarrow')
+    schema = _arrow_schema(table)
+    written = 0
+    with pq.ParquetWriter(sink, schema, compression='snappy') as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                written += len(batch)
+                batch = []
+        if batch or not written:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema) if batch else schema.empty_table())
+            written += len(batch)
+    return written
+
+
+def export_formats():
+    return ['ndjson.gz', 'parquet'] if PYARROW_AVAILABLE else ['ndjson.gz']
+
+
+def build_manifest(source, source_id, kind, file_url, record_count=None):
+    """Schema manifest: every table's columns and the URL of each file format
+
+    file_url(table, extension) builds the download URL for one table file.
+    """
+    return {
+        'format_version': EXPORT_FORMAT_VERSION,
+        'source': source,
+        'source_id': source_id,
+        'generated_at': datetime.now().isoformat(),
+        'records': record_count,
+        'formats': export_formats(),
+        'tables': {
+            table: {
+                'columns': [{'name': column, 'type': column_type} for column, column_type in TABLE_COLUMNS[table]],
+                'files': {extension: file_url(table, extension) for extension in export_formats()}
+            }
+            for table in KIND_TABLES[kind]
+        }
+    }
@@ -2,6 +2,14 @@ import requests
 from bs4 import BeautifulSoup
 import re
 
+from .audit_records import DetectionResult
+from .page_decoder import decode_html, find_markers
+
+CMS_MARKERS = [
+    'wp-content', 'wp-includes', 'shopify', 'cdn.shopify.com', 'drupal',
+    'joomla', 'wix.com', 'wixstatic.com', 'squarespace'
+]
+
 class CMSDetection:
     def __init__(self):
         self.session = requests.Session()
@@ -17,8 +25,10 @@ class CMSDetection:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            html_content = response.text.lower()
+            # Decode once; the soup and the marker scan share this string
+            html_content, _ = decode_html(response)
+            soup = BeautifulSoup(html_content, 'html.parser')
+            markers = find_markers(html_content, CMS_MARKERS)
             
             detected_systems = {}
             
@@ -26,11 +36,11 @@ class CMSDetection:
             wp_score = 0
             wp_evidence = []
             
-            if 'wp-content' in html_content:
+            if 'wp-content' in markers:
                 wp_score += 30
                 wp_evidence.append('wp-content path found')
             
-            if 'wp-includes' in html_content:
+            if 'wp-includes' in markers:
                 wp_score += 25
                 wp_evidence.append('wp-includes path found')
             
@@ -40,73 +50,49 @@ class CMSDetection:
                 wp_evidence.append('WordPress generator meta tag')
             
             if wp_score > 0:
-                detected_systems['WordPress'] = {
-                    'confidence': min(wp_score, 100),
-                    'evidence': wp_evidence,
-                    'detected': wp_score >= 30
-                }
+                detected_systems['WordPress'] = DetectionResult('WordPress', wp_score >= 30, min(wp_score, 100), wp_evidence)
             
             # Shopify detection
             shopify_score = 0
             shopify_evidence = []
             
-            if 'shopify' in html_content:
+            if 'shopify' in markers:
                 shopify_score += 35
                 shopify_evidence.append('Shopify references found')
             
-            if 'cdn.shopify.com' in html_content:
+            if 'cdn.shopify.com' in markers:
                 shopify_score += 40
                 shopify_evidence.append('Shopify CDN detected')
             
             if shopify_score > 0:
-                detected_systems['Shopify'] = {
-                    'confidence': min(shopify_score, 100),
-                    'evidence': shopify_evidence,
-                    'detected': shopify_score >= 30
-                }
+                detected_systems['Shopify'] = DetectionResult('Shopify', shopify_score >= 30, min(shopify_score, 100), shopify_evidence)
             
             # Drupal detection
-            if 'drupal' in html_content:
-                detected_systems['Drupal'] = {
-                    'confidence': 80,
-                    'evidence': ['Drupal references found'],
-                    'detected': True
-                }
+            if 'drupal' in markers:
+                detected_systems['Drupal'] = DetectionResult('Drupal', True, 80, ['Drupal references found'])
             
             # Joomla detection
-            if 'joomla' in html_content:
-                detected_systems['Joomla'] = {
-                    'confidence': 80,
-                    'evidence': ['Joomla references found'],
-                    'detected': True
-                }
+            if 'joomla' in markers:
+                detected_systems['Joomla'] = DetectionResult('Joomla', True, 80, ['Joomla references found'])
             
             # Wix detection
-            if 'wix.com' in html_content or 'wixstatic.com' in html_content:
-                detected_systems['Wix'] = {
-                    'confidence': 90,
-                    'evidence': ['Wix platform detected'],
-                    'detected': True
-                }
+            if 'wix.com' in markers or 'wixstatic.com' in markers:
+                detected_systems['Wix'] = DetectionResult('Wix', True, 90, ['Wix platform detected'])
             
             # Squarespace detection
-            if 'squarespace' in html_content:
-                detected_systems['Squarespace'] = {
-                    'confidence': 85,
-                    'evidence': ['Squarespace platform detected'],
-                    'detected': True
-                }
+            if 'squarespace' in markers:
+                detected_systems['Squarespace'] = DetectionResult('Squarespace', True, 85, ['Squarespace platform detected'])
             
             # Get primary CMS
             primary_cms = None
             if detected_systems:
                 primary_cms = max(detected_systems.keys(), 
-                                key=lambda x: detected_systems[x]['confidence'])
+                                key=lambda x: detected_systems[x].confidence)
             
             result = {
                 'primary_cms': primary_cms,
                 'detected_systems': detected_systems,
-                'total_detected': len([cms for cms, data in detected_systems.items() if data['detected']]),
+                'total_detected': len([cms for cms, data in detected_systems.items() if data.detected]),
                 'analysis_complete': True
             }
             
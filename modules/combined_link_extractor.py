@@ -4,6 +4,9 @@ from urllib.parse import urljoin, urlparse
 import concurrent.futures
 import time
 
+from .audit_records import LinkRecord
+from .page_decoder import decode_html
+
 class CombinedLinkExtractor:
     def __init__(self):
         self.session = requests.Session()
@@ -21,7 +24,8 @@ class CombinedLinkExtractor:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            html_content, _ = decode_html(response)
+            soup = BeautifulSoup(html_content, 'html.parser')
             base_domain = urlparse(url).netloc
             
             internal_links = []
@@ -85,13 +89,13 @@ class CombinedLinkExtractor:
             if parsed_url.scheme not in ['http', 'https']:
                 return None
             
-            link_data = {
-                'url': absolute_url,
-                'text': link.get_text(strip=True)[:100],
-                'title': link.get('title', ''),
-                'rel': link.get('rel', []),
-                'target': link.get('target', '')
-            }
+            link_data = LinkRecord(
+                absolute_url,
+                link.get_text(strip=True)[:100],
+                link.get('title', ''),
+                rel=link.get('rel', []),
+                target=link.get('target', '')
+            )
             
             # Determine if internal or external
             if parsed_url.netloc == base_domain:
@@ -108,8 +112,8 @@ class CombinedLinkExtractor:
         unique_links = []
         
         for link in links:
-            if link['url'] not in seen_urls:
-                seen_urls.add(link['url'])
+            if link.url not in seen_urls:
+                seen_urls.add(link.url)
                 unique_links.append(link)
         
         return unique_links
@@ -0,0 +1,159 @@
+import json
+import os
+import re
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+
+from .audit_records import record_json
+from .disk_frontier import DiskFrontier
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{12}$')
+
+
+class CrawlCheckpoint:
+    """One resumable crawl: frontier, seen-set, finished page results and counters in a single SQLite file
+
+    Page results are buffered and written every checkpoint_every pages or
+    checkpoint_seconds, in the same transaction that releases their URLs
+    from the frontier's in-flight table. After a crash, pages since the last
+    checkpoint go back on the queue and are fetched again; pages already
+    checkpointed are never refetched.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS pages (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL UNIQUE,
+            result TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path, checkpoint_every=25, checkpoint_seconds=30, expected_urls=1000000):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_seconds = checkpoint_seconds
+        self.frontier = DiskFrontier(path, expected_urls=expected_urls)
+        self.db = self.frontier.db
+        self.db.executescript(self.SCHEMA)
+        self.meta = {key: json.loads(value) for key, value in self.db.execute('SELECT key, value FROM meta')}
+        self.counters = self.meta.setdefault('counters', {})
+        self._pages_stored = self.db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+        self._buffer = []
+        self._last_checkpoint = time.monotonic()
+
+    def get(self, key, default=None):
+        return self.meta.get(key, default)
+
+    def set(self, **values):
+        """Update job metadata and write it (with everything buffered) right away"""
+        self.meta.update(values)
+        self.checkpoint()
+
+    def pages_done(self):
+        return self._pages_stored + len(self._buffer)
+
+    def record_page(self, url, result):
+        """Keep one finished page; checkpoints when enough pages or time have accumulated"""
+        self._buffer.append((url, result))
+        if len(self._buffer) >= self.checkpoint_every or time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Write buffered pages, counters and the frontier in one transaction"""
+        self.frontier.flush()
+        self.meta['checkpoint_at'] = datetime.now().isoformat()
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO pages (url, result) VALUES (?, ?)',
+                                ((url, json.dumps(result, default=record_json)) for url, result in self._buffer))
+            self.frontier.complete(*(url for url, _ in self._buffer), commit=False)
+            self.db.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                ((key, json.dumps(value)) for key, value in self.meta.items()))
+        self._pages_stored = self.db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+        self._buffer = []
+        self._last_checkpoint = time.monotonic()
+
+    def close(self):
+        self.checkpoint()
+        self.frontier.close()
+
+
+def _read_only(path):
+    return sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+
+
+class CrawlJobStore:
+    """Directory of resumable crawl jobs, one SQLite file per job"""
+
+    def __init__(self, directory, checkpoint_every=25, checkpoint_seconds=30):
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_seconds = checkpoint_seconds
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, job_id):
+        if not JOB_ID_PATTERN.match(job_id or ''):
+            return None
+        return os.path.join(self.directory, f'{job_id}.sqlite')
+
+    def exists(self, job_id):
+        path = self.path(job_id)
+        return path is not None and os.path.exists(path)
+
+    def create(self, start_url, options):
+        """Start a new job file and return its id"""
+        job_id = uuid.uuid4().hex[:12]
+        checkpoint = self.open(job_id, expected_urls=options.get('expected_urls', 1000000))
+        try:
+            checkpoint.set(job_id=job_id, start_url=start_url, options=options, state='queued',
+                           created_at=datetime.now().isoformat())
+        finally:
+            checkpoint.close()
+        return job_id
+
+    def open(self, job_id, expected_urls=1000000):
+        """Checkpoint for a job; only one thread may have a job open at a time"""
+        return CrawlCheckpoint(self.path(job_id), self.checkpoint_every, self.checkpoint_seconds, expected_urls)
+
+    def status(self, job_id):
+        """Job metadata and progress read from its last checkpoint, without loading the frontier"""
+        db = _read_only(self.path(job_id))
+        try:
+            meta = {key: json.loads(value) for key, value in db.execute('SELECT key, value FROM meta')}
+            meta['pages_done'] = db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+            meta['queued'] = db.execute('SELECT COUNT(*) FROM queue').fetchone()[0]
+            meta['in_flight'] = db.execute('SELECT COUNT(*) FROM in_flight').fetchone()[0]
+            return meta
+        finally:
+            db.close()
+
+    def results(self, job_id, offset=0, limit=100):
+        """Checkpointed page results in crawl order"""
+        db = _read_only(self.path(job_id))
+        try:
+            rows = db.execute('SELECT result FROM pages ORDER BY seq LIMIT ? OFFSET ?', (limit, offset))
+            return [json.loads(result) for (result,) in rows]
+        finally:
+            db.close()
+
+    def iter_results(self, job_id, batch_size=1000):
+        """Every checkpointed page result in crawl order, read batch_size rows at a time"""
+        db = _read_only(self.path(job_id))
+        try:
+            last_seq = 0
+            while True:
+                rows = db.execute('SELECT seq, result FROM pages WHERE seq > ? ORDER BY seq LIMIT ?',
+                                  (last_seq, batch_size)).fetchall()
+                for _, result in rows:
+                    yield json.loads(result)
+                if len(rows) < batch_size:
+                    return
+                last_seq = rows[-1][0]
+        finally:
+            db.close()
+
+    def job_ids(self):
+        return sorted(name[:-len('.sqlite')] for name in os.listdir(self.directory)
+                      if name.endswith('.sqlite') and JOB_ID_PATTERN.match(name[:-len('.sqlite')]))
@@ -0,0 +1,185 @@
+import heapq
+import itertools
+import math
+import re
+from datetime import datetime, timezone
+
+from .link_graph import normalize_url
+
+# (pattern, weight, label) applied to the URL; negative weights push pages back
+URL_PATTERN_WEIGHTS = [
+    (re.compile(r'[?&](page|p|pg|start|offset)=\d+', re.I), -2.0, 'pagination'),
+    (re.compile(r'[?&](sort|order|orderby|filter|color|colour|size|price|brand|view|f)(\[\])?=', re.I), -3.0, 'facet'),
+    (re.compile(r'/page/\d+/?$', re.I), -2.0, 'pagination'),
+    (re.compile(r'/(tag|tags|author|archive|archives|feed)(/|$)', re.I), -1.5, 'archive'),
+    (re.compile(r'/(privacy|terms|legal|cookies?|imprint|disclaimer|sitemap)([-_/.]|$)', re.I), -2.5, 'legal'),
+    (re.compile(r'/(login|log-in|signin|sign-in|register|cart|basket|checkout|account|wp-admin)([-_/.]|$)', re.I), -2.5, 'utility'),
+    (re.compile(r'\?'), -0.5, 'query'),
+]
+
+
+def _days_since(lastmod, now=None):
+    """Age in days of a W3C datetime/date string, or None when it can't be read"""
+    if not lastmod:
+        return None
+    try:
+        moment = datetime.fromisoformat(lastmod.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (now - moment).total_seconds() / 86400)
+
+
+class PageImportance:
+    """Default crawl scorer: higher scores are fetched first
+
+    score = depth_weight * depth + inlink_weight * log2(1 + in-links seen so far)
+          + sitemap_weight * sitemap priority (0.5 when listed without one)
+          + freshness_weight * exp(-age_days / freshness_days) + matching URL pattern weights
+
+    Any object with score(url, depth, inlinks) can replace it.
+    """
+
+    def __init__(self, depth_weight=-1.0, inlink_weight=1.0, sitemap_weight=2.0, freshness_weight=1.0,
+                 freshness_days=90, patterns=URL_PATTERN_WEIGHTS):
+        self.depth_weight = depth_weight
+        self.inlink_weight = inlink_weight
+        self.sitemap_weight = sitemap_weight
+        self.freshness_weight = freshness_weight
+        self.freshness_days = freshness_days
+        self.patterns = patterns
+        self._sitemap = {}
+
+    def add_sitemap(self, entries):
+        """Use sitemap <priority>/<lastmod> ({'url', 'priority', 'lastmod'} entries or plain URLs)"""
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {'url': entry}
+            priority = entry.get('priority')
+            self._sitemap[normalize_url(entry['url'])] = (
+                0.5 if priority is None else priority,
+                _days_since(entry.get('lastmod'))
+            )
+
+    def components(self, url, depth, inlinks):
+        """Each signal's contribution, for explaining an ordering"""
+        parts = {
+            'depth': self.depth_weight * depth,
+            'inlinks': self.inlink_weight * math.log2(1 + inlinks),
+        }
+        listed = self._sitemap.get(normalize_url(url))
+        if listed is not None:
+            priority, age_days = listed
+            parts['sitemap'] = self.sitemap_weight * priority
+            if age_days is not None:
+                parts['freshness'] = self.freshness_weight * math.exp(-age_days / self.freshness_days)
+        for pattern, weight, label in self.patterns:
+            if pattern.search(url):
+                parts[label] = parts.get(label, 0) + weight
+        return parts
+
+    def score(self, url, depth, inlinks):
+        return sum(self.components(url, depth, inlinks).values())
+
+
+class PriorityFrontier:
+    """In-memory frontier that pops the highest-scoring URL first
+
+    Re-discovering a queued URL counts as another in-link and re-scores it;
+    older heap entries for that URL are skipped when they surface.
+    """
+
+    def __init__(self, scorer=None):
+        self.scorer = scorer if scorer is not None else PageImportance()
+        self._heap = []
+        self._queued = {}
+        self._seen = set()
+        self._inlinks = {}
+        self._order = itertools.count()
+
+    def push(self, url, depth, priority=None):
+        """Queue a URL unless it was queued before; returns True when it was added"""
+        self._inlinks[url] = self._inlinks.get(url, 0) + 1
+        if url in self._seen:
+            queued = self._queued.get(url)
+            if queued is not None:
+                self._push_entry(url, min(queued[0], depth))
+            return False
+        self._seen.add(url)
+        self._push_entry(url, depth)
+        return True
+
+    def _push_entry(self, url, depth):
+        score = self.scorer.score(url, depth, self._inlinks[url])
+        order = next(self._order)
+        self._queued[url] = (depth, order)
+        heapq.heappush(self._heap, (-score, order, url))
+
+    def pop(self):
+        while self._heap:
+            _, order, url = heapq.heappop(self._heap)
+            queued = self._queued.get(url)
+            if queued is not None and queued[1] == order:
+                del self._queued[url]
+                return url, queued[0]
+        raise IndexError('pop from an empty frontier')
+
+    def inlinks(self, url):
+        return self._inlinks.get(url, 0)
+
+    def __len__(self):
+        return len(self._queued)
+
+    def stats(self):
+        return {'kind': 'memory', 'order': 'importance', 'queued': len(self._queued), 'seen': len(self._seen)}
+
+
+class ScoredFrontier:
+    """Scores URLs into a bucketed frontier such as DiskFrontier
+
+    The bucket is fixed when a URL is first discovered, so later in-links don't
+    move it; scores are rounded to 1/resolution to keep FIFO order among equals.
+    """
+
+    def __init__(self, frontier, scorer=None, resolution=4):
+        self.frontier = frontier
+        self.scorer = scorer if scorer is not None else PageImportance()
+        self.resolution = resolution
+
+    def push(self, url, depth, priority=None):
+        if priority is None:
+            priority = -round(self.scorer.score(url, depth, 1) * self.resolution)
+        return self.frontier.push(url, depth, priority)
+
+    def pop(self):
+        return self.frontier.pop()
+
+    def __len__(self):
+        return len(self.frontier)
+
+    def __getattr__(self, name):
+        # flush/complete/stats/close belong to the wrapped frontier
+        return getattr(self.frontier, name)
+
+
+def rank_links(links, budget, scorer=None, depth=1):
+    """Pick the budget most important links from a page's link list, best first
+
+    links are LinkRecords; repeats (after normalizing) count as extra in-links. Returns
+    ([(link, priority score)], number of distinct candidates).
+    """
+    frontier = PriorityFrontier(scorer)
+    first_seen = {}
+    for link in links:
+        url = normalize_url(link.url)
+        first_seen.setdefault(url, link)
+        frontier.push(url, depth)
+
+    chosen = []
+    while len(frontier) and len(chosen) < budget:
+        url, link_depth = frontier.pop()
+        score = frontier.scorer.score(url, link_depth, frontier.inlinks(url))
+        chosen.append((first_seen[url], round(score, 3)))
+    return chosen, len(first_seen)
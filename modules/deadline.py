@@ -0,0 +1,64 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+_local = threading.local()
+
+
+def current_deadline():
+    """Return the deadline active on this thread, if any"""
+    return getattr(_local, 'deadline', None)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The request's overall time budget ran out before this fetch could start"""
+
+
+class Deadline:
+    """Overall time budget for one API request, shared by every stage and fetch it runs"""
+
+    def __init__(self, seconds):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    def clamp(self, timeout):
+        """Shrink a requests-style timeout (seconds or (connect, read)) to the time left"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f'Request deadline of {self.budget:g}s exceeded')
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+    @contextmanager
+    def activate(self):
+        """Make this deadline current on the calling thread"""
+        previous = getattr(_local, 'deadline', None)
+        _local.deadline = self
+        try:
+            yield self
+        finally:
+            _local.deadline = previous
+
+    def to_dict(self):
+        return {
+            'budget_seconds': self.budget,
+            'remaining_seconds': round(self.remaining(), 3),
+            'expired': self.expired()
+        }
+
+
+def clamp_timeout(timeout):
+    """Timeout bounded by the current deadline; unchanged when no deadline is active"""
+    deadline = current_deadline()
+    return deadline.clamp(timeout) if deadline is not None else timeout
@@ -0,0 +1,157 @@
+import hashlib
+import math
+import sqlite3
+
+
+class BloomFilter:
+    """Fixed-size set sketch: no false negatives, about error_rate false positives at capacity
+
+    Memory is ~1.2 bytes per expected item at 1%. Past capacity it keeps
+    working, only with more false positives.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        # Double hashing: k positions from two 64-bit halves
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        self.check_and_add(item)
+
+    def check_and_add(self, item):
+        """Add item; returns True when it was (probably) present already"""
+        bits = self.bits
+        present = True
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                present = False
+                bits[position >> 3] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class DiskFrontier:
+    """Crawl frontier kept in SQLite with priority buckets and a Bloom-filter seen-set
+
+    Lower buckets pop first, FIFO within a bucket; the default bucket is the
+    link depth, which gives breadth-first order. "Seen?" is answered by the
+    Bloom filter, and only its positives are confirmed against the seen table
+    on disk, so memory stays flat however many URLs the site has. Pushes are
+    buffered and written in batches.
+
+    Popped URLs stay in an in_flight table until complete() is called, so
+    opening an existing file continues where it left off and re-queues
+    anything that was being fetched when the process stopped.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bucket INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            depth INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS queue_order ON queue (bucket, id);
+        CREATE TABLE IF NOT EXISTS in_flight (
+            url TEXT PRIMARY KEY,
+            bucket INTEGER NOT NULL,
+            depth INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path, expected_urls=1000000, error_rate=0.01, batch_size=5000, mmap_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.batch_size = batch_size
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        # Read through memory-mapped pages rather than copying into SQLite's own cache
+        self.db.execute(f'PRAGMA mmap_size={mmap_bytes}')
+        self.db.executescript(self.SCHEMA)
+        self.seen = BloomFilter(expected_urls, error_rate)
+        self._pending = {}
+        with self.db:
+            self.db.execute('INSERT INTO queue (bucket, url, depth) SELECT bucket, url, depth FROM in_flight')
+            self.db.execute('DELETE FROM in_flight')
+        self._queued = self.db.execute('SELECT COUNT(*) FROM queue').fetchone()[0]
+        self._stats = {'pushed': 0, 'duplicates': 0, 'disk_checks': 0, 'false_positives': 0}
+        for (url,) in self.db.execute('SELECT url FROM seen'):
+            self.seen.add(url)
+
+    def push(self, url, depth, priority=None):
+        """Queue a URL unless it was queued before; returns True when it was added"""
+        if self.seen.check_and_add(url):
+            self._stats['disk_checks'] += 1
+            if url in self._pending or self.db.execute('SELECT 1 FROM seen WHERE url = ?', (url,)).fetchone():
+                self._stats['duplicates'] += 1
+                return False
+            self._stats['false_positives'] += 1
+
+        self._pending[url] = (depth if priority is None else priority, depth)
+        self._queued += 1
+        self._stats['pushed'] += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Write buffered pushes to disk"""
+        if not self._pending:
+            return
+        with self.db:
+            self.db.executemany('INSERT OR IGNORE INTO seen (url) VALUES (?)', ((url,) for url in self._pending))
+            self.db.executemany('INSERT INTO queue (bucket, url, depth) VALUES (?, ?, ?)',
+                                ((bucket, url, depth) for url, (bucket, depth) in self._pending.items()))
+        self._pending.clear()
+
+    def pop(self):
+        """Next (url, depth): lowest bucket first, then insertion order"""
+        self.flush()
+        row = self.db.execute('SELECT id, bucket, url, depth FROM queue ORDER BY bucket, id LIMIT 1').fetchone()
+        if row is None:
+            raise IndexError('pop from an empty frontier')
+        row_id, bucket, url, depth = row
+        with self.db:
+            self.db.execute('DELETE FROM queue WHERE id = ?', (row_id,))
+            self.db.execute('INSERT OR REPLACE INTO in_flight (url, bucket, depth) VALUES (?, ?, ?)', (url, bucket, depth))
+        self._queued -= 1
+        return url, depth
+
+    def complete(self, *urls, commit=True):
+        """Forget popped URLs whose results are safely stored"""
+        self.db.executemany('DELETE FROM in_flight WHERE url = ?', ((url,) for url in urls))
+        if commit:
+            self.db.commit()
+
+    def __len__(self):
+        return self._queued
+
+    def __contains__(self, url):
+        if url not in self.seen:
+            return False
+        return url in self._pending or self.db.execute('SELECT 1 FROM seen WHERE url = ?', (url,)).fetchone() is not None
+
+    def stats(self):
+        in_flight = self.db.execute('SELECT COUNT(*) FROM in_flight').fetchone()[0]
+        return dict(self._stats, kind='disk', queued=self._queued, in_flight=in_flight, bloom_bytes=len(self.seen.bits), bloom_hashes=self.seen.hash_count)
+
+    def close(self):
+        self.flush()
+        self.db.close()
@@ -1,11 +1,15 @@
 from playwright.sync_api import sync_playwright
 import time
 
+from .analytics_signatures import BeaconRecorder
+from .render_profile import get_profile, playwright_goto, prepare_playwright_page
+
 class ElementAnalyzerPlaywright:
-    def __init__(self):
+    def __init__(self, profile=None):
         self.playwright = None
         self.browser = None
         self.page = None
+        self.profile = get_profile(profile)
     
     def analyze_elements(self, url):
         """Analyze page elements using Playwright"""
@@ -14,14 +18,17 @@ class ElementAnalyzerPlaywright:
             
             with sync_playwright() as p:
                 self.browser = p.chromium.launch(headless=True)
-                self.page = self.browser.new_page()
-                
-                # Set user agent
-                self.page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
+                width, height = self.profile.viewport
+                context = self.browser.new_context(
+                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                    viewport={'width': width, 'height': height}
+                )
+                self.page = context.new_page()
                 
-                self.page.goto(url, wait_until='networkidle')
+                # Skip assets the DOM analysis doesn't need; wait for a network lull, not networkidle
+                recorder = BeaconRecorder()
+                tracker = prepare_playwright_page(context, self.page, self.profile, url, recorder)
+                _, wait_outcome = playwright_goto(self.page, url, tracker, timeout=30)
                 
                 elements_data = {
                     'page_info': self._get_page_info(),
@@ -31,7 +38,13 @@ class ElementAnalyzerPlaywright:
                     'links': self._analyze_links_playwright(),
                     'meta_tags': self._analyze_meta_tags(),
                     'performance': self._analyze_performance(),
-                    'accessibility': self._analyze_accessibility()
+                    'accessibility': self._analyze_accessibility(),
+                    'analytics': recorder.summary(),
+                    'render': {
+                        'profile': self.profile.to_dict(),
+                        'wait': wait_outcome,
+                        'page_weight': tracker.report()
+                    }
                 }
                 
                 print("✅ Playwright element analysis complete")
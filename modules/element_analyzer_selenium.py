@@ -7,9 +7,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 import time
 
+from .analytics_signatures import BeaconRecorder, drain_selenium_request_log, enable_selenium_request_log
+from .render_profile import apply_selenium_blocking, apply_selenium_options, get_profile, selenium_page_weight, selenium_wait_for_quiet
+
 class ElementAnalyzerSelenium:
-    def __init__(self):
+    def __init__(self, profile=None):
         self.driver = None
+        self.profile = get_profile(profile)
     
     def _setup_driver(self):
         """Setup Chrome driver with options"""
@@ -19,11 +23,13 @@ class ElementAnalyzerSelenium:
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
             chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+            apply_selenium_options(chrome_options, self.profile)
+            enable_selenium_request_log(chrome_options)
             
             service = Service(ChromeDriverManager().install())
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            apply_selenium_blocking(self.driver, self.profile)
             return True
         except Exception as e:
             print(f"❌ Failed to setup Chrome driver: {e}")
@@ -42,8 +48,10 @@ class ElementAnalyzerSelenium:
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
-            # Wait for page to load completely
-            time.sleep(2)
+            # Wait for late requests to settle instead of a fixed sleep
+            wait_outcome = selenium_wait_for_quiet(self.driver, self.profile)
+            recorder = BeaconRecorder()
+            drain_selenium_request_log(self.driver, recorder)
             
             elements_data = {
                 'page_info': self._get_page_info(),
@@ -53,7 +61,13 @@ class ElementAnalyzerSelenium:
                 'links': self._analyze_links_selenium(),
                 'meta_tags': self._analyze_meta_tags(),
                 'performance': self._analyze_performance(),
-                'accessibility': self._analyze_accessibility()
+                'accessibility': self._analyze_accessibility(),
+                'analytics': recorder.summary(),
+                'render': {
+                    'profile': self.profile.to_dict(),
+                    'wait': wait_outcome,
+                    'page_weight': selenium_page_weight(self.driver)
+                }
             }
             
             print("✅ Selenium element analysis complete")
@@ -3,6 +3,9 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import time
 
+from .audit_records import LinkRecord
+from .page_decoder import decode_html
+
 class ExtractLinks:
     def __init__(self):
         self.session = requests.Session()
@@ -11,7 +14,7 @@ class ExtractLinks:
         })
     
     def get_all_links(self, url, timeout=10):
-        """Extract all links from a webpage"""
+        """Extract all links from a webpage as LinkRecords"""
         try:
             print(f"🔗 Extracting links from: {url}")
             start_time = time.time()
@@ -19,39 +22,8 @@ class ExtractLinks:
             response = self.session.get(url, timeout=timeout)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            base_domain = urlparse(url).netloc
-            
-            internal_links = []
-            external_links = []
-            
-            # Find all links
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '').strip()
-                if not href or href.startswith('#') or href.startswith('javascript:'):
-                    continue
-                
-                # Convert relative URLs to absolute
-                absolute_url = urljoin(url, href)
-                parsed_url = urlparse(absolute_url)
-                
-                # Skip non-http protocols
-                if parsed_url.scheme not in ['http', 'https']:
-                    continue
-                
-                link_data = {
-                    'url': absolute_url,
-                    'text': link.get_text(strip=True)[:100],
-                    'title': link.get('title', ''),
-                }
-                
-                # Categorize as internal or external
-                if parsed_url.netloc == base_domain:
-                    if absolute_url not in [l['url'] for l in internal_links]:
-                        internal_links.append(link_data)
-                else:
-                    if absolute_url not in [l['url'] for l in external_links]:
-                        external_links.append(link_data)
+            html_content, _ = decode_html(response)
+            internal_links, external_links = self.links_from_html(html_content, url)
             
             elapsed = time.time() - start_time
             print(f"✅ Found {len(internal_links)} internal and {len(external_links)} external links in {elapsed:.2f}s")
@@ -66,3 +38,40 @@ class ExtractLinks:
         except Exception as e:
             print(f"❌ Error extracting links: {e}")
             return {'internal_links': [], 'external_links': [], 'total_links': 0, 'error': str(e)}
+
+    def links_from_html(self, html_content, url):
+        """Split the <a href> links of an already-fetched page into (internal, external) LinkRecords"""
+        soup = BeautifulSoup(html_content, 'html.parser')
+        base_domain = urlparse(url).netloc
+        
+        internal_links = []
+        external_links = []
+        seen_urls = set()
+        
+        # Find all links
+        for link in soup.find_all('a', href=True):
+            href = link.get('href', '').strip()
+            if not href or href.startswith('#') or href.startswith('javascript:'):
+                continue
+            
+            # Convert relative URLs to absolute
+            absolute_url = urljoin(url, href)
+            parsed_url = urlparse(absolute_url)
+            
+            # Skip non-http protocols
+            if parsed_url.scheme not in ['http', 'https']:
+                continue
+            
+            if absolute_url in seen_urls:
+                continue
+            seen_urls.add(absolute_url)
+            
+            link_data = LinkRecord(absolute_url, link.get_text(strip=True)[:100], link.get('title', ''))
+            
+            # Categorize as internal or external
+            if parsed_url.netloc == base_domain:
+                internal_links.append(link_data)
+            else:
+                external_links.append(link_data)
+        
+        return internal_links, external_links
@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The host has failed repeatedly; requests to it fail fast until the breaker resets"""
+
+
+class RetryPolicy:
+    """Which failures to retry and how long to wait: jittered exponential backoff, honouring Retry-After
+
+    Only idempotent methods are retried after the request may have reached the
+    server (5xx, read timeouts, resets); connection failures are safe to retry
+    for any method because nothing was sent.
+    """
+
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'})
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, max_attempts=3, backoff_base=0.5, backoff_max=8.0):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def retry_response(self, method, response, attempt):
+        return (attempt + 1 < self.max_attempts and method.upper() in self.IDEMPOTENT_METHODS
+                and response.status_code in self.RETRY_STATUSES)
+
+    def retry_error(self, method, error, attempt):
+        if attempt + 1 >= self.max_attempts or isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, requests.exceptions.ConnectTimeout) or (
+                isinstance(error, requests.exceptions.ConnectionError) and _never_sent(error)):
+            return True
+        return method.upper() in self.IDEMPOTENT_METHODS and isinstance(
+            error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def delay(self, attempt, response=None):
+        """Seconds to wait before the next attempt; Retry-After wins when the server sends one"""
+        retry_after = _retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Full jitter keeps many clients from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+def _never_sent(error):
+    """True for failures that happened while connecting (DNS, refused), before any bytes went out"""
+    reason = str(error).lower()
+    return any(marker in reason for marker in ('newconnectionerror', 'failed to establish', 'name or service not known',
+                                                'connection refused', 'nodename nor servname'))
+
+
+def _retry_after_seconds(response):
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Breaker:
+    def __init__(self):
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.rejected = 0
+
+
+class HostCircuitBreakers:
+    """Per-host circuit breakers: open after consecutive failures, one probe after reset_timeout
+
+    A failure is a request that still ended in a connection error, a timeout
+    or a 502/503/504 after its retries; other statuses show the host is up.
+    While open, requests to the host raise CircuitOpenError without touching
+    the network.
+    After reset_timeout one request is let through as a probe; success closes
+    the breaker, failure reopens it.
+    """
+
+    FAILURE_STATUSES = frozenset({502, 503, 504})
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, max_hosts=10000):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_hosts = max_hosts
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def before_request(self, host):
+        """Raise CircuitOpenError when the host's breaker is open; returns True if this request is the probe"""
+        with self._lock:
+            breaker = self._hosts.get(host)
+            if breaker is None or breaker.state == 'closed':
+                return False
+            if breaker.state == 'open' and time.monotonic() - breaker.opened_at >= self.reset_timeout:
+                breaker.state = 'half_open'
+            if breaker.state == 'half_open' and not breaker.probing:
+                breaker.probing = True
+                return True
+            breaker.rejected += 1
+            raise CircuitOpenError(f'Circuit open for {host} after {breaker.failures} consecutive failures')
+
+    def record_success(self, host):
+        with self._lock:
+            breaker = self._hosts.get(host)
+            if breaker is not None:
+                if breaker.state != 'closed':
+                    print(f"✅ Circuit closed for {host}")
+                del self._hosts[host]
+
+    def record_failure(self, host):
+        with self._lock:
+            breaker = self._hosts.get(host)
+            if breaker is None:
+                if len(self._hosts) >= self.max_hosts:
+                    self._hosts.pop(next(iter(self._hosts)))
+                breaker = self._hosts[host] = _Breaker()
+            breaker.failures += 1
+            reopen = breaker.state == 'half_open'
+            if reopen or breaker.failures >= self.failure_threshold:
+                if breaker.state == 'closed':
+                    print(f"⚠️ Circuit opened for {host} after {breaker.failures} consecutive failures")
+                breaker.state = 'open'
+                breaker.opened_at = time.monotonic()
+            breaker.probing = False
+
+    def release_probe(self, host):
+        """Let another request probe if this one ended without a verdict"""
+        with self._lock:
+            breaker = self._hosts.get(host)
+            if breaker is not None:
+                breaker.probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tracked_hosts': len(self._hosts),
+                'open': sorted(host for host, breaker in self._hosts.items() if breaker.state != 'closed'),
+                'rejected': sum(breaker.rejected for breaker in self._hosts.values())
+            }
@@ -0,0 +1,100 @@
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import nullcontext
+
+from .deadline import current_deadline
+from .request_tracer import current_tracer
+
+
+class HostScheduler:
+    """Shared worker pool that interleaves queued work round-robin across hosts"""
+
+    def __init__(self, max_workers=16, per_host_limit=2):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._ring = deque()
+        self._active = {}
+        self._shutdown = False
+        self._threads = []
+
+    def submit(self, host, fn, *args, **kwargs):
+        """Queue fn under a host key and return a Future for its result
+
+        fn runs under the submitting thread's request deadline and tracer, if
+        active; its spans nest under the span that was open at submit time.
+        """
+        future = Future()
+        deadline = current_deadline()
+        tracer = current_tracer()
+        parent = tracer.current_span() if tracer else None
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError('Scheduler has been shut down')
+            if host not in self._queues:
+                self._queues[host] = deque()
+                self._ring.append(host)
+            self._queues[host].append((future, deadline, tracer, parent, fn, args, kwargs))
+            self._start_workers()
+            self._cond.notify()
+        return future
+
+    def pending(self):
+        with self._cond:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _start_workers(self):
+        # Threads are started lazily so importing the app stays cheap
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(target=self._worker, name=f'host-scheduler-{len(self._threads)}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self):
+        for _ in range(len(self._ring)):
+            host = self._ring[0]
+            self._ring.rotate(-1)
+            if self._active.get(host, 0) >= self.per_host_limit:
+                continue
+            task = self._queues[host].popleft()
+            if not self._queues[host]:
+                del self._queues[host]
+                self._ring.remove(host)
+            self._active[host] = self._active.get(host, 0) + 1
+            return host, task
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                picked = self._next_task()
+                while picked is None:
+                    if self._shutdown and not self._queues:
+                        return
+                    self._cond.wait()
+                    picked = self._next_task()
+
+            host, (future, deadline, tracer, parent, fn, args, kwargs) = picked
+            if future.set_running_or_notify_cancel():
+                try:
+                    with deadline.activate() if deadline else nullcontext(), \
+                            tracer.activate(parent) if tracer else nullcontext():
+                        future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+            with self._cond:
+                self._active[host] -= 1
+                if not self._active[host]:
+                    del self._active[host]
+                self._cond.notify_all()
@@ -0,0 +1,55 @@
+from urllib.parse import urljoin
+
+
+def _field_type(element):
+    if element.name == 'input':
+        return (element.get('type') or 'text').strip().lower()
+    return element.name
+
+
+def _submit_label(element):
+    if element.name == 'button':
+        return element.get_text(' ', strip=True) or element.get('value', '')
+    return element.get('value', '') or element.get('alt', '')
+
+
+def _is_submit(element):
+    kind = (element.get('type') or ('submit' if element.name == 'button' else '')).strip().lower()
+    return kind in ('submit', 'image')
+
+
+def form_inventory(soup, page_url=''):
+    """Forms on a parsed page with their fields and submit buttons
+
+    Matches the shape of form_tester.FORM_INVENTORY_JS so static and
+    browser discovery are interchangeable.
+    """
+    forms = []
+    for index, form in enumerate(soup.find_all('form')):
+        fields = []
+        for position, element in enumerate(form.find_all(['input', 'textarea', 'select'])):
+            fields.append({
+                'position': position,
+                'tag': element.name,
+                'name': element.get('name'),
+                'type': _field_type(element),
+                'required': element.has_attr('required'),
+                'options': len(element.find_all('option')) if element.name == 'select' else None
+            })
+
+        action = form.get('action', '')
+        forms.append({
+            'index': index,
+            'id': form.get('id') or None,
+            'name': form.get('name'),
+            'action': action,
+            'action_url': urljoin(page_url, action) if page_url else action,
+            'method': (form.get('method') or 'GET').upper(),
+            'fields': fields,
+            'submit_buttons': [
+                _submit_label(button)
+                for button in form.find_all(['button', 'input'])
+                if _is_submit(button)
+            ]
+        })
+    return forms
@@ -0,0 +1,286 @@
+import asyncio
+import time
+
+from .analytics_signatures import FORM_EVENTS, BeaconRecorder, drain_selenium_request_log, enable_selenium_request_log
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Returns every form with its fields in document order; the field position is
+# used to find the same element again in a fresh context
+FORM_INVENTORY_JS = """
+() => Array.from(document.forms).map((form, index) => ({
+    index: index,
+    id: form.id || null,
+    name: form.getAttribute('name'),
+    action: form.getAttribute('action') || '',
+    method: (form.getAttribute('method') || 'GET').toUpperCase(),
+    fields: Array.from(form.querySelectorAll('input, textarea, select')).map((el, position) => ({
+        position: position,
+        tag: el.tagName.toLowerCase(),
+        name: el.getAttribute('name'),
+        type: el.tagName === 'INPUT' ? (el.getAttribute('type') || 'text').toLowerCase() : el.tagName.toLowerCase(),
+        required: el.required,
+        options: el.tagName === 'SELECT' ? el.options.length : null
+    })),
+    submit_buttons: Array.from(form.querySelectorAll('button, input[type=submit], input[type=image]'))
+        .filter(b => (b.getAttribute('type') || 'submit').toLowerCase() === 'submit' || b.type === 'image')
+        .map(b => (b.innerText || b.value || '').trim())
+}))
+"""
+
+SKIP_TYPES = {'hidden', 'submit', 'button', 'reset', 'image', 'file'}
+TYPE_VALUES = {
+    'email': 'demo@xatform.com',
+    'tel': '5555550100',
+    'number': '1',
+    'url': 'https://example.com',
+    'date': '2024-01-15',
+    'password': 'Test-Passw0rd1',
+    'search': 'test',
+    'textarea': 'This is a test message.',
+}
+NAME_VALUES = [
+    ('email', 'demo@xatform.com'),
+    ('phone', '5555550100'),
+    ('zip', '10001'),
+    ('postal', '10001'),
+    ('company', 'Test Company'),
+]
+
+
+def fill_value(field):
+    """Test value for a text-like field, from its type first and then its name"""
+    if field['type'] in TYPE_VALUES:
+        return TYPE_VALUES[field['type']]
+    name = (field.get('name') or '').lower()
+    for hint, value in NAME_VALUES:
+        if hint in name:
+            return value
+    return 'Test Name'
+
+
+def _field_label(field):
+    return field.get('name') or 'Unnamed'
+
+
+def _form_events(recorder, since=0):
+    return [(tool, event) for tool, event in recorder.events()[since:] if event.lower() in FORM_EVENTS]
+
+
+class FormTester:
+    """Opens a page once, lists its forms, then autofills and submits each in its own browser context
+
+    Playwright runs the forms concurrently (one isolated context each, up to
+    max_parallel at a time) inside a single browser. The Selenium fallback
+    uses one driver and a fresh tab per form.
+    """
+
+    def __init__(self, engine='playwright', max_parallel=4, timeout=30, submit_wait=5):
+        self.engine = engine
+        self.max_parallel = max_parallel
+        self.timeout = timeout
+        self.submit_wait = submit_wait
+
+    def test_forms(self, url, form_indexes=None, submit=True):
+        """Return {'forms': [...per-form inventory and logs...], 'engine', 'processing_time'}"""
+        start = time.time()
+        print(f"🧪 Testing forms on {url} with {self.engine}")
+        if self.engine == 'playwright':
+            forms = asyncio.run(self._run_playwright(url, form_indexes, submit))
+        else:
+            forms = self._run_selenium(url, form_indexes, submit)
+        print(f"✅ Tested {len(forms)} form(s) in {time.time() - start:.2f}s")
+        return {'url': url, 'engine': self.engine, 'forms': forms, 'processing_time': time.time() - start}
+
+    def _selected(self, inventory, form_indexes):
+        if form_indexes is None:
+            return inventory
+        wanted = set(form_indexes)
+        return [form for form in inventory if form['index'] in wanted or (form['id'] and form['id'] in wanted)]
+
+    # Playwright (async API: one browser, concurrent contexts)
+
+    async def _run_playwright(self, url, form_indexes, submit):
+        from playwright.async_api import async_playwright
+
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=True)
+            try:
+                context = await browser.new_context(user_agent=USER_AGENT)
+                page = await context.new_page()
+                await page.goto(url, wait_until='domcontentloaded', timeout=self.timeout * 1000)
+                inventory = await page.evaluate(FORM_INVENTORY_JS)
+                await context.close()
+
+                forms = self._selected(inventory, form_indexes)
+                semaphore = asyncio.Semaphore(self.max_parallel)
+                results = await asyncio.gather(*[
+                    self._playwright_form(browser, semaphore, url, form, submit) for form in forms
+                ])
+                return list(results)
+            finally:
+                await browser.close()
+
+    async def _playwright_form(self, browser, semaphore, url, form, submit):
+        async with semaphore:
+            logs = [f"✔ Form {form['index'] + 1} ({form['id'] or 'no id'}) opened in its own context"]
+            recorder = BeaconRecorder()
+            context = await browser.new_context(user_agent=USER_AGENT)
+            try:
+                page = await context.new_page()
+                page.on('request', recorder.record_playwright)
+                await page.goto(url, wait_until='domcontentloaded', timeout=self.timeout * 1000)
+                form_element = page.locator('form').nth(form['index'])
+                fields = form_element.locator('input, textarea, select')
+
+                for field in form['fields']:
+                    if field['type'] in SKIP_TYPES:
+                        continue
+                    element = fields.nth(field['position'])
+                    try:
+                        if field['type'] in ('checkbox', 'radio'):
+                            if field['required']:
+                                await element.check(timeout=2000)
+                                logs.append(f"✔ {field['type'].title()} {_field_label(field)} checked")
+                        elif field['tag'] == 'select':
+                            if field['options'] and field['options'] > 1:
+                                await element.select_option(index=1, timeout=2000)
+                                logs.append(f"✔ Select {_field_label(field)} set")
+                        else:
+                            await element.fill(fill_value(field), timeout=2000)
+                            logs.append(f"✔ Input field {field['position'] + 1}: {_field_label(field)} autofilled")
+                    except Exception as e:
+                        logs.append(f"✘ Error autofilling field {field['position'] + 1}: {e}")
+
+                if submit:
+                    start_url = page.url
+                    seen = len(recorder.events())
+                    try:
+                        submit_button = form_element.locator('button[type=submit], input[type=submit], button:not([type])')
+                        if await submit_button.count():
+                            await submit_button.first.click(timeout=3000)
+                        else:
+                            await form_element.evaluate('form => form.requestSubmit ? form.requestSubmit() : form.submit()')
+                        logs.append("✔ Form submitted")
+                    except Exception as e:
+                        logs.append(f"✘ Form submission failed: {e}")
+
+                    # Done when a form event is sent or the page navigates, capped by submit_wait
+                    deadline = time.monotonic() + self.submit_wait
+                    while time.monotonic() < deadline and not _form_events(recorder, seen) and page.url == start_url:
+                        await page.wait_for_timeout(100)
+                    if not _form_events(recorder, seen):
+                        logs.append("⚠ No form submission event reached an analytics endpoint")
+            except Exception as e:
+                logs.append(f"✘ Form test failed: {e}")
+            finally:
+                await context.close()
+
+            return self._form_result(form, logs, recorder)
+
+    # Selenium fallback (one driver, a tab per form)
+
+    def _run_selenium(self, url, form_indexes, submit):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument(f'--user-agent={USER_AGENT}')
+        enable_selenium_request_log(options)
+        driver = webdriver.Chrome(options=options)
+        try:
+            driver.set_page_load_timeout(self.timeout)
+            driver.get(url)
+            inventory = driver.execute_script(f'return ({FORM_INVENTORY_JS})()')
+            home = driver.current_window_handle
+
+            results = []
+            for form in self._selected(inventory, form_indexes):
+                driver.switch_to.new_window('tab')
+                try:
+                    results.append(self._selenium_form(driver, url, form, submit))
+                finally:
+                    driver.close()
+                    driver.switch_to.window(home)
+            return results
+        finally:
+            driver.quit()
+
+    def _selenium_form(self, driver, url, form, submit):
+        from selenium.webdriver.common.by import By
+
+        logs = [f"✔ Form {form['index'] + 1} ({form['id'] or 'no id'}) opened in a new tab"]
+        # The performance log is per driver; drop what earlier tabs left behind
+        drain_selenium_request_log(driver, BeaconRecorder())
+        recorder = BeaconRecorder()
+        try:
+            driver.get(url)
+            form_element = driver.find_elements(By.TAG_NAME, 'form')[form['index']]
+            fields = form_element.find_elements(By.CSS_SELECTOR, 'input, textarea, select')
+
+            for field in form['fields']:
+                if field['type'] in SKIP_TYPES or field['position'] >= len(fields):
+                    continue
+                element = fields[field['position']]
+                try:
+                    if field['type'] in ('checkbox', 'radio'):
+                        if field['required'] and not element.is_selected():
+                            element.click()
+                            logs.append(f"✔ {field['type'].title()} {_field_label(field)} checked")
+                    elif field['tag'] == 'select':
+                        if field['options'] and field['options'] > 1:
+                            element.find_elements(By.TAG_NAME, 'option')[1].click()
+                            logs.append(f"✔ Select {_field_label(field)} set")
+                    else:
+                        element.clear()
+                        element.send_keys(fill_value(field))
+                        logs.append(f"✔ Input field {field['position'] + 1}: {_field_label(field)} autofilled")
+                except Exception as e:
+                    logs.append(f"✘ Error autofilling field {field['position'] + 1}: {e}")
+
+            if submit:
+                drain_selenium_request_log(driver, recorder)
+                start_url = driver.current_url
+                seen = len(recorder.events())
+                try:
+                    buttons = form_element.find_elements(
+                        By.CSS_SELECTOR, 'button[type=submit], input[type=submit], button:not([type])')
+                    if buttons:
+                        buttons[0].click()
+                    else:
+                        driver.execute_script('const f = arguments[0]; f.requestSubmit ? f.requestSubmit() : f.submit()', form_element)
+                    logs.append("✔ Form submitted")
+                except Exception as e:
+                    logs.append(f"✘ Form submission failed: {e}")
+
+                def poll():
+                    time.sleep(0.1)
+                    drain_selenium_request_log(driver, recorder)
+
+                recorder.wait_for(lambda: _form_events(recorder, seen) or driver.current_url != start_url,
+                                  self.submit_wait, poll)
+                drain_selenium_request_log(driver, recorder)
+                if not _form_events(recorder, seen):
+                    logs.append("⚠ No form submission event reached an analytics endpoint")
+            else:
+                drain_selenium_request_log(driver, recorder)
+        except Exception as e:
+            logs.append(f"✘ Form test failed: {e}")
+
+        return self._form_result(form, logs, recorder)
+
+    def _form_result(self, form, logs, recorder):
+        events = recorder.events()
+        for tool, event in events:
+            logs.append(f"✔ {tool} Event Fired: {event}")
+        form_events = _form_events(recorder)
+        return dict(
+            form,
+            logs=logs,
+            analytics=recorder.summary(),
+            form_events=[f'{tool}: {event}' for tool, event in form_events],
+            status='✅' if not any(line.startswith('✘') for line in logs) else '⚠️'
+        )
@@ -0,0 +1,112 @@
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .deadline import DeadlineExceeded, clamp_timeout, current_deadline
+from .request_tracer import current_tracer
+
+
+class AuditAdapter(HTTPAdapter):
+    """Transport adapter shared by every audit fetch
+
+    Adds the request deadline, optional retries (retry_policy) and optional
+    per-host circuit breaking (breakers) to every request it sends.
+    """
+
+    def __init__(self, retry_policy=None, breakers=None, **kwargs):
+        super().__init__(**kwargs)
+        self.retry_policy = retry_policy
+        self.breakers = breakers
+
+    def send(self, request, **kwargs):
+        host = urlsplit(request.url).netloc.lower()
+        is_probe = self.breakers.before_request(host) if self.breakers else False
+        # The breaker hears one outcome per request, after its retries have played out
+        try:
+            response = self._send_with_retries(request, **kwargs)
+        except DeadlineExceeded:
+            self._release_probe(host, is_probe)
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self._record(host, failed=True, is_probe=is_probe)
+            raise
+        except BaseException:
+            self._release_probe(host, is_probe)
+            raise
+        failed = self.breakers is not None and response.status_code in self.breakers.FAILURE_STATUSES
+        self._record(host, failed=failed, is_probe=is_probe)
+        return response
+
+    def _send_with_retries(self, request, **kwargs):
+        timeout = kwargs.get('timeout')
+        attempt = 0
+        while True:
+            # No fetch may outlive the request's deadline; once it has passed, fail without sending
+            kwargs['timeout'] = clamp_timeout(timeout)
+            try:
+                response = self._send_once(request, attempt, **kwargs)
+            except DeadlineExceeded:
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not (self.retry_policy and self.retry_policy.retry_error(request.method, e, attempt)):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                if not self._can_wait(delay):
+                    raise
+                print(f"🔁 Retrying {request.method} {request.url} in {delay:.2f}s after {type(e).__name__}")
+            else:
+                if not (self.retry_policy and self.retry_policy.retry_response(request.method, response, attempt)):
+                    return response
+                delay = self.retry_policy.delay(attempt, response)
+                if not self._can_wait(delay):
+                    return response
+                print(f"🔁 Retrying {request.method} {request.url} in {delay:.2f}s after HTTP {response.status_code}")
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _send_once(self, request, attempt, **kwargs):
+        tracer = current_tracer()
+        if tracer is None:
+            return super().send(request, **kwargs)
+
+        with tracer.span('fetch', method=request.method, url=request.url) as span:
+            if attempt:
+                span.attributes['attempt'] = attempt + 1
+            response = super().send(request, **kwargs)
+            if not kwargs.get('stream'):
+                # Read the body here so download time lands in the fetch span
+                response.content
+            span.attributes['status'] = response.status_code
+            return response
+
+    def _record(self, host, failed, is_probe):
+        if self.breakers is None:
+            return
+        deadline = current_deadline()
+        if failed and deadline is not None and deadline.expired():
+            # Cut short by our own deadline, not evidence that the host is down
+            self._release_probe(host, is_probe)
+        elif failed:
+            self.breakers.record_failure(host)
+        else:
+            self.breakers.record_success(host)
+
+    def _release_probe(self, host, is_probe):
+        if is_probe:
+            self.breakers.release_probe(host)
+
+    def _can_wait(self, delay):
+        """A retry is only worth it if the wait leaves time in the deadline for another attempt"""
+        deadline = current_deadline()
+        return deadline is None or delay < deadline.remaining()
+
+
+def instrument_session(session, retry_policy=None, breakers=None):
+    """Route a session's traffic through the audit adapter"""
+    adapter = AuditAdapter(retry_policy=retry_policy, breakers=breakers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
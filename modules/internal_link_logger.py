@@ -44,7 +44,7 @@ class InternalLinkLogger:
             'source_url': url,
             'timestamp': datetime.now().isoformat(),
             'total_links': len(links),
-            'internal_links': links
+            'internal_links': [link.to_dict() for link in links]
         }
         
         with open(filename, 'w', encoding='utf-8') as f:
@@ -58,7 +58,7 @@ class InternalLinkLogger:
             
             for link in links:
                 writer.writerow([
-                    link.get('url', ''),
-                    link.get('text', ''),
-                    link.get('title', '')
+                    link.url,
+                    link.text,
+                    link.title
                 ])
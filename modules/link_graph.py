@@ -0,0 +1,245 @@
+from array import array
+from collections import deque
+from urllib.parse import urlsplit, urlunsplit
+
+from .audit_records import Interner
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+def normalize_url(url):
+    """Canonical node key: lower-case scheme/host, no fragment, '/' for an empty path"""
+    parts = urlsplit(url.strip())
+    netloc = parts.netloc.lower()
+    scheme = parts.scheme.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+class LinkGraph:
+    """Directed graph of internal links with integer node ids
+
+    Edges are appended to two flat arrays while crawling; freeze() sorts them
+    into CSR form (offsets + targets) so traversals never touch Python lists
+    of neighbours. Each page should report its outgoing links once.
+    """
+
+    def __init__(self):
+        self.nodes = Interner()
+        self.crawled = bytearray()
+        self._aliases = {}
+        self._sources = array('I')
+        self._targets = array('I')
+        self._offsets = None
+        self._adjacency = None
+
+    def _node(self, url):
+        # Pages repeat the same hrefs, so normalize each raw spelling only once
+        node_id = self._aliases.get(url)
+        if node_id is None:
+            node_id = self.nodes.id_for(normalize_url(url))
+            if node_id == len(self.crawled):
+                self.crawled.append(0)
+            self._aliases[url] = node_id
+        return node_id
+
+    def add_page(self, url, links=()):
+        """Mark a page as crawled and record its outgoing links (URLs, dicts or LinkRecords)"""
+        source = self._node(url)
+        self.crawled[source] = 1
+        targets = set()
+        for link in links:
+            if not isinstance(link, str):
+                link = link['url'] if isinstance(link, dict) else link.url
+            target = self._node(link)
+            if target != source:
+                targets.add(target)
+        for target in targets:
+            self._sources.append(source)
+            self._targets.append(target)
+        self._offsets = None
+        return source
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def edge_count(self):
+        return len(self._sources)
+
+    def freeze(self):
+        """Build (or rebuild) the CSR arrays; called lazily by the analytics"""
+        if self._offsets is not None:
+            return
+        node_count = len(self.nodes)
+        offsets = array('I', [0]) * (node_count + 1)
+        for source in self._sources:
+            offsets[source + 1] += 1
+        for node_id in range(node_count):
+            offsets[node_id + 1] += offsets[node_id]
+
+        adjacency = array('I', [0]) * len(self._sources)
+        cursor = offsets[:-1]
+        for source, target in zip(self._sources, self._targets):
+            adjacency[cursor[source]] = target
+            cursor[source] += 1
+
+        self._offsets = offsets
+        self._adjacency = adjacency
+
+    def out_degrees(self):
+        self.freeze()
+        offsets = self._offsets
+        return array('I', (offsets[i + 1] - offsets[i] for i in range(len(self.nodes))))
+
+    def in_degrees(self):
+        degrees = array('I', [0]) * len(self.nodes)
+        for target in self._targets:
+            degrees[target] += 1
+        return degrees
+
+    def click_depths(self, root_url):
+        """Breadth-first hop count from root_url; -1 for pages it cannot reach"""
+        self.freeze()
+        depths = array('i', [-1]) * len(self.nodes)
+        root = self.nodes.get(normalize_url(root_url))
+        if root is None:
+            return depths
+
+        offsets, adjacency = self._offsets, self._adjacency
+        depths[root] = 0
+        queue = deque([root])
+        while queue:
+            node_id = queue.popleft()
+            next_depth = depths[node_id] + 1
+            for target in adjacency[offsets[node_id]:offsets[node_id + 1]]:
+                if depths[target] < 0:
+                    depths[target] = next_depth
+                    queue.append(target)
+        return depths
+
+    def pagerank(self, damping=0.85, iterations=50, tolerance=1e-6):
+        """Internal PageRank; rank held by pages without out-links is spread evenly"""
+        node_count = len(self.nodes)
+        if node_count == 0:
+            return []
+        if NUMPY_AVAILABLE:
+            return self._pagerank_numpy(node_count, damping, iterations, tolerance)
+
+        self.freeze()
+        offsets, adjacency = self._offsets, self._adjacency
+        out_degrees = self.out_degrees()
+        rank = [1.0 / node_count] * node_count
+        for _ in range(iterations):
+            incoming = [0.0] * node_count
+            dangling = 0.0
+            for node_id in range(node_count):
+                degree = out_degrees[node_id]
+                if not degree:
+                    dangling += rank[node_id]
+                    continue
+                share = rank[node_id] / degree
+                for target in adjacency[offsets[node_id]:offsets[node_id + 1]]:
+                    incoming[target] += share
+            base = (1 - damping) / node_count + damping * dangling / node_count
+            updated = [base + damping * value for value in incoming]
+            delta = sum(abs(new - old) for new, old in zip(updated, rank))
+            rank = updated
+            if delta < tolerance:
+                break
+        return rank
+
+    def _pagerank_numpy(self, node_count, damping, iterations, tolerance):
+        # The edge arrays are shared with numpy without copying
+        sources = np.frombuffer(self._sources, dtype=np.uint32)
+        targets = np.frombuffer(self._targets, dtype=np.uint32)
+        out_degrees = np.bincount(sources, minlength=node_count).astype(np.float64)
+        dangling = out_degrees == 0
+        inverse_degrees = np.divide(1.0, out_degrees, out=np.zeros(node_count), where=~dangling)
+
+        rank = np.full(node_count, 1.0 / node_count)
+        for _ in range(iterations):
+            incoming = np.bincount(targets, weights=(rank * inverse_degrees)[sources], minlength=node_count)
+            base = (1 - damping) / node_count + damping * rank[dangling].sum() / node_count
+            updated = base + damping * incoming
+            delta = np.abs(updated - rank).sum()
+            rank = updated
+            if delta < tolerance:
+                break
+        return rank.tolist()
+
+    def orphans(self, sitemap_urls, root_url=None):
+        """Sitemap URLs the crawl never reached through an internal link"""
+        in_degrees = self.in_degrees()
+        root = normalize_url(root_url) if root_url else None
+        orphaned = []
+        for url in dict.fromkeys(normalize_url(url) for url in sitemap_urls):
+            node_id = self.nodes.get(url)
+            if url != root and (node_id is None or not in_degrees[node_id]):
+                orphaned.append(url)
+        return orphaned
+
+    def analyze(self, root_url, sitemap_urls=None, top=20):
+        """Depth, degree, orphan and PageRank report for the crawled site"""
+        node_count = len(self.nodes)
+        depths = self.click_depths(root_url)
+        in_degrees = self.in_degrees()
+        out_degrees = self.out_degrees()
+        ranks = self.pagerank()
+        urls = self.nodes.values
+
+        depth_distribution = {}
+        unreachable = 0
+        for node_id in range(node_count):
+            if not self.crawled[node_id]:
+                continue
+            if depths[node_id] < 0:
+                unreachable += 1
+            else:
+                depth_distribution[depths[node_id]] = depth_distribution.get(depths[node_id], 0) + 1
+
+        def page(node_id):
+            return {
+                'url': urls[node_id],
+                'depth': depths[node_id] if depths[node_id] >= 0 else None,
+                'in_degree': in_degrees[node_id],
+                'out_degree': out_degrees[node_id],
+                'pagerank': round(ranks[node_id], 6),
+                'crawled': bool(self.crawled[node_id])
+            }
+
+        crawled_ids = [node_id for node_id in range(node_count) if self.crawled[node_id]]
+        by_rank = sorted(range(node_count), key=lambda node_id: ranks[node_id], reverse=True)
+        by_in_degree = sorted(range(node_count), key=lambda node_id: in_degrees[node_id], reverse=True)
+        deepest = sorted(crawled_ids, key=lambda node_id: depths[node_id], reverse=True)
+
+        report = {
+            'summary': {
+                'nodes': node_count,
+                'edges': self.edge_count,
+                'crawled_pages': len(crawled_ids),
+                'max_depth': max(depth_distribution, default=0),
+                'unreachable_pages': unreachable
+            },
+            'depth_distribution': {str(depth): count for depth, count in sorted(depth_distribution.items())},
+            'top_pagerank': [page(node_id) for node_id in by_rank[:top]],
+            'top_in_degree': [page(node_id) for node_id in by_in_degree[:top]],
+            'deepest_pages': [page(node_id) for node_id in deepest[:top] if depths[node_id] > 0],
+            'dead_ends': [urls[node_id] for node_id in crawled_ids if not out_degrees[node_id]][:top]
+        }
+
+        if sitemap_urls is not None:
+            orphaned = self.orphans(sitemap_urls, root_url)
+            sitemap_keys = {normalize_url(url) for url in sitemap_urls}
+            report['orphans'] = orphaned
+            report['not_in_sitemap'] = [urls[node_id] for node_id in crawled_ids if urls[node_id] not in sitemap_keys][:top]
+            report['summary']['sitemap_urls'] = len(sitemap_keys)
+            report['summary']['orphan_pages'] = len(orphaned)
+
+        return report
@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import as_completed
+from urllib.parse import urlparse
+
+import requests
+
+from .audit_records import LinkTable
+from .fetch_resilience import CircuitOpenError
+from .fetch_scheduler import HostScheduler
+
+
+class LinkStatusCache:
+    """Thread-safe TTL cache of probe results shared across pages and audits
+
+    HTTP answers are kept for ttl; failures without one (timeouts, resets)
+    only for error_ttl, so a briefly unreachable host is re-probed soon.
+    """
+
+    def __init__(self, ttl=3600, max_entries=200000, error_ttl=60):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            item = self._entries.get(url)
+            if item is None:
+                return None
+            entry, expires = item
+            if expires < time.time():
+                del self._entries[url]
+                return None
+            return entry
+
+    def set(self, url, entry):
+        ttl = self.ttl if entry['status'] is not None else self.error_ttl
+        with self._lock:
+            self._entries[url] = (entry, time.time() + ttl)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LinkHealthChecker:
+    """Checks each unique link once: HEAD first, ranged GET when HEAD is refused or fails
+
+    Probes run on scheduler (a shared HostScheduler) when one is given, otherwise
+    on a private pool that lives for one check_links call.
+    """
+
+    def __init__(self, cache=None, max_workers=16, per_host_limit=2, timeout=10, slow_threshold=2.0, max_referrers=20,
+                 scheduler=None):
+        self.cache = cache if cache is not None else LinkStatusCache()
+        self.scheduler = scheduler
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.slow_threshold = slow_threshold
+        self.max_referrers = max_referrers
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+
+    def probe(self, url):
+        """Return status, redirect target and latency for one URL
+
+        A host whose circuit breaker is open is not probed at all: the link is
+        reported as skipped (ok None) rather than broken.
+        """
+        start = time.perf_counter()
+        method = 'HEAD'
+        try:
+            try:
+                response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+                response.close()
+                confirm = response.status_code >= 400
+            except CircuitOpenError:
+                raise
+            except requests.RequestException:
+                # Some servers reset or hang on HEAD but answer GET
+                confirm = True
+            if confirm:
+                # Plenty of servers refuse or mishandle HEAD; confirm with a 1-byte GET
+                method = 'GET'
+                response = self.session.get(url, timeout=self.timeout, allow_redirects=True,
+                                            stream=True, headers={'Range': 'bytes=0-0'})
+                response.close()
+
+            status = response.status_code
+            return {
+                'status': status,
+                'ok': status < 400 or status == 416,
+                'method': method,
+                'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+                'redirect_status': response.history[0].status_code if response.history else None,
+                'redirect_target': response.url if response.history else None
+            }
+        except CircuitOpenError as e:
+            return {
+                'status': None,
+                'ok': None,
+                'skipped': True,
+                'method': method,
+                'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+                'redirect_status': None,
+                'redirect_target': None,
+                'error': str(e)
+            }
+        except requests.RequestException as e:
+            return {
+                'status': None,
+                'ok': False,
+                'method': method,
+                'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+                'redirect_status': None,
+                'redirect_target': None,
+                'error': str(e)
+            }
+
+    def check_links(self, references):
+        """Probe every URL in a LinkTable or {url: referring pages} and classify the results"""
+        try:
+            if isinstance(references, LinkTable):
+                references = references.referrers_by_url()
+            print(f"🩺 Checking {len(references)} unique links...")
+            start_time = time.time()
+
+            statuses = {}
+            to_probe = []
+            for url in references:
+                cached = self.cache.get(url)
+                if cached is not None:
+                    statuses[url] = cached
+                else:
+                    to_probe.append(url)
+
+            if to_probe:
+                scheduler = self.scheduler or HostScheduler(max_workers=self.max_workers, per_host_limit=self.per_host_limit)
+                try:
+                    futures = {scheduler.submit(urlparse(url).netloc, self.probe, url): url for url in to_probe}
+                    for future in as_completed(futures):
+                        url = futures[future]
+                        statuses[url] = future.result()
+                        # Skipped links say nothing about the link; probe them again next time
+                        if not statuses[url].get('skipped'):
+                            self.cache.set(url, statuses[url])
+                finally:
+                    if scheduler is not self.scheduler:
+                        scheduler.shutdown(wait=False)
+
+            report = self._build_report(references, statuses)
+            report['probed'] = len(to_probe)
+            report['from_cache'] = len(references) - len(to_probe)
+            report['processing_time'] = time.time() - start_time
+
+            print(f"✅ Link check complete: {report['summary']['broken']} broken, "
+                  f"{report['summary']['redirects']} redirecting, {report['summary']['slow']} slow, "
+                  f"{report['summary']['skipped']} skipped")
+            return report
+
+        except Exception as e:
+            print(f"❌ Link check failed: {e}")
+            return {'broken': [], 'redirects': [], 'slow': [], 'skipped': [], 'summary': {}, 'error': str(e)}
+
+    def _build_report(self, references, statuses):
+        broken, redirects, slow, skipped = [], [], [], []
+        for url, status in statuses.items():
+            referrers = sorted(references[url])
+            entry = dict(status, url=url, reference_count=len(referrers),
+                         referenced_by=referrers[:self.max_referrers])
+            if status.get('skipped'):
+                # Host's circuit breaker was open: status unknown, not broken
+                skipped.append(entry)
+                continue
+            if not status['ok']:
+                broken.append(entry)
+            if status['redirect_target']:
+                redirects.append(entry)
+            if status['latency_ms'] > self.slow_threshold * 1000:
+                slow.append(entry)
+
+        # Most widely referenced problems first
+        for group in (broken, redirects, slow, skipped):
+            group.sort(key=lambda entry: entry['reference_count'], reverse=True)
+
+        return {
+            'broken': broken,
+            'redirects': redirects,
+            'slow': slow,
+            'skipped': skipped,
+            'summary': {
+                'total_links': len(statuses),
+                'ok': sum(1 for status in statuses.values() if status['ok']),
+                'broken': len(broken),
+                'redirects': len(redirects),
+                'slow': len(slow),
+                'skipped': len(skipped)
+            }
+        }
@@ -0,0 +1,81 @@
+import codecs
+import re
+
+# Browsers only look for <meta charset> near the top of the document
+PRESCAN_BYTES = 4096
+
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+_BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+
+def _normalize(name):
+    try:
+        return codecs.lookup(name.strip().strip('"\'')).name
+    except (LookupError, AttributeError):
+        return None
+
+
+def header_charset(response):
+    """Charset from the Content-Type header, without the text/* latin-1 default"""
+    match = _HEADER_CHARSET.search(response.headers.get('Content-Type', ''))
+    return _normalize(match.group(1)) if match else None
+
+
+def sniff_encoding(prefix):
+    """Encoding from a byte-order mark or a <meta charset> in the first bytes"""
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    match = _META_CHARSET.search(prefix[:PRESCAN_BYTES])
+    if match:
+        return _normalize(match.group(1).decode('ascii', 'ignore'))
+    return None
+
+
+def resolve_encoding(response, prefix=b''):
+    """Cheap encoding resolution: header first, then BOM / meta prescan"""
+    return header_charset(response) or sniff_encoding(prefix)
+
+
+def decode_html(response):
+    """Decode a response body once and return (text, encoding)
+
+    Falls back to requests' charset detection only when neither the headers,
+    the document prefix nor a strict UTF-8 decode settle the encoding.
+    """
+    content = response.content
+    encoding = resolve_encoding(response, content[:PRESCAN_BYTES])
+    if encoding:
+        return content.decode(encoding, errors='replace'), encoding
+
+    try:
+        return content.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    encoding = _normalize(response.apparent_encoding or '') or 'cp1252'
+    return content.decode(encoding, errors='replace'), encoding
+
+
+def find_markers(text, markers, window=64 * 1024):
+    """Case-insensitive substring search over bounded windows of the text
+
+    Lower-casing one window at a time keeps matching as fast as
+    ``marker in text.lower()`` without a second copy of the whole page.
+    """
+    remaining = {marker.lower() for marker in markers}
+    found = set()
+    overlap = max((len(marker) for marker in remaining), default=1) - 1
+    start = 0
+    while remaining and start < len(text):
+        chunk = text[max(0, start - overlap):start + window].lower()
+        hits = {marker for marker in remaining if marker in chunk}
+        found |= hits
+        remaining -= hits
+        start += window
+    return found
@@ -0,0 +1,134 @@
+import hashlib
+from collections import Counter
+
+from bs4 import Comment
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+NON_VISIBLE_TAGS = {'script', 'style', 'noscript', 'template', 'head', 'title', 'meta', '[document]'}
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def visible_strings(soup):
+    """Text nodes a reader would see (no scripts, styles, comments or head content)"""
+    for text in soup.find_all(string=True):
+        if not isinstance(text, Comment) and text.parent.name not in NON_VISIBLE_TAGS:
+            yield text
+
+
+def page_features(soup):
+    """Weighted features for one parsed page: visible-text shingles plus tag structure
+
+    Returns (features Counter, visible word count).
+    """
+    words = []
+    for text in visible_strings(soup):
+        words.extend(text.lower().split())
+
+    features = Counter()
+    if len(words) >= SHINGLE_SIZE:
+        for i in range(len(words) - SHINGLE_SIZE + 1):
+            features['t:' + ' '.join(words[i:i + SHINGLE_SIZE])] += 1
+    else:
+        for word in words:
+            features['t:' + word] += 1
+
+    # Each distinct parent>child pair counts once so repeated wrappers don't drown out the text
+    root = soup.body or soup
+    for tag in root.find_all(True):
+        features['s:' + tag.parent.name + '>' + tag.name] = 1
+
+    return features, len(words)
+
+
+def simhash(features, bits=FINGERPRINT_BITS):
+    """Charikar SimHash of a {feature: weight} mapping"""
+    # Histogram each hash byte (8 adds per feature) instead of visiting all 64 bits
+    byte_count = bits // 8
+    histograms = [[0] * 256 for _ in range(byte_count)]
+    total_weight = 0
+    for feature, weight in features.items():
+        value = _feature_hash(feature)
+        total_weight += weight
+        for histogram in histograms:
+            histogram[value & 0xFF] += weight
+            value >>= 8
+
+    fingerprint = 0
+    for byte_index, histogram in enumerate(histograms):
+        for bit in range(8):
+            set_weight = sum(weight for byte, weight in enumerate(histogram) if byte >> bit & 1)
+            # Set when the features with this bit outweigh those without it
+            if 2 * set_weight > total_weight:
+                fingerprint |= 1 << (byte_index * 8 + bit)
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def fingerprint_page(soup):
+    """(simhash, visible word count) for a parsed page"""
+    features, word_count = page_features(soup)
+    return simhash(features), word_count
+
+
+class NearDuplicateIndex:
+    """Clusters SimHash fingerprints that differ in at most max_distance bits
+
+    The fingerprint is split into max_distance + 1 bands; two fingerprints
+    within the distance must agree on at least one band, so only pages
+    sharing a band bucket are compared.
+    """
+
+    def __init__(self, max_distance=3, bits=FINGERPRINT_BITS):
+        self.max_distance = max_distance
+        self.bits = bits
+        self.band_count = max_distance + 1
+        self.band_width = -(-bits // self.band_count)
+        self._buckets = [{} for _ in range(self.band_count)]
+        self._fingerprints = {}
+        self.members = {}
+
+    def _bands(self, fingerprint):
+        mask = (1 << self.band_width) - 1
+        for band in range(self.band_count):
+            yield band, (fingerprint >> (band * self.band_width)) & mask
+
+    def find(self, fingerprint):
+        """Closest representative within max_distance as (key, distance), or (None, None)"""
+        best, best_distance = None, None
+        for band, value in self._bands(fingerprint):
+            for key in self._buckets[band].get(value, ()):
+                distance = hamming_distance(fingerprint, self._fingerprints[key])
+                if distance <= self.max_distance and (best_distance is None or distance < best_distance):
+                    best, best_distance = key, distance
+        return best, best_distance
+
+    def add(self, key, fingerprint):
+        """Assign a page to a cluster; returns (representative, distance)
+
+        The page becomes a new representative (distance 0) when nothing is close.
+        """
+        representative, distance = self.find(fingerprint)
+        if representative is None:
+            representative, distance = key, 0
+            self._fingerprints[key] = fingerprint
+            self.members[key] = []
+            for band, value in self._bands(fingerprint):
+                self._buckets[band].setdefault(value, []).append(key)
+        self.members[representative].append(key)
+        return representative, distance
+
+    def clusters(self, min_size=2):
+        """Clusters with at least min_size pages, largest first"""
+        found = [
+            {'representative': key, 'members': members, 'size': len(members)}
+            for key, members in self.members.items() if len(members) >= min_size
+        ]
+        found.sort(key=lambda cluster: cluster['size'], reverse=True)
+        return found
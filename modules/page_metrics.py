@@ -0,0 +1,247 @@
+import math
+import re
+import threading
+from array import array
+from urllib.parse import urlsplit
+
+from .audit_records import Interner, PageElementSummary
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+ELEMENT_COLUMNS = PageElementSummary.__slots__
+SCORE_COLUMNS = ('accessibility_score', 'seo_score')
+FLAG_COLUMNS = ('rendered',)
+PERCENTILES = (50, 90, 95, 99)
+HISTOGRAM_BINS = 10
+# Modified z-score (0.6745 * deviation / MAD) beyond which a page is flagged for a metric
+OUTLIER_Z = 3.5
+MAX_OUTLIERS = 50
+MAX_TEMPLATES = 50
+INITIAL_ROWS = 256
+
+_NUMERIC_SEGMENT = re.compile(r'^\d+$|^[0-9a-f]{8,}$|^[0-9a-f-]{36}$', re.I)
+
+
+def url_template(url):
+    """Coarse page template for group-bys: first path segment, '*' for anything deeper
+
+    /blog/2024/some-post -> /blog/*, /products/123 -> /products/*, /about -> /about, /42 -> /{id}
+    """
+    segments = [segment for segment in urlsplit(url).path.split('/') if segment]
+    if not segments:
+        return '/'
+    first = '{id}' if _NUMERIC_SEGMENT.match(segments[0]) else segments[0].lower()
+    return f'/{first}/*' if len(segments) > 1 else f'/{first}'
+
+
+class PageMetricsTable:
+    """Columnar per-page metrics for analyze-all-links and crawl summaries
+
+    Rows are appended to a numpy matrix that doubles its capacity as it fills
+    (array('d') columns without numpy), so the table is never rebuilt.
+    Totals, means, deviations, extremes and per-template sums are running
+    values updated by add(); only percentiles, histograms and outliers need a
+    pass over the rows, and summary() caches the result until the next page
+    is added. Safe to add to and summarize from different threads.
+    """
+
+    def __init__(self, columns=ELEMENT_COLUMNS + SCORE_COLUMNS + FLAG_COLUMNS):
+        self.names = tuple(columns)
+        self._index = {name: index for index, name in enumerate(self.names)}
+        self.urls = []
+        self.templates = Interner()
+        self.template_ids = array('I')
+        width = len(self.names)
+        self._totals = [0.0] * width
+        self._nonzero = [0] * width
+        # Welford running mean and sum of squared deviations, exact without a second pass
+        self._means = [0.0] * width
+        self._squares = [0.0] * width
+        self._minimums = [0.0] * width
+        self._maximums = [0.0] * width
+        self._template_pages = []
+        self._template_sums = []
+        if NUMPY_AVAILABLE:
+            self._matrix = np.zeros((INITIAL_ROWS, width))
+        else:
+            self._columns = [array('d') for _ in self.names]
+        self._lock = threading.Lock()
+        self._cached = None
+
+    def add(self, url, **metrics):
+        """Append one page; missing metrics count as 0"""
+        values = [float(metrics.get(name) or 0) for name in self.names]
+        template = url_template(url)
+        with self._lock:
+            row = len(self.urls)
+            self.urls.append(url)
+            template_id = self.templates.id_for(template)
+            self.template_ids.append(template_id)
+            if template_id == len(self._template_pages):
+                self._template_pages.append(0)
+                self._template_sums.append([0.0] * len(self.names))
+            self._template_pages[template_id] += 1
+            template_sums = self._template_sums[template_id]
+
+            for index, value in enumerate(values):
+                template_sums[index] += value
+                self._totals[index] += value
+                if value:
+                    self._nonzero[index] += 1
+                delta = value - self._means[index]
+                self._means[index] += delta / (row + 1)
+                self._squares[index] += delta * (value - self._means[index])
+                if not row or value < self._minimums[index]:
+                    self._minimums[index] = value
+                if not row or value > self._maximums[index]:
+                    self._maximums[index] = value
+
+            if NUMPY_AVAILABLE:
+                if row == len(self._matrix):
+                    grown = np.zeros((2 * len(self._matrix), len(self.names)))
+                    grown[:row] = self._matrix
+                    self._matrix = grown
+                self._matrix[row] = values
+            else:
+                for column, value in zip(self._columns, values):
+                    column.append(value)
+            self._cached = None
+
+    def __len__(self):
+        return len(self.urls)
+
+    def total(self, name):
+        return self._totals[self._index[name]]
+
+    def mean(self, name):
+        return self._means[self._index[name]]
+
+    def pages_with(self, name):
+        """Pages where the metric is non-zero"""
+        return self._nonzero[self._index[name]]
+
+    def summary(self):
+        """Totals plus distributions, recomputed only when pages were added since the last call"""
+        with self._lock:
+            if self._cached is None:
+                self._cached = self._summarize()
+            return self._cached
+
+    def _summarize(self):
+        summary = {f'total_{name}': int(self.total(name)) for name in ELEMENT_COLUMNS if name in self._index}
+        summary.update(
+            pages_with_forms=self.pages_with('forms'),
+            pages_with_images=self.pages_with('images'),
+            pages_rendered=self.pages_with('rendered'),
+            average_accessibility_score=self.mean('accessibility_score'),
+            average_seo_score=self.mean('seo_score')
+        )
+        if not self.urls:
+            summary.update(distributions={}, histograms={}, templates={}, outliers=[])
+            return summary
+
+        metrics = [index for index, name in enumerate(self.names) if name not in FLAG_COLUMNS]
+        summarize = self._order_statistics_numpy if NUMPY_AVAILABLE else self._order_statistics_python
+        percentiles, histograms, outliers = summarize(metrics)
+        pages = len(self.urls)
+        summary.update(
+            distributions={
+                self.names[index]: dict(
+                    percentiles[index],
+                    min=self._minimums[index], max=self._maximums[index], mean=round(self._means[index], 2),
+                    std=round(math.sqrt(max(self._squares[index], 0.0) / pages), 2)
+                )
+                for index in metrics
+            },
+            histograms=histograms,
+            templates=self._template_rows(metrics),
+            outliers=self._outlier_rows(outliers)
+        )
+        return summary
+
+    def _order_statistics_numpy(self, metrics):
+        # A view of the filled rows: nothing is copied to summarize
+        matrix = self._matrix[:len(self.urls)]
+        values = np.percentile(matrix, PERCENTILES, axis=0)
+        percentiles = {index: {f'p{q}': round(float(values[row, index]), 2) for row, q in enumerate(PERCENTILES)}
+                       for index in metrics}
+
+        histograms = {}
+        for index in metrics:
+            counts, edges = np.histogram(matrix[:, index], bins=HISTOGRAM_BINS,
+                                         range=self._histogram_range(self.names[index], self._maximums[index]))
+            histograms[self.names[index]] = {'edges': [round(float(edge), 2) for edge in edges], 'counts': counts.tolist()}
+
+        medians = np.median(matrix, axis=0)
+        mad = np.median(np.abs(matrix - medians), axis=0)
+        z = np.divide(0.6745 * (matrix - medians), mad, out=np.zeros_like(matrix), where=mad > 0)
+        z[:, [index for index in range(len(self.names)) if index not in metrics]] = 0
+        flagged_rows, flagged_columns = np.nonzero(np.abs(z) > OUTLIER_Z)
+        outliers = [(int(row), self.names[column], float(matrix[row, column]), float(z[row, column]))
+                    for row, column in zip(flagged_rows, flagged_columns)]
+        return percentiles, histograms, outliers
+
+    def _order_statistics_python(self, metrics):
+        percentiles, histograms = {}, {}
+        outliers = []
+        for index in metrics:
+            name = self.names[index]
+            column = self._columns[index]
+            values = sorted(column)
+            percentiles[index] = {f'p{q}': round(_percentile(values, q), 2) for q in PERCENTILES}
+
+            low, high = self._histogram_range(name, values[-1])
+            width = (high - low) / HISTOGRAM_BINS
+            counts = [0] * HISTOGRAM_BINS
+            for value in values:
+                counts[min(HISTOGRAM_BINS - 1, int((value - low) / width))] += 1
+            histograms[name] = {'edges': [round(low + width * i, 2) for i in range(HISTOGRAM_BINS + 1)], 'counts': counts}
+
+            median = _percentile(values, 50)
+            mad = _percentile(sorted(abs(value - median) for value in values), 50)
+            if mad > 0:
+                for row, value in enumerate(column):
+                    z = 0.6745 * (value - median) / mad
+                    if abs(z) > OUTLIER_Z:
+                        outliers.append((row, name, value, z))
+        return percentiles, histograms, outliers
+
+    @staticmethod
+    def _histogram_range(name, maximum):
+        # Scores share fixed 0-100 bins so charts line up across audits
+        return (0.0, 100.0) if name in SCORE_COLUMNS else (0.0, max(float(maximum), 1.0))
+
+    def _template_rows(self, metrics):
+        """Largest templates first: page count plus per-page averages of every metric, from the running sums"""
+        pages = self._template_pages
+        largest = sorted(range(len(pages)), key=lambda template_id: -pages[template_id])[:MAX_TEMPLATES]
+        return {
+            self.templates.values[template_id]: dict(
+                {f'average_{self.names[index]}': round(self._template_sums[template_id][index] / pages[template_id], 2)
+                 for index in metrics},
+                pages=pages[template_id]
+            )
+            for template_id in largest
+        }
+
+    def _outlier_rows(self, outliers):
+        """One entry per flagged page listing its outlying metrics, most extreme pages first"""
+        by_row = {}
+        for row, name, value, z in outliers:
+            by_row.setdefault(row, []).append({'metric': name, 'value': value, 'z_score': round(z, 2)})
+        ranked = sorted(by_row.items(), key=lambda item: -max(abs(metric['z_score']) for metric in item[1]))
+        return [{'url': self.urls[row], 'template': self.templates.values[self.template_ids[row]], 'metrics': metrics}
+                for row, metrics in ranked[:MAX_OUTLIERS]]
+
+
+def _percentile(sorted_values, q):
+    """Linear-interpolation percentile, matching numpy's default"""
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
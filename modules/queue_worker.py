@@ -0,0 +1,107 @@
+import os
+import socket
+import threading
+import time
+import uuid
+
+from .task_queue import LeaseLost
+
+
+class RetryTask(Exception):
+    """Raised by a handler when the task failed for a transient reason and should be tried again"""
+
+
+class QueueWorker:
+    """Leases tasks from a TaskQueue and runs the handler registered for each task kind
+
+    handlers map a kind to fn(task) -> (result_key, result). A handler that
+    raises RetryTask (or any other error) releases the task for another
+    attempt. While a handler runs, a heartbeat thread renews the lease; if
+    the lease is lost anyway (e.g. the process stalled), the result is
+    dropped because the task has been re-delivered to another worker.
+    """
+
+    def __init__(self, queue, handlers, worker_id=None, lease_seconds=60, idle_sleep=1.0):
+        self.queue = queue
+        self.handlers = handlers
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}'
+        self.lease_seconds = lease_seconds
+        self.idle_sleep = idle_sleep
+        self.stats = {'completed': 0, 'failed': 0, 'leases_lost': 0}
+
+    def run(self, stop=None, max_tasks=None, exit_when_idle=False):
+        """Work until stop (a threading.Event) is set, max_tasks are done, or (exit_when_idle) the queue drains"""
+        stop = stop or threading.Event()
+        print(f"🕸️ Worker {self.worker_id} polling for {', '.join(self.handlers)} tasks")
+        done = 0
+        while not stop.is_set() and (max_tasks is None or done < max_tasks):
+            try:
+                task = self.queue.lease(self.worker_id, self.lease_seconds, kinds=list(self.handlers))
+            except Exception as e:
+                print(f"⚠️ Worker {self.worker_id} could not lease a task, retrying: {e}")
+                stop.wait(self.idle_sleep)
+                continue
+            if task is None:
+                # A ready-but-cooling-down shard isn't idle; only stop once nothing is left anywhere
+                if exit_when_idle and not self.queue.pending():
+                    break
+                stop.wait(self.idle_sleep)
+                continue
+            self.run_task(task)
+            done += 1
+        print(f"✅ Worker {self.worker_id} stopped: {self.stats}")
+        return self.stats
+
+    def run_task(self, task):
+        lease_lost = threading.Event()
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task['id'], finished, lease_lost),
+                                     name=f'heartbeat-{task["id"]}', daemon=True)
+        heartbeat.start()
+        try:
+            result_key, result = self.handlers[task['kind']](task)
+        except Exception as e:
+            print(f"⚠️ Task {task['id']} ({task['kind']}) attempt {task['attempts']} failed: {e}")
+            self.queue.fail(task['id'], self.worker_id, str(e))
+            self.stats['failed'] += 1
+            return
+        finally:
+            finished.set()
+            heartbeat.join()
+
+        try:
+            if lease_lost.is_set():
+                raise LeaseLost(f"Lease on task {task['id']} lost")
+            self.queue.complete(task['id'], self.worker_id, result_key, result)
+            self.stats['completed'] += 1
+        except LeaseLost as e:
+            print(f"⚠️ {e}; its result is left to the worker it was re-delivered to")
+            self.stats['leases_lost'] += 1
+
+    def _heartbeat(self, task_id, finished, lease_lost):
+        """Renew the lease at a third of its length until the handler returns; database errors are retried"""
+        interval = self.lease_seconds / 3
+        while not finished.wait(interval):
+            try:
+                self.queue.heartbeat(task_id, self.worker_id, self.lease_seconds)
+                interval = self.lease_seconds / 3
+            except LeaseLost:
+                lease_lost.set()
+                return
+            except Exception as e:
+                # e.g. "database is locked": the lease is still ours, so retry soon rather than let it lapse
+                print(f"⚠️ Heartbeat for task {task_id} failed, retrying: {e}")
+                interval = min(1.0, self.lease_seconds / 10)
+
+
+def run_workers(queue, handlers, count=1, lease_seconds=60, stop=None, **run_kwargs):
+    """Start count worker threads on one queue; returns (threads, stop event)"""
+    stop = stop or threading.Event()
+    threads = []
+    for index in range(count):
+        worker = QueueWorker(queue, handlers, lease_seconds=lease_seconds)
+        thread = threading.Thread(target=worker.run, kwargs=dict(run_kwargs, stop=stop),
+                                  name=f'queue-worker-{index}', daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads, stop
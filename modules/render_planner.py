@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from .page_fingerprint import visible_strings
+
+RENDER_MODES = ('static', 'auto', 'browser')
+
+# Elements client-side frameworks mount into; empty in the server HTML of a shell
+MOUNT_POINTS = ['#root', '#app', '#__next', '#__nuxt', '#svelte', '#ember-app', '[data-reactroot]', 'app-root']
+NOSCRIPT_WARNINGS = ('enable javascript', 'javascript is required', 'javascript enabled', 'requires javascript')
+
+
+def detect_spa_shell(soup, min_text=200, min_text_ratio=0.05):
+    """Decide whether server HTML is an unrendered client-side app shell
+
+    Returns a dict with is_shell, the signals that fired and the text/script sizes.
+    """
+    signals = []
+    for selector in MOUNT_POINTS:
+        mount = soup.select_one(selector)
+        if mount is not None and mount.find(True) is None and not mount.get_text(strip=True):
+            signals.append(f'empty_mount:{selector}')
+
+    for noscript in soup.find_all('noscript'):
+        if any(warning in noscript.get_text(' ', strip=True).lower() for warning in NOSCRIPT_WARNINGS):
+            signals.append('noscript_warning')
+            break
+
+    text_length = sum(len(text.strip()) for text in visible_strings(soup))
+    scripts = soup.find_all('script')
+    script_length = sum(len(script.string or '') for script in scripts)
+    text_ratio = text_length / (text_length + script_length) if text_length + script_length else 1.0
+
+    low_text = text_length < min_text and len(scripts) > 0
+    if low_text:
+        signals.append('low_text')
+    if text_ratio < min_text_ratio:
+        signals.append('script_heavy')
+
+    empty_mount = any(signal.startswith('empty_mount') for signal in signals)
+    is_shell = empty_mount or (low_text and ('noscript_warning' in signals or 'script_heavy' in signals))
+
+    return {
+        'is_shell': is_shell,
+        'signals': signals,
+        'text_length': text_length,
+        'script_length': script_length,
+        'scripts': len(scripts),
+        'text_ratio': round(text_ratio, 4)
+    }
+
+
+class RenderPlanner:
+    """Remembers per host whether pages needed a headless render
+
+    Once a host's static pages have almost always been shells, later pages on
+    it go straight to the browser; every reprobe_every-th page still takes
+    the static path so a site that moves to server rendering is noticed.
+    """
+
+    def __init__(self, min_samples=3, shell_fraction=0.8, reprobe_every=20, max_hosts=10000):
+        self.min_samples = min_samples
+        self.shell_fraction = shell_fraction
+        self.reprobe_every = reprobe_every
+        self.max_hosts = max_hosts
+        self._hosts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, host):
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = {'static': 0, 'shell': 0, 'direct_renders': 0}
+            while len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+        self._hosts.move_to_end(host)
+        return entry
+
+    def prefers_render(self, url):
+        """True when the static fetch for this URL can be skipped"""
+        with self._lock:
+            entry = self._entry(urlparse(url).netloc)
+            samples = entry['static'] + entry['shell']
+            if samples < self.min_samples or entry['shell'] < samples * self.shell_fraction:
+                return False
+            entry['direct_renders'] += 1
+            return entry['direct_renders'] % self.reprobe_every != 0
+
+    def record(self, url, is_shell):
+        with self._lock:
+            entry = self._entry(urlparse(url).netloc)
+            entry['shell' if is_shell else 'static'] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hosts': len(self._hosts),
+                'render_hosts': sum(
+                    1 for entry in self._hosts.values()
+                    if entry['static'] + entry['shell'] >= self.min_samples
+                    and entry['shell'] >= (entry['static'] + entry['shell']) * self.shell_fraction
+                )
+            }
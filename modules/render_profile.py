@@ -0,0 +1,241 @@
+import time
+from urllib.parse import urlparse
+
+# Selenium can only block by URL pattern, so resource types map to file extensions there
+TYPE_URL_PATTERNS = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'],
+    'media': ['*.mp4*', '*.webm*', '*.ogg*', '*.mp3*', '*.m4a*', '*.wav*', '*.m3u8*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'stylesheet': ['*.css*'],
+}
+
+# Typical transfer size per request by resource type (HTTP Archive medians, rounded), used to
+# estimate what blocking saved: blocked requests never get a response to measure
+TYPICAL_BYTES = {
+    'image': 20000,
+    'media': 500000,
+    'font': 30000,
+    'stylesheet': 10000,
+    'script': 20000,
+}
+
+
+def _site(host):
+    """Rough registrable domain: the last two host labels"""
+    return '.'.join(host.lower().split(':')[0].split('.')[-2:])
+
+
+class RenderProfile:
+    """What a headless render downloads and how long it waits for the page to settle"""
+
+    def __init__(self, name='custom', block_types=('image', 'media', 'font'), block_third_party_scripts=False,
+                 quiet_period_ms=500, max_wait_ms=10000, viewport=(1920, 1080), measure_blocked=True):
+        self.name = name
+        self.block_types = frozenset(block_types)
+        self.block_third_party_scripts = block_third_party_scripts
+        self.quiet_period_ms = quiet_period_ms
+        self.max_wait_ms = max_wait_ms
+        self.viewport = viewport
+        self.measure_blocked = measure_blocked
+
+    @property
+    def blocks_anything(self):
+        return bool(self.block_types) or self.block_third_party_scripts
+
+    def should_block(self, resource_type, url, page_url):
+        if resource_type in self.block_types:
+            return True
+        if self.block_third_party_scripts and resource_type == 'script':
+            return _site(urlparse(url).netloc) != _site(urlparse(page_url).netloc)
+        return False
+
+    def url_patterns(self):
+        """Blocked types as URL patterns for Chrome's Network.setBlockedURLs"""
+        return [pattern for resource_type in sorted(self.block_types) for pattern in TYPE_URL_PATTERNS.get(resource_type, [])]
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'block_types': sorted(self.block_types),
+            'block_third_party_scripts': self.block_third_party_scripts,
+            'quiet_period_ms': self.quiet_period_ms,
+            'max_wait_ms': self.max_wait_ms
+        }
+
+
+PROFILES = {
+    # DOM analysis only: skip heavy assets, wait for DOMContentLoaded plus a short network lull
+    'lean': RenderProfile('lean'),
+    # Also drop stylesheets and other sites' scripts (trackers, widgets)
+    'minimal': RenderProfile('minimal', block_types=('image', 'media', 'font', 'stylesheet'),
+                             block_third_party_scripts=True, quiet_period_ms=300, max_wait_ms=8000),
+    # Everything loads, as a real visitor would see it
+    'full': RenderProfile('full', block_types=(), quiet_period_ms=1000, max_wait_ms=30000, measure_blocked=False),
+}
+
+
+def get_profile(profile):
+    """Accept a RenderProfile, a profile name or None (lean)"""
+    if isinstance(profile, RenderProfile):
+        return profile
+    name = (profile or 'lean').lower()
+    if name not in PROFILES:
+        raise ValueError(f"render_profile must be one of {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+class PageWeightTracker:
+    """Watches one render's requests: in-flight count, loaded bytes and what was blocked"""
+
+    def __init__(self, profile, page_url):
+        self.profile = profile
+        self.page_url = page_url
+        self.inflight = 0
+        self.last_activity = time.monotonic()
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self.blocked = []
+
+    def should_block(self, resource_type, url):
+        if url.startswith('data:') or not self.profile.should_block(resource_type, url, self.page_url):
+            return False
+        self.blocked.append((url, resource_type))
+        return True
+
+    def on_request(self, _request=None):
+        self.inflight += 1
+        self.last_activity = time.monotonic()
+
+    def on_request_done(self, _request=None):
+        self.inflight = max(0, self.inflight - 1)
+        self.last_activity = time.monotonic()
+
+    def on_request_finished(self, request):
+        """Count the body bytes actually received (encoded size, so compressed and chunked responses count too)"""
+        self.on_request_done(request)
+        self.loaded_requests += 1
+        try:
+            self.loaded_bytes += max(0, request.sizes().get('responseBodySize', 0))
+        except Exception:
+            pass
+
+    def wait_for_quiet(self, sleep):
+        """Poll until no request has been in flight for the quiet period, or the hard cap"""
+        quiet = self.profile.quiet_period_ms / 1000
+        deadline = time.monotonic() + self.profile.max_wait_ms / 1000
+        while True:
+            now = time.monotonic()
+            if self.inflight == 0 and now - self.last_activity >= quiet:
+                return 'quiet'
+            if now >= deadline:
+                return 'max_wait'
+            sleep(0.05)
+
+    def report(self):
+        """Loaded and blocked request totals; blocked sizes are estimated from their resource types"""
+        by_type = {}
+        for _, resource_type in self.blocked:
+            by_type[resource_type] = by_type.get(resource_type, 0) + 1
+        result = {
+            'loaded_requests': self.loaded_requests,
+            'loaded_bytes': self.loaded_bytes,
+            'blocked_requests': len(self.blocked),
+            'blocked_by_type': by_type
+        }
+        if self.profile.measure_blocked and self.blocked:
+            result.update(estimate_blocked_bytes(by_type))
+        return result
+
+
+def estimate_blocked_bytes(blocked_by_type):
+    """Rough bytes saved by blocking, from per-type request counts; no request is made
+
+    blocked_sizes_estimated counts requests whose size was guessed from TYPICAL_BYTES
+    for their type (none was measured); blocked_sizes_unknown those with no typical size.
+    """
+    estimated = {resource_type: count for resource_type, count in blocked_by_type.items() if resource_type in TYPICAL_BYTES}
+    return {
+        'blocked_bytes_estimate': sum(TYPICAL_BYTES[resource_type] * count for resource_type, count in estimated.items()),
+        'blocked_sizes_estimated': sum(estimated.values()),
+        'blocked_sizes_unknown': sum(blocked_by_type.values()) - sum(estimated.values())
+    }
+
+
+def prepare_playwright_page(context, page, profile, page_url, recorder=None):
+    """Install request blocking and tracking on a Playwright page; returns the tracker
+
+    recorder (a BeaconRecorder) additionally sees every outgoing request.
+    """
+    tracker = PageWeightTracker(profile, page_url)
+    if profile.blocks_anything:
+        def handle(route):
+            request = route.request
+            if tracker.should_block(request.resource_type, request.url):
+                route.abort()
+            else:
+                route.continue_()
+        context.route('**/*', handle)
+    page.on('request', tracker.on_request)
+    page.on('requestfinished', tracker.on_request_finished)
+    page.on('requestfailed', tracker.on_request_done)
+    if recorder is not None:
+        page.on('request', recorder.record_playwright)
+    return tracker
+
+
+def playwright_goto(page, url, tracker, timeout):
+    """DOMContentLoaded, then wait for a network lull capped by the profile; returns (response, wait outcome)"""
+    response = page.goto(url, wait_until='domcontentloaded', timeout=timeout * 1000)
+    outcome = tracker.wait_for_quiet(lambda seconds: page.wait_for_timeout(seconds * 1000))
+    return response, outcome
+
+
+def apply_selenium_options(chrome_options, profile):
+    """Chrome options that must be set before the driver starts"""
+    # Return control at DOMContentLoaded; the quiet-period wait covers the rest
+    chrome_options.page_load_strategy = 'eager'
+    chrome_options.add_argument(f'--window-size={profile.viewport[0]},{profile.viewport[1]}')
+
+
+def apply_selenium_blocking(driver, profile):
+    """Per-render URL blocking through the DevTools protocol (Chrome only)"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': profile.url_patterns()})
+    except Exception as e:
+        print(f"⚠️ Request blocking unavailable: {e}")
+
+
+_RESOURCE_COUNT_JS = "return performance.getEntriesByType('resource').length"
+_TRANSFER_SIZE_JS = """
+    return performance.getEntriesByType('resource').concat(performance.getEntriesByType('navigation'))
+        .reduce((total, entry) => total + (entry.transferSize || 0), 0)
+"""
+
+
+def selenium_wait_for_quiet(driver, profile):
+    """Wait until no new resource timing entries appear for the quiet period, capped by the profile"""
+    quiet = profile.quiet_period_ms / 1000
+    deadline = time.monotonic() + profile.max_wait_ms / 1000
+    count = driver.execute_script(_RESOURCE_COUNT_JS)
+    changed_at = time.monotonic()
+    while True:
+        time.sleep(0.05)
+        now = time.monotonic()
+        current = driver.execute_script(_RESOURCE_COUNT_JS)
+        if current != count:
+            count, changed_at = current, now
+        elif now - changed_at >= quiet:
+            return 'quiet'
+        if now >= deadline:
+            return 'max_wait'
+
+
+def selenium_page_weight(driver):
+    try:
+        return {
+            'loaded_requests': driver.execute_script(_RESOURCE_COUNT_JS),
+            'loaded_bytes': driver.execute_script(_TRANSFER_SIZE_JS)
+        }
+    except Exception:
+        return {}
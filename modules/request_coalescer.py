@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from .link_graph import normalize_url
+
+
+def coalesce_key(url, options):
+    """Identity of an analysis: the normalized URL plus the options that change its result"""
+    return normalize_url(url) + '|' + json.dumps(options, sort_keys=True, default=str)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class RequestCoalescer:
+    """Singleflight for identical analyses plus a short-lived cache of their results
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for the same result instead of repeating it, and callers
+    arriving within ttl seconds after it finished get the cached result.
+    Failures are shared with the waiters but never cached.
+    """
+
+    def __init__(self, ttl=30, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._calls = {}
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'executed': 0, 'joined': 0, 'cached': 0}
+
+    def run(self, key, fn, cacheable=None):
+        """Return (result, outcome) where outcome is 'executed', 'joined' or 'cached'
+
+        cacheable(result) can veto keeping a result (e.g. a partial one) after it finishes.
+        """
+        with self._lock:
+            item = self._recent.get(key)
+            if item is not None:
+                result, expires = item
+                if expires >= time.monotonic():
+                    self._stats['cached'] += 1
+                    return result, 'cached'
+                del self._recent[key]
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['executed'] += 1
+            else:
+                call.waiters += 1
+                self._stats['joined'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, 'joined'
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.ttl > 0 and (cacheable is None or cacheable(call.result)):
+                    self._recent[key] = (call.result, time.monotonic() + self.ttl)
+                    self._recent.move_to_end(key)
+                    while len(self._recent) > self.max_entries:
+                        self._recent.popitem(last=False)
+            call.done.set()
+        return call.result, 'executed'
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls), cached_results=len(self._recent))
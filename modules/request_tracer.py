@@ -0,0 +1,170 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def current_tracer():
+    """Return the tracer active on this thread, if any"""
+    return getattr(_local, 'tracer', None)
+
+
+class Span:
+    def __init__(self, name, attributes=None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.children = []
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self._lock = threading.Lock()
+        self._wall_start = None
+        self._cpu_start = None
+
+    def start(self):
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+
+    def stop(self):
+        self.wall_time = time.perf_counter() - self._wall_start
+        self.cpu_time = time.thread_time() - self._cpu_start
+
+    def add_child(self, span):
+        with self._lock:
+            self.children.append(span)
+
+    def to_dict(self):
+        data = {
+            'name': self.name,
+            'wall_ms': round(self.wall_time * 1000, 2),
+            'cpu_ms': round(self.cpu_time * 1000, 2),
+        }
+        if self.attributes:
+            data['attributes'] = self.attributes
+        if self.children:
+            data['children'] = [child.to_dict() for child in self.children]
+        return data
+
+
+class RequestTracer:
+    """Collects a tree of timed spans for a single API request"""
+
+    def __init__(self, enabled=True, name='request'):
+        self.enabled = enabled
+        self.root = Span(name)
+        self.root.start()
+
+    @contextmanager
+    def activate(self, parent=None):
+        """Make this tracer current on the calling thread"""
+        if not self.enabled:
+            yield self
+            return
+
+        previous = (getattr(_local, 'tracer', None), getattr(_local, 'stack', None))
+        _local.tracer = self
+        _local.stack = [parent or self.root]
+        try:
+            yield self
+        finally:
+            _local.tracer, _local.stack = previous
+
+    def current_span(self):
+        stack = getattr(_local, 'stack', None)
+        return stack[-1] if stack and _local.tracer is self else self.root
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time a block as a child of the current span"""
+        if not self.enabled:
+            yield None
+            return
+
+        span = Span(name, attributes)
+        self.current_span().add_child(span)
+        stack = getattr(_local, 'stack', None)
+        if stack is not None and _local.tracer is self:
+            stack.append(span)
+        span.start()
+        try:
+            yield span
+        except Exception as e:
+            span.attributes['error'] = str(e)
+            raise
+        finally:
+            span.stop()
+            if stack is not None and _local.tracer is self:
+                stack.pop()
+
+    def to_dict(self):
+        self.root.stop()
+        return self.root.to_dict()
+
+
+class SamplingProfiler:
+    """Periodically samples one thread's call stack and tallies hot functions"""
+
+    def __init__(self, thread_id=None, interval=0.005, max_depth=64):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.self_counts = {}
+        self.total_counts = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self._record(frame)
+
+    def _record(self, frame):
+        self.samples += 1
+        seen = set()
+        depth = 0
+        top = True
+        while frame is not None and depth < self.max_depth:
+            code = frame.f_code
+            key = f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+            if top:
+                self.self_counts[key] = self.self_counts.get(key, 0) + 1
+                top = False
+            if key not in seen:
+                seen.add(key)
+                self.total_counts[key] = self.total_counts.get(key, 0) + 1
+            frame = frame.f_back
+            depth += 1
+
+    def summary(self, limit=20):
+        """Return the hottest functions by inclusive sample count"""
+        self.stop()
+        samples = self.samples or 1
+        hot = sorted(self.total_counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return {
+            'samples': self.samples,
+            'interval_ms': self.interval * 1000,
+            'hot_functions': [
+                {
+                    'function': key,
+                    'self_samples': self.self_counts.get(key, 0),
+                    'total_samples': count,
+                    'self_percent': round(self.self_counts.get(key, 0) / samples * 100, 1),
+                    'total_percent': round(count / samples * 100, 1)
+                }
+                for key, count in hot
+            ]
+        }
@@ -0,0 +1,95 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+
+class ResultStore:
+    """Bounded in-memory store of finished audit results, keyed by result id"""
+
+    def __init__(self, max_results=50):
+        self.max_results = max_results
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, results):
+        result_id = uuid.uuid4().hex
+        with self._lock:
+            self._results[result_id] = results
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result_id
+
+    def get(self, result_id):
+        with self._lock:
+            return self._results.get(result_id)
+
+    def values(self):
+        """Snapshot of the stored results, oldest first"""
+        with self._lock:
+            return list(self._results.values())
+
+
+def parse_field_list(value):
+    """Accept 'a,b.c' strings or lists; None means 'not specified'"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [field.strip() for field in value if field and field.strip()]
+
+
+def _as_dict(value):
+    # Slotted audit records are projected through the dict they serialize to
+    return value.to_dict() if hasattr(value, 'to_dict') else value
+
+
+def _pick(source, target, parts):
+    source = _as_dict(source)
+    if not isinstance(source, dict) or parts[0] not in source:
+        return
+    key = parts[0]
+    if len(parts) == 1:
+        target[key] = source[key]
+    else:
+        _pick(source[key], target.setdefault(key, {}), parts[1:])
+
+
+def _drop(source, parts):
+    fields = _as_dict(source)
+    if not isinstance(fields, dict) or parts[0] not in fields:
+        return source
+    # Copy along the path so stored results are never mutated
+    trimmed = dict(fields)
+    if len(parts) == 1:
+        del trimmed[parts[0]]
+    else:
+        trimmed[parts[0]] = _drop(fields[parts[0]], parts[1:])
+    return trimmed
+
+
+def project(record, fields=None, exclude=None):
+    """Keep only dotted-path fields, then drop dotted-path exclusions"""
+    if fields:
+        projected = {}
+        for path in fields:
+            _pick(record, projected, path.split('.'))
+    else:
+        projected = record
+    for path in exclude or []:
+        projected = _drop(projected, path.split('.'))
+    return projected
+
+
+def paginate(items, page=1, page_size=100):
+    """Slice a list and describe where the next page starts"""
+    page = max(1, page)
+    page_size = max(1, page_size)
+    total_pages = max(1, -(-len(items) // page_size))
+    start = (page - 1) * page_size
+    return items[start:start + page_size], {
+        'page': page,
+        'page_size': page_size,
+        'total_items': len(items),
+        'total_pages': total_pages,
+        'next_page': page + 1 if page < total_pages else None
+    }
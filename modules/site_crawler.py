@@ -0,0 +1,86 @@
+import time
+from collections import deque
+
+import requests
+
+from .extract_links import ExtractLinks
+from .link_graph import normalize_url
+from .page_decoder import decode_html
+
+
+class FifoFrontier:
+    """In-memory breadth-first frontier; other frontiers implement push/pop/__len__"""
+
+    def __init__(self):
+        self._queue = deque()
+        self._seen = set()
+
+    def push(self, url, depth):
+        """Queue a URL unless it was queued before; returns True when it was added"""
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        self._queue.append((url, depth))
+        return True
+
+    def pop(self):
+        return self._queue.popleft()
+
+    def __len__(self):
+        return len(self._queue)
+
+
+class SiteCrawler:
+    """Follows internal links breadth-first and yields each fetched page"""
+
+    def __init__(self, max_pages=200, max_depth=None, timeout=10, frontier=None):
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.timeout = timeout
+        self.frontier = frontier if frontier is not None else FifoFrontier()
+        self.extractor = ExtractLinks()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+
+    def fetch_page(self, url, depth):
+        """Fetch one page and pull its links; errors are reported in the page dict"""
+        page = {'url': url, 'depth': depth, 'status': None, 'html': None,
+                'internal_links': [], 'external_links': []}
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            page['status'] = response.status_code
+            page['final_url'] = response.url
+            content_type = response.headers.get('Content-Type', '')
+            if response.ok and ('html' in content_type or not content_type):
+                page['html'], _ = decode_html(response)
+                page['internal_links'], page['external_links'] = \
+                    self.extractor.links_from_html(page['html'], response.url)
+        except requests.RequestException as e:
+            page['error'] = str(e)
+        page['fetch_time'] = time.perf_counter() - start
+        return page
+
+    def crawl(self, start_url, already_crawled=0):
+        """Generator of page dicts in crawl order, stopping at max_pages
+
+        already_crawled counts pages fetched before a resume, so the page
+        budget covers the whole job.
+        """
+        print(f"🕸️ Crawling {start_url} (max {self.max_pages} pages)")
+        self.frontier.push(normalize_url(start_url), 0)
+        crawled = already_crawled
+        while len(self.frontier) and crawled < self.max_pages:
+            url, depth = self.frontier.pop()
+            page = self.fetch_page(url, depth)
+            crawled += 1
+
+            if self.max_depth is None or depth < self.max_depth:
+                for link in page['internal_links']:
+                    self.frontier.push(normalize_url(link.url), depth + 1)
+
+            yield page
+
+        print(f"✅ Crawl finished: {crawled} pages, {len(self.frontier)} still queued")
@@ -1,21 +1,33 @@
+import re
 import requests
 from urllib.parse import urljoin, urlparse
 import xml.etree.ElementTree as ET
 
+from .page_decoder import resolve_encoding
+
 class SitemapParser:
-    def __init__(self):
+    def __init__(self, max_bytes=10 * 1024 * 1024, chunk_size=64 * 1024):
+        # A sitemap is read incrementally and never beyond max_bytes
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
     
-    def parse_sitemap(self, url):
-        """Parse sitemap.xml to find URLs"""
+    def parse_sitemap(self, url, limit=100):
+        """Parse sitemap.xml to find URLs (limit=None returns every URL up to max_bytes)
+
+        'entries' carries each URL's <priority> and <lastmod> when the sitemap has them.
+        Reading stops once limit URLs were found, so 'truncated' means
+        'total_found' only counts what was read.
+        """
         try:
             print(f"🗺️ Parsing sitemap for: {url}")
             
             base_url = f"{urlparse(url).scheme}://{urlparse(url).netloc}"
-            sitemap_urls = []
+            sitemap_entries = []
+            truncated = False
             
             # Try common sitemap locations
             sitemap_locations = [
@@ -26,63 +38,101 @@ class SitemapParser:
             
             for sitemap_url in sitemap_locations:
                 try:
-                    urls = self._parse_single_sitemap(sitemap_url)
-                    sitemap_urls.extend(urls)
-                    if urls:  # If we found URLs, break
+                    entries, truncated = self._parse_single_sitemap(sitemap_url, max_entries=limit)
+                    sitemap_entries.extend(entries)
+                    if entries:  # If we found URLs, break
                         break
                 except Exception as e:
                     print(f"⚠️ Failed to parse {sitemap_url}: {e}")
                     continue
             
             # Remove duplicates
-            unique_urls = list(set(sitemap_urls))
+            unique_entries = list({entry['url']: entry for entry in sitemap_entries}.values())
             
-            print(f"✅ Found {len(unique_urls)} URLs in sitemaps")
+            print(f"✅ Found {len(unique_entries)} URLs in sitemaps")
             
             return {
-                'urls': unique_urls[:100],  # Limit to 100 URLs
-                'total_found': len(unique_urls)
+                'urls': [entry['url'] for entry in unique_entries[:limit]],  # Limit to 100 URLs by default
+                'entries': unique_entries[:limit],
+                'total_found': len(unique_entries),
+                'truncated': truncated
             }
             
         except Exception as e:
             print(f"❌ Sitemap parsing failed: {e}")
             return {
                 'urls': [],
+                'entries': [],
                 'total_found': 0,
                 'error': str(e)
             }
     
-    def _parse_single_sitemap(self, sitemap_url):
-        """Parse a single sitemap XML file"""
+    def _parse_single_sitemap(self, sitemap_url, max_entries=None):
+        """Parse one sitemap XML file into {'url', 'priority', 'lastmod'} entries as it downloads
+
+        Returns (entries, truncated): reading stops after max_entries URLs or
+        max_bytes, whichever comes first.
+        """
         try:
-            response = self.session.get(sitemap_url, timeout=10)
-            response.raise_for_status()
-            
-            # Try to parse as XML
+            response = self.session.get(sitemap_url, timeout=10, stream=True)
             try:
-                root = ET.fromstring(response.content)
-                urls = []
-                
-                # Handle regular sitemap files
-                for url_elem in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'):
-                    loc = url_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                    if loc is not None:
-                        urls.append(loc.text)
-                
-                # If no URLs found with namespace, try without
-                if not urls:
-                    for url_elem in root.findall('.//url'):
-                        loc = url_elem.find('loc')
-                        if loc is not None:
-                            urls.append(loc.text)
-                
-                return urls
+                response.raise_for_status()
                 
-            except ET.ParseError:
-                # If XML parsing fails, try to extract URLs with regex
-                import re
-                urls = re.findall(r'<loc>(.*?)</loc>', response.text)
-                return urls
+                parser = ET.XMLPullParser(events=('end',))
+                raw = bytearray()
+                entries = []
+                truncated = False
+                xml_ok = True
+                for chunk in response.iter_content(self.chunk_size):
+                    chunk = chunk[:self.max_bytes - len(raw)]
+                    raw += chunk
+                    if xml_ok:
+                        try:
+                            parser.feed(chunk)
+                            for _, elem in parser.read_events():
+                                # Regular sitemaps are namespaced, some aren't; match on the local name
+                                if _local_name(elem.tag) == 'url':
+                                    entry = self._url_entry(elem)
+                                    if entry:
+                                        entries.append(entry)
+                                    elem.clear()
+                        except ET.ParseError:
+                            xml_ok = False
+                    if max_entries is not None and len(entries) >= max_entries:
+                        truncated = True
+                        break
+                    if len(raw) >= self.max_bytes:
+                        print(f"⚠️ Sitemap {sitemap_url} is larger than {self.max_bytes} bytes, reading no further")
+                        truncated = True
+                        break
+            finally:
+                response.close()
+            
+            if not xml_ok:
+                # If XML parsing fails, extract URLs with a regex over what was read
+                encoding = resolve_encoding(response, bytes(raw[:4096])) or 'utf-8'
+                urls = re.findall(r'<loc>(.*?)</loc>', raw.decode(encoding, errors='replace'))
+                entries = [{'url': url.strip(), 'priority': None, 'lastmod': None} for url in urls[:max_entries]]
+            return entries, truncated
                 
         except Exception as e:
             raise Exception(f"Failed to parse sitemap: {e}")
+    
+    def _url_entry(self, url_elem):
+        fields = {_local_name(child.tag): (child.text or '').strip() for child in url_elem}
+        if not fields.get('loc'):
+            return None
+        try:
+            priority = float(fields['priority']) if fields.get('priority') else None
+        except ValueError:
+            priority = None
+        return {
+            'url': fields['loc'],
+            'priority': priority,
+            'lastmod': fields.get('lastmod') or None
+        }
+
+
+def _local_name(tag):
+    """'{namespace}url' -> 'url'"""
+    return tag.rsplit('}', 1)[-1]
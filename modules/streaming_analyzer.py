@@ -0,0 +1,383 @@
+import codecs
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from .audit_records import LinkRecord
+from .page_decoder import PRESCAN_BYTES, resolve_encoding
+
+# Substring signatures matched case-insensitively against the raw markup
+CMS_SIGNATURES = {
+    'WordPress': ['wp-content', 'wp-includes'],
+    'Shopify': ['shopify', 'cdn.shopify'],
+    'Drupal': ['drupal'],
+    'Joomla': ['joomla'],
+    'Wix': ['wix.com', 'wixstatic.com'],
+    'Squarespace': ['squarespace'],
+}
+
+ANALYTICS_SIGNATURES = {
+    'Google Analytics': ['google-analytics', 'gtag(', 'ga('],
+    'Google Tag Manager': ['googletagmanager'],
+    'Facebook Pixel': ['facebook.net', 'fbq('],
+    'Hotjar': ['hotjar'],
+    'Mixpanel': ['mixpanel'],
+}
+
+SOCIAL_PATTERNS = ['facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com', 'youtube.com', 'tiktok.com']
+IMPORTANT_META = ['description', 'keywords', 'author', 'viewport', 'robots']
+
+
+class SignatureMatcher:
+    """Finds signature substrings in text fed piece by piece"""
+
+    def __init__(self, signatures):
+        self.signatures = signatures
+        self.matched = set()
+        self._overlap = max(len(p) for patterns in signatures.values() for p in patterns) - 1
+        self._tail = ''
+
+    def feed(self, text):
+        window = (self._tail + text).lower()
+        for name, patterns in self.signatures.items():
+            if name not in self.matched and any(p in window for p in patterns):
+                self.matched.add(name)
+        self._tail = window[-self._overlap:] if self._overlap else ''
+
+    def detected(self):
+        return [name for name in self.signatures if name in self.matched]
+
+
+class _PageEventParser(HTMLParser):
+    """Counts elements and collects links from tokenizer events"""
+
+    def __init__(self, url, max_elements, max_links):
+        super().__init__(convert_charrefs=True)
+        self.url = url
+        self.base_domain = urlparse(url).netloc
+        self.max_elements = max_elements
+        self.max_links = max_links
+        self.limit_reached = False
+
+        self.tag_counts = {}
+        self.total_elements = 0
+        self.heading_samples = {f'h{i}': [] for i in range(1, 7)}
+        self.images_with_alt = 0
+        self.images_without_alt = 0
+        self.forms = []
+        self.stylesheets = 0
+        self.meta_tags = 0
+        self.important_meta = {}
+        self.generator = ''
+
+        self.link_counts = {'total': 0, 'internal': 0, 'external': 0, 'email': 0, 'phone': 0}
+        self.links_without_text = 0
+        self.links_without_label = 0
+        self.social_platforms = set()
+        self.internal_links = []
+        self.external_links = []
+        self._seen_urls = set()
+
+        self._form = None
+        self._anchor = None
+        self._heading = None
+
+    def handle_starttag(self, tag, attrs):
+        self.total_elements += 1
+        if self.total_elements > self.max_elements:
+            self.limit_reached = True
+            return
+        self.tag_counts[tag] = self.tag_counts.get(tag, 0) + 1
+        attrs = dict(attrs)
+
+        if tag == 'a' and attrs.get('href') is not None:
+            self._start_anchor(attrs)
+        elif tag in self.heading_samples:
+            self._heading = (tag, [])
+        elif tag == 'img':
+            if attrs.get('alt'):
+                self.images_with_alt += 1
+            else:
+                self.images_without_alt += 1
+        elif tag == 'form':
+            self._form = {
+                'action': attrs.get('action') or '',
+                'method': attrs.get('method') or 'GET',
+                'inputs': 0, 'textareas': 0, 'selects': 0, 'buttons': 0
+            }
+            self.forms.append(self._form)
+        elif tag == 'meta':
+            self._handle_meta(attrs)
+        elif tag == 'link' and 'stylesheet' in (attrs.get('rel') or '').lower().split():
+            self.stylesheets += 1
+
+        if self._form is not None:
+            if tag == 'input':
+                self._form['inputs'] += 1
+            elif tag == 'textarea':
+                self._form['textareas'] += 1
+            elif tag == 'select':
+                self._form['selects'] += 1
+            elif tag == 'button':
+                self._form['buttons'] += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == 'a':
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._anchor is not None:
+            self._finish_anchor()
+        elif self._heading is not None and tag == self._heading[0]:
+            level, parts = self._heading
+            if len(self.heading_samples[level]) < 3:
+                self.heading_samples[level].append(''.join(parts).strip()[:50])
+            self._heading = None
+        elif tag == 'form':
+            self._form = None
+
+    def handle_data(self, data):
+        if self._anchor is not None and len(self._anchor['text']) < 100:
+            self._anchor['text'] += data
+        if self._heading is not None and sum(len(p) for p in self._heading[1]) < 50:
+            self._heading[1].append(data)
+
+    def _start_anchor(self, attrs):
+        if self._anchor is not None:
+            self._finish_anchor()
+        self._anchor = {'href': attrs.get('href', ''), 'title': attrs.get('title', ''),
+                        'aria_label': attrs.get('aria-label'), 'text': ''}
+
+    def _finish_anchor(self):
+        anchor, self._anchor = self._anchor, None
+        href = anchor['href']
+        text = ' '.join(anchor['text'].split())[:100]
+        counts = self.link_counts
+        counts['total'] += 1
+
+        if not text:
+            self.links_without_text += 1
+            if not anchor['aria_label']:
+                self.links_without_label += 1
+
+        if href.startswith('mailto:'):
+            counts['email'] += 1
+        elif href.startswith('tel:'):
+            counts['phone'] += 1
+        elif href.startswith('http'):
+            if urlparse(href).netloc == self.base_domain:
+                counts['internal'] += 1
+            else:
+                counts['external'] += 1
+
+        lowered = href.lower()
+        for pattern in SOCIAL_PATTERNS:
+            if pattern in lowered:
+                self.social_platforms.add(pattern.replace('.com', '').title())
+                break
+
+        self._collect_link(href.strip(), text, anchor['title'])
+
+    def _collect_link(self, href, text, title):
+        if not href or href.startswith('#') or href.startswith('javascript:'):
+            return
+        absolute_url = urljoin(self.url, href)
+        parsed_url = urlparse(absolute_url)
+        if parsed_url.scheme not in ['http', 'https'] or absolute_url in self._seen_urls:
+            return
+        if len(self._seen_urls) >= self.max_links:
+            return
+        self._seen_urls.add(absolute_url)
+        link_data = LinkRecord(absolute_url, text, title)
+        if parsed_url.netloc == self.base_domain:
+            self.internal_links.append(link_data)
+        else:
+            self.external_links.append(link_data)
+
+    def _handle_meta(self, attrs):
+        self.meta_tags += 1
+        name = attrs.get('name') or attrs.get('property')
+        content = attrs.get('content')
+        if name and content:
+            if name.lower() in IMPORTANT_META:
+                self.important_meta[name.lower()] = content[:100]
+            if name.lower() == 'generator':
+                self.generator = content.lower()
+
+
+class StreamingAnalyzer:
+    """Single-pass, bounded-memory page analysis over a streamed response"""
+
+    def __init__(self, max_bytes=5 * 1024 * 1024, max_elements=100000, max_links=5000, chunk_size=64 * 1024):
+        self.max_bytes = max_bytes
+        self.max_elements = max_elements
+        self.max_links = max_links
+        self.chunk_size = chunk_size
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+
+    def analyze(self, url, timeout=10, max_bytes=None, max_elements=None):
+        """Stream a page through the tokenizer and return links, elements and detections"""
+        max_bytes = max_bytes or self.max_bytes
+        max_elements = max_elements or self.max_elements
+        try:
+            print(f"🌊 Streaming analysis for: {url}")
+
+            response = self.session.get(url, timeout=timeout, stream=True)
+            try:
+                response.raise_for_status()
+                parser = _PageEventParser(url, max_elements, self.max_links)
+                cms_matcher = SignatureMatcher(CMS_SIGNATURES)
+                analytics_matcher = SignatureMatcher(ANALYTICS_SIGNATURES)
+                decoder = None
+
+                bytes_read = 0
+                truncation_reason = None
+                for chunk in response.iter_content(chunk_size=max(self.chunk_size, PRESCAN_BYTES)):
+                    if decoder is None:
+                        decoder = self._make_decoder(response, chunk)
+                    if bytes_read + len(chunk) > max_bytes:
+                        chunk = chunk[:max_bytes - bytes_read]
+                        truncation_reason = 'max_bytes'
+                    bytes_read += len(chunk)
+
+                    text = decoder.decode(chunk)
+                    cms_matcher.feed(text)
+                    analytics_matcher.feed(text)
+                    parser.feed(text)
+
+                    if parser.limit_reached:
+                        truncation_reason = 'max_elements'
+                    if truncation_reason:
+                        break
+                else:
+                    tail = decoder.decode(b'', final=True) if decoder else ''
+                    cms_matcher.feed(tail)
+                    analytics_matcher.feed(tail)
+                    parser.feed(tail)
+                    parser.close()
+            finally:
+                response.close()
+
+            result = self._build_result(parser, cms_matcher, analytics_matcher)
+            result.update({
+                'bytes_read': bytes_read,
+                'truncated': truncation_reason is not None,
+                'truncation_reason': truncation_reason
+            })
+
+            print(f"✅ Streaming analysis complete ({bytes_read} bytes{', truncated' if truncation_reason else ''})")
+            return result
+
+        except Exception as e:
+            print(f"❌ Streaming analysis failed: {e}")
+            return {
+                'internal_links': [], 'external_links': [], 'total_links': 0,
+                'elements': {'error': str(e)},
+                'truncated': False,
+                'error': str(e)
+            }
+
+    def _make_decoder(self, response, first_chunk):
+        """Pick the encoding from headers or the first chunk, never the whole body"""
+        encoding = resolve_encoding(response, first_chunk)
+        if not encoding:
+            try:
+                codecs.getincrementaldecoder('utf-8')().decode(first_chunk)
+                encoding = 'utf-8'
+            except UnicodeDecodeError:
+                encoding = 'cp1252'
+        return codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    def _build_result(self, parser, cms_matcher, analytics_matcher):
+        counts = parser.tag_counts
+        headings = {f'h{i}': counts.get(f'h{i}', 0) for i in range(1, 7)}
+        total_images = parser.images_with_alt + parser.images_without_alt
+        buttons = counts.get('button', 0)
+        forms = len(parser.forms)
+        accessibility_issues = parser.images_without_alt + parser.links_without_label
+
+        detected_cms = cms_matcher.detected()
+        if 'wordpress' in parser.generator and 'WordPress' not in detected_cms:
+            detected_cms.insert(0, 'WordPress')
+        detected_tools = analytics_matcher.detected()
+
+        elements = {
+            'headings': {
+                'structure': headings,
+                'content_sample': parser.heading_samples,
+                'total_headings': sum(headings.values()),
+                'has_h1': headings['h1'] > 0,
+                'multiple_h1': headings['h1'] > 1
+            },
+            'images': {
+                'total_images': total_images,
+                'with_alt_text': parser.images_with_alt,
+                'missing_alt_text': parser.images_without_alt,
+                'alt_text_percentage': (parser.images_with_alt / total_images * 100) if total_images else 0
+            },
+            'forms': {
+                'total_forms': forms,
+                'form_details': parser.forms,
+                'total_inputs': sum(form['inputs'] for form in parser.forms),
+                'total_buttons': sum(form['buttons'] for form in parser.forms)
+            },
+            'links': {
+                'total_links': parser.link_counts['total'],
+                'internal_links': parser.link_counts['internal'],
+                'external_links': parser.link_counts['external'],
+                'email_links': parser.link_counts['email'],
+                'phone_links': parser.link_counts['phone'],
+                'social_platforms': sorted(parser.social_platforms)
+            },
+            'meta_tags': {
+                'total_meta_tags': parser.meta_tags,
+                'important_tags': parser.important_meta,
+                'has_description': 'description' in parser.important_meta,
+                'has_viewport': 'viewport' in parser.important_meta
+            },
+            'interactive_elements': {
+                'buttons': buttons,
+                'forms': forms,
+                'total_interactive': buttons + forms
+            },
+            'media_elements': {
+                'videos': counts.get('video', 0),
+                'audio': counts.get('audio', 0),
+                'iframes': counts.get('iframe', 0),
+                'total_media': counts.get('video', 0) + counts.get('audio', 0) + counts.get('iframe', 0)
+            },
+            'accessibility': {
+                'score': max(0, 100 - (accessibility_issues * 5)),
+                'issues_found': accessibility_issues,
+                'images_without_alt': parser.images_without_alt,
+                'links_without_text': parser.links_without_text
+            },
+            'page_structure': {
+                'total_elements': min(parser.total_elements, parser.max_elements),
+                'scripts': counts.get('script', 0),
+                'stylesheets': parser.stylesheets,
+                'divs': counts.get('div', 0),
+                'paragraphs': counts.get('p', 0)
+            }
+        }
+
+        return {
+            'internal_links': parser.internal_links,
+            'external_links': parser.external_links,
+            'total_links': len(parser.internal_links) + len(parser.external_links),
+            'cms_detected': {
+                'primary_cms': detected_cms[0] if detected_cms else None,
+                'detected_systems': detected_cms,
+                'total_detected': len(detected_cms)
+            },
+            'analytics_tools': {
+                'detected_tools': detected_tools,
+                'total_detected': len(detected_tools)
+            },
+            'elements': elements
+        }
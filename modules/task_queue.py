@@ -0,0 +1,278 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from .audit_records import record_json
+
+
+class LeaseLost(Exception):
+    """The worker's lease expired and the task may already be running elsewhere"""
+
+
+class TaskQueue:
+    """Durable task queue shared by worker processes through one SQLite file in WAL mode
+
+    Tasks are sharded by host: at most per_host_limit tasks of a shard are
+    leased at once across all workers, and a shard is not leased again until
+    min_interval seconds after its last lease, so politeness holds however
+    many workers run. A lease must be renewed by heartbeat(); tasks whose
+    lease runs out are re-delivered to another worker, up to max_attempts.
+    Results are merged into one results table per job.
+
+    SQLite is the single-machine stand-in: every worker process on the box
+    opens the same file. The broker surface (enqueue, lease, heartbeat,
+    complete, fail) is what a networked broker would implement for a fleet.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            start_url TEXT NOT NULL,
+            options TEXT NOT NULL,
+            enqueued INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            shard TEXT NOT NULL,
+            dedupe_key TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            state TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            available_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_expires REAL,
+            error TEXT,
+            UNIQUE (job_id, dedupe_key)
+        );
+        CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (shard, state, priority, id);
+        CREATE INDEX IF NOT EXISTS tasks_leases ON tasks (state, lease_expires);
+        CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job_id, state);
+        CREATE TABLE IF NOT EXISTS shards (
+            shard TEXT PRIMARY KEY,
+            next_available REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS results (
+            task_id INTEGER PRIMARY KEY,
+            job_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            result_key TEXT NOT NULL,
+            result TEXT NOT NULL,
+            worker TEXT NOT NULL,
+            finished_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS results_job ON results (job_id, task_id);
+        CREATE INDEX IF NOT EXISTS results_finished ON results (job_id, finished_at, task_id);
+    """
+
+    def __init__(self, path, per_host_limit=1, min_interval=0.5, max_attempts=3, retry_delay=10):
+        self.path = path
+        self.per_host_limit = per_host_limit
+        self.min_interval = min_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self):
+        """This thread's connection (sqlite3 connections can't be shared across threads)"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.row_factory = sqlite3.Row
+            self._local.db = db
+        return db
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    # Producer side
+
+    def create_job(self, start_url, options):
+        job_id = uuid.uuid4().hex[:12]
+        with self._transaction() as db:
+            db.execute('INSERT INTO jobs (job_id, start_url, options, created_at) VALUES (?, ?, ?, ?)',
+                       (job_id, start_url, json.dumps(options), time.time()))
+        return job_id
+
+    def job(self, job_id):
+        row = self._connection().execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(row, options=json.loads(row['options']))
+
+    def enqueue(self, job_id, kind, shard, dedupe_key, payload, priority=0, limit=None):
+        """Add one task; returns True unless the job already had it or is out of budget"""
+        return self.enqueue_many(job_id, kind, [(shard, dedupe_key, payload, priority)], limit) == 1
+
+    def enqueue_many(self, job_id, kind, tasks, limit=None):
+        """Add (shard, dedupe_key, payload, priority) tasks in one transaction; returns how many were new
+
+        Tasks whose dedupe_key the job already has are skipped, so this doubles
+        as the job's seen-set. limit caps how many tasks the job may ever
+        enqueue (its page budget).
+        """
+        now = time.time()
+        added = 0
+        with self._transaction() as db:
+            enqueued = db.execute('SELECT enqueued FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if enqueued is None:
+                return 0
+            for shard, dedupe_key, payload, priority in tasks:
+                if limit is not None and enqueued[0] + added >= limit:
+                    break
+                cursor = db.execute(
+                    'INSERT OR IGNORE INTO tasks (job_id, kind, shard, dedupe_key, payload, priority, available_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (job_id, kind, shard, dedupe_key, json.dumps(payload), priority, now))
+                if cursor.rowcount:
+                    added += 1
+                    db.execute('INSERT OR IGNORE INTO shards (shard) VALUES (?)', (shard,))
+            db.execute('UPDATE jobs SET enqueued = enqueued + ? WHERE job_id = ?', (added, job_id))
+        return added
+
+    # Worker side
+
+    def lease(self, worker_id, lease_seconds=60, kinds=None):
+        """Claim the next ready task from a shard with spare politeness budget, or None"""
+        now = time.time()
+        with self._transaction() as db:
+            # Re-deliver tasks whose worker stopped heartbeating, unless they have used up their attempts
+            db.execute("UPDATE tasks SET state = 'failed', lease_owner = NULL, lease_expires = NULL, "
+                       "error = COALESCE(error, 'lease expired') "
+                       "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?", (now, self.max_attempts))
+            db.execute("UPDATE tasks SET state = 'queued', lease_owner = NULL, lease_expires = NULL "
+                       "WHERE state = 'leased' AND lease_expires < ?", (now,))
+
+            busy = [row[0] for row in db.execute(
+                "SELECT shard FROM tasks WHERE state = 'leased' GROUP BY shard HAVING COUNT(*) >= ?",
+                (self.per_host_limit,))]
+            kind_filter = ''
+            params = [now]
+            if kinds:
+                kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+                params.extend(kinds)
+            shard = db.execute(
+                f"SELECT s.shard FROM shards s WHERE s.next_available <= ? "
+                f"AND s.shard NOT IN ({','.join('?' * len(busy))}) "
+                f"AND EXISTS (SELECT 1 FROM tasks t WHERE t.shard = s.shard AND t.state = 'queued' "
+                f"AND t.available_at <= ?{kind_filter}) ORDER BY s.next_available LIMIT 1",
+                [now, *busy, *params]).fetchone()
+            if shard is None:
+                return None
+
+            task = db.execute(
+                f"SELECT * FROM tasks WHERE shard = ? AND state = 'queued' AND available_at <= ?{kind_filter} "
+                f"ORDER BY priority, id LIMIT 1", [shard[0], *params]).fetchone()
+            db.execute("UPDATE tasks SET state = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                       "WHERE id = ?", (worker_id, now + lease_seconds, task['id']))
+            db.execute('UPDATE shards SET next_available = ? WHERE shard = ?', (now + self.min_interval, shard[0]))
+        return dict(task, payload=json.loads(task['payload']), attempts=task['attempts'] + 1)
+
+    def heartbeat(self, task_id, worker_id, lease_seconds=60):
+        """Extend a lease; raises LeaseLost when the task was re-delivered"""
+        with self._transaction() as db:
+            cursor = db.execute("UPDATE tasks SET lease_expires = ? WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                                (time.time() + lease_seconds, task_id, worker_id))
+            if not cursor.rowcount:
+                raise LeaseLost(f'Lease on task {task_id} lost')
+
+    def complete(self, task_id, worker_id, result_key, result):
+        """Store the task's result in the job's merged results; raises LeaseLost if the lease ran out"""
+        with self._transaction() as db:
+            task = db.execute("SELECT job_id, kind FROM tasks WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                              (task_id, worker_id)).fetchone()
+            if task is None:
+                raise LeaseLost(f'Lease on task {task_id} lost')
+            db.execute("UPDATE tasks SET state = 'done', lease_owner = NULL, lease_expires = NULL WHERE id = ?", (task_id,))
+            # finished_at strictly increases within a job, even across worker clocks, so results_after can page on it
+            db.execute('INSERT OR REPLACE INTO results (task_id, job_id, kind, result_key, result, worker, finished_at) '
+                       'VALUES (?, ?, ?, ?, ?, ?, '
+                       'MAX(?, (SELECT IFNULL(MAX(finished_at), 0) + 0.000001 FROM results WHERE job_id = ?)))',
+                       (task_id, task['job_id'], task['kind'], result_key, json.dumps(result, default=record_json),
+                        worker_id, time.time(), task['job_id']))
+
+    def fail(self, task_id, worker_id, error):
+        """Release a failed task for another try after retry_delay, or mark it failed at max_attempts"""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "available_at = ?, lease_owner = NULL, lease_expires = NULL, error = ? "
+                "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (self.max_attempts, time.time() + self.retry_delay, error, task_id, worker_id))
+
+    # Reporting
+
+    def pending(self):
+        """Tasks of any job still queued or leased"""
+        return self._connection().execute("SELECT COUNT(*) FROM tasks WHERE state IN ('queued', 'leased')").fetchone()[0]
+
+    def job_stats(self, job_id):
+        db = self._connection()
+        counts = {state: count for state, count in db.execute(
+            'SELECT state, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY state', (job_id,))}
+        workers = [row[0] for row in db.execute('SELECT DISTINCT worker FROM results WHERE job_id = ?', (job_id,))]
+        return {
+            'queued': counts.get('queued', 0),
+            'leased': counts.get('leased', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'workers': sorted(workers),
+            'finished': not counts.get('queued') and not counts.get('leased')
+        }
+
+    def results(self, job_id, offset=0, limit=100):
+        rows = self._connection().execute('SELECT result FROM results WHERE job_id = ? ORDER BY task_id LIMIT ? OFFSET ?',
+                                          (job_id, limit, offset)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_results(self, job_id, batch_size=1000):
+        """Every merged result of a job in task order, read batch_size rows at a time"""
+        last_id = 0
+        while True:
+            rows = self._connection().execute('SELECT task_id, result FROM results WHERE job_id = ? AND task_id > ? '
+                                              'ORDER BY task_id LIMIT ?', (job_id, last_id, batch_size)).fetchall()
+            for row in rows:
+                yield json.loads(row[1])
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def results_after(self, job_id, cursor=(0, 0), limit=1000):
+        """Results stored after cursor in the order they were stored; returns (results, next cursor)
+
+        Tasks finish out of id order, so the cursor is (finished_at, task_id);
+        complete() keeps finished_at strictly increasing within a job.
+        """
+        rows = self._connection().execute(
+            'SELECT finished_at, task_id, result FROM results WHERE job_id = ? AND (finished_at, task_id) > (?, ?) '
+            'ORDER BY finished_at, task_id LIMIT ?', (job_id, cursor[0], cursor[1], limit)).fetchall()
+        if not rows:
+            return [], cursor
+        return [json.loads(row['result']) for row in rows], (rows[-1]['finished_at'], rows[-1]['task_id'])
+
+    def failures(self, job_id, limit=100):
+        rows = self._connection().execute("SELECT payload, attempts, error FROM tasks WHERE job_id = ? AND state = 'failed' "
+                                          "ORDER BY id LIMIT ?", (job_id, limit)).fetchall()
+        return [dict(json.loads(row['payload']), attempts=row['attempts'], error=row['error']) for row in rows]
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT around a block, so a lease's read and write can't interleave with another worker's"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
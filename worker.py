@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Crawl worker - leases page tasks from the shared task queue and stores results back into it
+
+Start as many as the machine allows; each process runs --threads workers:
+    AUDIT_DATA_DIR=/data python3 worker.py --threads 4
+"""
+
+import argparse
+import os
+import signal
+import threading
+
+# Workers in this process are the fleet; don't also start the server's in-process ones
+os.environ.setdefault('AUDIT_LOCAL_WORKERS', '0')
+
+from app import QUEUE_HANDLERS, TASK_LEASE_SECONDS, get_task_queue
+from modules.queue_worker import run_workers
+
+def main():
+    parser = argparse.ArgumentParser(description='Run crawl workers against the shared task queue')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('AUDIT_WORKER_THREADS', '2')),
+                        help='worker threads in this process')
+    parser.add_argument('--exit-when-idle', action='store_true',
+                        help='stop once no task is ready instead of polling for new jobs')
+    args = parser.parse_args()
+
+    task_queue = get_task_queue()
+    print(f"🚀 Starting {args.threads} crawl workers on {task_queue.path}")
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    threads, _ = run_workers(task_queue, QUEUE_HANDLERS, count=args.threads, lease_seconds=TASK_LEASE_SECONDS,
+                             stop=stop, exit_when_idle=args.exit_when_idle)
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(1)
+    except KeyboardInterrupt:
+        # Tasks in progress are abandoned; their leases expire and another worker picks them up
+        stop.set()
+
+if __name__ == "__main__":
+    main()